@@ -0,0 +1,88 @@
+"""
+Подсказки заголовков: память индекса и задержка поиска по префиксу.
+
+Запуск: ``python -m benchmarks.autocomplete [--titles 100000]``.
+Память считается через ``tracemalloc`` как прирост после построения
+индекса, задержка сравнивается с запросом ``istartswith`` к БД.
+"""
+import argparse
+import random
+import tracemalloc
+
+from benchmarks.utils import (
+    measure, print_table, setup_django, summary, test_database,
+)
+
+ALPHABET = 'абвгдежзийклмнопрстуфхцчшщыэюя'
+BATCH_SIZE = 5000
+PREFIXES = ('а', 'ко', 'мир', 'новос')
+
+
+def random_title(rng):
+    words = (
+        ''.join(rng.choices(ALPHABET, k=rng.randint(3, 10)))
+        for _ in range(rng.randint(2, 6))
+    )
+    return ' '.join(words).capitalize()[:50]
+
+
+def run(count, repeat):
+    from django.conf import settings
+
+    from news.autocomplete import TitleIndex
+    from news.models import News
+
+    rng = random.Random(42)
+    for start in range(0, count, BATCH_SIZE):
+        News.objects.bulk_create(
+            News(title=random_title(rng), text='Текст')
+            for _ in range(min(BATCH_SIZE, count - start))
+        )
+    index = TitleIndex()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    index.lookup('а')
+    after, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f'Заголовков: {len(index)}, индекс: {(after - before) / 2**20:.1f} '
+        f'МиБ, пик при построении: {(peak - before) / 2**20:.1f} МиБ'
+    )
+    limit = settings.AUTOCOMPLETE_LIMIT
+    rows = []
+    for prefix in PREFIXES:
+        memory = summary(measure(
+            lambda: index.lookup(prefix), repeat=repeat
+        ))
+        database = summary(measure(
+            lambda: list(News.objects.filter(
+                title__istartswith=prefix
+            ).values_list('pk', 'title')[:limit]),
+            repeat=repeat,
+        ))
+        rows.append((
+            prefix, len(index.lookup(prefix)),
+            memory['p50_ms'], memory['p95_ms'],
+            database['p50_ms'], database['p95_ms'],
+        ))
+    print_table(
+        (
+            'префикс', 'найдено', 'индекс p50', 'индекс p95',
+            'БД p50', 'БД p95',
+        ),
+        rows,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--titles', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+    setup_django()
+    with test_database():
+        run(args.titles, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+"""
+Конкурентные запись и чтение SQLite до и после настройки соединений.
+
+Запуск: ``python -m benchmarks.concurrency [--writers 4] [--readers 4]
+[--seconds 5]``. База — файл во временном каталоге: в памяти нет ни
+журнала, ни блокировок файла. Писатели добавляют комментарии (вставка
+и обновление счётчика новости в одной транзакции), читатели выбирают
+главную и страницу комментариев. Без настройки соединений действует
+журнал отката: каждая фиксация синхронизирует с диском журнал и базу,
+а пока писатель её выполняет, остальные ждут блокировку — дольше
+``busy_timeout`` ожидание заканчивается ошибкой ``database is locked``.
+С ``SQLITE_PRAGMAS`` (WAL) читатели не мешают писателю, а фиксация
+дописывает страницы в журнал без синхронизации.
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+
+from benchmarks.utils import (
+    print_table, setup_django, summary, test_database,
+)
+
+NEWS_COUNT = 1000
+
+# Настройки SQLite по умолчанию, WAL сохраняется в файле базы.
+BASELINE_PRAGMAS = {'journal_mode': 'delete'}
+
+
+def populate():
+    from django.contrib.auth import get_user_model
+
+    from news.models import News
+
+    News.objects.bulk_create(
+        News(title=f'Новость {index}', text='Текст')
+        for index in range(NEWS_COUNT)
+    )
+    get_user_model().objects.create(username='bench')
+
+
+def worker(operation, deadline, timings, errors):
+    """Выполняет ``operation`` до ``deadline``, собирая длительности."""
+    from django.db import OperationalError, connections
+
+    try:
+        while True:
+            start = time.perf_counter()
+            if start >= deadline:
+                break
+            try:
+                operation()
+            except OperationalError:
+                errors.append(start)
+            else:
+                timings.append(time.perf_counter() - start)
+    finally:
+        connections.close_all()
+
+
+def run(writers, readers, seconds):
+    from django.contrib.auth import get_user_model
+    from django.db import connections, transaction
+
+    from news.models import Comment, News
+
+    author = get_user_model().objects.get()
+    pks = list(News.objects.values_list('pk', flat=True))
+    connections.close_all()
+
+    def write():
+        with transaction.atomic():
+            Comment.objects.create(
+                news_id=random.choice(pks), author=author, text='Текст',
+            )
+
+    def read():
+        list(News.objects.order_by('-date')[:10])
+        list(
+            Comment.objects.filter(news_id=random.choice(pks))
+            .select_related('author').order_by('-created')[:20]
+        )
+
+    writes, reads, errors = [], [], []
+    deadline = time.perf_counter() + seconds
+    threads = [
+        threading.Thread(
+            target=worker, args=(operation, deadline, timings, errors)
+        )
+        for operation, timings, count in (
+            (write, writes, writers), (read, reads, readers),
+        )
+        for _ in range(count)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return (
+        round(len(writes) / seconds), summary(writes)['p95_ms'],
+        round(len(reads) / seconds), summary(reads)['p95_ms'],
+        len(errors),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=5)
+    args = parser.parse_args()
+    setup_django()
+    from django.conf import settings
+    from django.db import connection
+    from django.test.utils import override_settings
+
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        connection.settings_dict['TEST']['NAME'] = os.path.join(
+            directory, 'concurrency.sqlite3'
+        )
+        for label, pragmas in (
+            ('по умолчанию', BASELINE_PRAGMAS),
+            ('SQLITE_PRAGMAS', settings.SQLITE_PRAGMAS),
+        ):
+            with override_settings(SQLITE_PRAGMAS=pragmas), test_database():
+                populate()
+                rows.append((label, *run(
+                    args.writers, args.readers, args.seconds
+                )))
+    print_table(
+        (
+            'соединения', 'записей/с', 'запись p95', 'чтений/с',
+            'чтение p95', 'ошибок',
+        ),
+        rows,
+    )
+
+
+if __name__ == '__main__':
+    main()
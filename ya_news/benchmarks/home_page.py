@@ -0,0 +1,70 @@
+"""
+Задержка главной страницы в зависимости от числа комментариев.
+
+Запуск: ``python -m benchmarks.home_page [--repeat 50]``.
+Время ответа не должно расти вместе с количеством комментариев
+у новостей, выведенных на главную.
+"""
+import argparse
+
+from benchmarks.utils import (
+    measure, print_table, setup_django, summary, test_database,
+)
+
+COMMENTS_PER_NEWS = (0, 10, 100, 1000, 5000)
+
+
+def run(repeat):
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from django.db import connection
+    from django.test import Client
+    from django.test.utils import CaptureQueriesContext
+    from django.urls import reverse
+
+    from news.models import Comment, News
+    from news.services import recount_comment_counts
+
+    author = get_user_model().objects.create(username='bench')
+    News.objects.bulk_create(
+        News(title=f'Новость {index}', text='Текст')
+        for index in range(settings.NEWS_COUNT_ON_HOME_PAGE)
+    )
+    all_news = list(News.objects.all())
+    client = Client()
+    url = reverse('news:home')
+    rows = []
+    created = 0
+    for per_news in COMMENTS_PER_NEWS:
+        Comment.objects.bulk_create(
+            (
+                Comment(news=news, author=author, text='Комментарий')
+                for news in all_news
+                for _ in range(per_news - created)
+            ),
+            batch_size=1000,
+        )
+        recount_comment_counts()
+        created = per_news
+        with CaptureQueriesContext(connection) as queries:
+            client.get(url)
+        query_count = len(queries)
+        timings = measure(lambda: client.get(url), repeat=repeat)
+        stats = summary(timings)
+        rows.append(
+            (per_news, query_count, stats['p50_ms'], stats['p95_ms'])
+        )
+    print_table(('comments/news', 'queries', 'p50, ms', 'p95, ms'), rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+    setup_django()
+    with test_database():
+        run(args.repeat)
+
+
+if __name__ == '__main__':
+    main()
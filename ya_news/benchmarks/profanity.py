@@ -0,0 +1,63 @@
+"""
+Проверка комментариев на запрещённые слова: построчный перебор
+словаря против автомата Ахо — Корасик.
+
+Запуск: ``python -m benchmarks.profanity [--repeat 20]``.
+"""
+import argparse
+import random
+
+from benchmarks.utils import measure, print_table, setup_django, summary
+
+LEXICON_SIZES = (2, 1000, 5000)
+COMMENT_LENGTHS = (1_000, 10_000)
+ALPHABET = 'абвгдежзийклмнопрстуфхцчшщыэюя'
+
+
+def random_words(rng, count):
+    return [
+        ''.join(rng.choice(ALPHABET) for _ in range(rng.randint(6, 12)))
+        for _ in range(count)
+    ]
+
+
+def naive_search(words, text):
+    lowered = text.lower()
+    return any(word in lowered for word in words)
+
+
+def run(repeat):
+    from news.profanity import WordMatcher
+
+    rng = random.Random(42)
+    rows = []
+    for size in LEXICON_SIZES:
+        words = random_words(rng, size)
+        matcher = WordMatcher(words)
+        for length in COMMENT_LENGTHS:
+            # Чистый комментарий — худший случай для перебора.
+            text = ' '.join(random_words(rng, length // 9))[:length]
+            naive = summary(measure(
+                lambda: naive_search(words, text), repeat=repeat
+            ))
+            automaton = summary(measure(
+                lambda: matcher.search(text), repeat=repeat
+            ))
+            rows.append((
+                size, length, naive['p50_ms'], automaton['p50_ms'],
+            ))
+    print_table(
+        ('words', 'chars', 'naive p50, ms', 'automaton p50, ms'), rows
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    setup_django()
+    run(args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""
+Полнотекстовый поиск FTS5 против ``icontains``.
+
+Запуск: ``python -m benchmarks.search [--news 300000] [--repeat 20]``.
+Словарь синтетический, частоты слов распределены по Ципфу, поэтому
+в запросах есть и частые, и редкие слова. ``icontains`` просматривает
+таблицу, пока не наберёт страницу, и для редких слов читает её целиком.
+FTS5 читает только списки вхождений, но ранжирует все совпадения,
+поэтому его время растёт с их числом.
+"""
+import argparse
+import random
+
+from benchmarks.utils import (
+    measure, print_table, setup_django, summary, test_database,
+)
+
+VOCABULARY_SIZE = 20000
+WORDS_PER_TEXT = 60
+BATCH_SIZE = 5000
+
+
+def make_vocabulary(rng):
+    syllables = ('ка', 'ро', 'ми', 'ту', 'ле', 'на', 'зо', 'вы', 'ше', 'да')
+    words = set()
+    while len(words) < VOCABULARY_SIZE:
+        words.add(''.join(rng.choices(syllables, k=rng.randint(2, 5))))
+    return sorted(words)
+
+
+def populate(count, rng, vocabulary):
+    from news.models import News
+
+    weights = [1 / rank for rank in range(1, len(vocabulary) + 1)]
+    for start in range(0, count, BATCH_SIZE):
+        News.objects.bulk_create(
+            News(
+                title=' '.join(rng.choices(vocabulary, weights, k=5)),
+                text=' '.join(
+                    rng.choices(vocabulary, weights, k=WORDS_PER_TEXT)
+                ),
+            )
+            for _ in range(min(BATCH_SIZE, count - start))
+        )
+
+
+def run(count, repeat):
+    from django.conf import settings
+    from django.db import connection
+    from django.db.models import Q
+
+    from news.models import News
+    from news.search import match_expression, search_news
+
+    rng = random.Random(42)
+    vocabulary = make_vocabulary(rng)
+    populate(count, rng, vocabulary)
+    limit = settings.SEARCH_RESULTS_PER_PAGE
+    queries = {
+        'частое слово': vocabulary[0],
+        'среднее слово': vocabulary[100],
+        'редкое слово': vocabulary[-1],
+        'два слова': f'{vocabulary[5]} {vocabulary[50]}',
+    }
+    rows = []
+    for label, query in queries.items():
+        condition = Q()
+        for word in query.split():
+            condition &= Q(title__icontains=word) | Q(text__icontains=word)
+        naive = summary(measure(
+            lambda: list(News.objects.filter(condition)[:limit]),
+            repeat=repeat,
+        ))
+        fts = summary(measure(lambda: search_news(query), repeat=repeat))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT count(*) FROM news_news_fts '
+                'WHERE news_news_fts MATCH %s',
+                [match_expression(query)],
+            )
+            matches = cursor.fetchone()[0]
+        rows.append((
+            label, matches, naive['p50_ms'], naive['p95_ms'],
+            fts['p50_ms'], fts['p95_ms'],
+        ))
+    print_table(
+        (
+            'запрос', 'совпадений', 'icontains p50', 'icontains p95',
+            'fts5 p50', 'fts5 p95',
+        ),
+        rows,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--news', type=int, default=300000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    setup_django()
+    with test_database():
+        run(args.news, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,15 +1,141 @@
 from django.contrib import admin
+from django.contrib.auth import get_permission_codename, get_user_model
+from django.contrib.auth.admin import UserAdmin
+from django.core.paginator import Paginator
+from django.forms.models import BaseInlineFormSet
 
 from .models import Comment, News
+from .services import delete_news, delete_users
 
+User = get_user_model()
 
-class CommentInline(admin.StackedInline):
+
+class ChunkedDeleteMixin:
+    """
+    Удаление объектов вместе с комментариями без загрузки их в память.
+
+    Страница подтверждения показывает число комментариев вместо
+    полного списка, а удаление выполняется сервисом ``delete_service``,
+    который принимает QuerySet удаляемых объектов. Оба атрибута
+    обязательны для наследников.
+    """
+    comments_lookup = None
+    delete_service = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for name in ('comments_lookup', 'delete_service'):
+            if getattr(cls, name) is None:
+                raise TypeError(f'{cls.__name__}: не задан {name}.')
+
+    def get_deleted_objects(self, objs, request):
+        objs = list(objs)
+        comments = Comment.objects.filter(
+            **{f'{self.comments_lookup}__in': objs}
+        ).count()
+        deleted_objects = [str(obj) for obj in objs]
+        model_count = {self.opts.verbose_name_plural: len(objs)}
+        perms_needed = set()
+        if comments:
+            comment_opts = Comment._meta
+            deleted_objects.append(
+                f'{comment_opts.verbose_name_plural}: {comments}'
+            )
+            model_count[comment_opts.verbose_name_plural] = comments
+            codename = get_permission_codename('delete', comment_opts)
+            if not request.user.has_perm(
+                f'{comment_opts.app_label}.{codename}'
+            ):
+                perms_needed.add(comment_opts.verbose_name)
+        return deleted_objects, model_count, perms_needed, []
+
+    def delete_model(self, request, obj):
+        self.delete_service(self.model.objects.filter(pk=obj.pk))
+
+    def delete_queryset(self, request, queryset):
+        self.delete_service(queryset)
+
+
+class PaginatedInlineFormSet(BaseInlineFormSet):
+    """
+    Формы только для одной страницы связанных объектов.
+
+    Ссылки ведут на соседние, первые и последние страницы, остальные
+    пропускаются: у большого обсуждения тысячи страниц.
+    """
+    per_page = 20
+    page_number = 1
+
+    def get_queryset(self):
+        if not hasattr(self, 'page_obj'):
+            self.paginator = Paginator(super().get_queryset(), self.per_page)
+            self.page_obj = self.paginator.get_page(self.page_number)
+            self.page_range = self.paginator.get_elided_page_range(
+                self.page_obj.number
+            )
+        return self.page_obj.object_list
+
+
+class CommentInline(admin.TabularInline):
+    """
+    Комментарии на странице новости, по одной странице за раз.
+
+    Автор выводится только для чтения из ``select_related``: выпадающий
+    список всех пользователей в каждой строке делал страницу огромной.
+    Комментарии пишут на сайте, а создать комментарий от имени другого
+    пользователя можно в разделе комментариев.
+    """
     model = Comment
+    formset = PaginatedInlineFormSet
+    template = 'admin/news/paginated_tabular.html'
+    fields = ('author', 'text', 'created')
+    readonly_fields = ('author', 'created')
     extra = 0
+    page_param = 'comments_page'
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('author')
+
+    def get_formset(self, request, obj=None, **kwargs):
+        formset = super().get_formset(request, obj, **kwargs)
+        formset.page_number = request.GET.get(self.page_param, 1)
+        formset.page_param = self.page_param
+        return formset
+
+    def has_add_permission(self, request, obj=None):
+        return False
 
 
 @admin.register(News)
-class NewsAdmin(admin.ModelAdmin):
+class NewsAdmin(ChunkedDeleteMixin, admin.ModelAdmin):
+    list_display = ('title', 'date', 'comment_count')
+    readonly_fields = ('comment_count',)
+    date_hierarchy = 'date'
+    search_fields = ('title',)
+    # Точное число строк считается отдельным COUNT(*) по всей таблице.
+    show_full_result_count = False
     inlines = [
         CommentInline,
     ]
+    comments_lookup = 'news'
+    delete_service = staticmethod(delete_news)
+
+
+@admin.register(Comment)
+class CommentAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'news', 'author', 'created')
+    list_select_related = ('news', 'author')
+    autocomplete_fields = ('news', 'author')
+    search_fields = ('text',)
+    # Сортировка по первичному ключу не требует сортировки всей таблицы.
+    ordering = ('-id',)
+    show_full_result_count = False
+
+
+admin.site.unregister(User)
+
+
+@admin.register(User)
+class ChunkedDeleteUserAdmin(ChunkedDeleteMixin, UserAdmin):
+    comments_lookup = 'author'
+    delete_service = staticmethod(delete_users)
@@ -0,0 +1,125 @@
+"""
+Подсказки по началу заголовка новости.
+
+Индекс — отсортированный список нормализованных заголовков в памяти
+процесса, поиск по префиксу делается двоичным поиском. Индекс строится
+при первом обращении и перестраивается, когда меняется его версия
+в общем кеше. Сигналы ``News`` после фиксации транзакции увеличивают
+версию, поэтому индексы остальных процессов перестраиваются, а процесс,
+изменивший новость, обновляет свой индекс на месте. Массовые загрузки
+идут в обход сигналов и заканчиваются ``invalidate_all``: сброс кеша
+тоже меняет версию.
+"""
+import re
+import threading
+from bisect import bisect_left, insort
+
+from django.conf import settings
+
+from .cache import bump_version, get_version
+from .models import News
+
+TITLES_NAMESPACE = 'news:titles'
+
+# Разделитель полей записи, сортируется раньше любого символа.
+SEPARATOR = b'\x00'
+
+
+def normalize(title):
+    """Приводит заголовок к виду для сравнения: регистр, «ё», пробелы."""
+    return re.sub(r'\s+', ' ', title.casefold().replace('ё', 'е')).strip()
+
+
+def make_entry(pk, title):
+    """
+    Запись индекса: нормализованный заголовок, исходный и ключ.
+
+    Записи хранятся в UTF-8: байтовая строка вдвое компактнее ``str``
+    с кириллицей, а порядок байтов UTF-8 совпадает с порядком символов.
+    """
+    return SEPARATOR.join(
+        (normalize(title).encode(), title.encode(), str(pk).encode())
+    )
+
+
+class TitleIndex:
+    """Отсортированный массив заголовков с поиском по префиксу."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._entries = []
+        self._by_pk = {}
+
+    def _ensure_built(self):
+        version = get_version(TITLES_NAMESPACE)
+        if self._version == version:
+            return
+        with self._lock:
+            if self._version == version:
+                return
+            by_pk = {
+                pk: make_entry(pk, title) for pk, title in
+                News.objects.values_list('pk', 'title').iterator()
+            }
+            self._entries = sorted(by_pk.values())
+            self._by_pk = by_pk
+            self._version = version
+
+    def changed(self, pk, title=None):
+        """
+        Отмечает изменение новости, ``title=None`` — её удаление.
+
+        Вызывается после фиксации транзакции: откат не оставляет
+        в индексе несуществующих заголовков. Версия в общем кеше
+        увеличивается, а построенный индекс обновляется на месте, только
+        если до изменения он был актуален. Иначе он перестроится при
+        следующем поиске.
+        """
+        current = get_version(TITLES_NAMESPACE)
+        version = bump_version(TITLES_NAMESPACE)
+        with self._lock:
+            if self._version != current or version != current + 1:
+                return
+            self._discard(pk)
+            if title is not None:
+                entry = make_entry(pk, title)
+                insort(self._entries, entry)
+                self._by_pk[pk] = entry
+            self._version = version
+
+    def _discard(self, pk):
+        entry = self._by_pk.pop(pk, None)
+        if entry is None:
+            return
+        position = bisect_left(self._entries, entry)
+        if (
+            position < len(self._entries)
+            and self._entries[position] == entry
+        ):
+            del self._entries[position]
+
+    def lookup(self, prefix, limit=None):
+        """Пары ``(pk, заголовок)`` новостей, начинающихся с ``prefix``."""
+        limit = limit or settings.AUTOCOMPLETE_LIMIT
+        prefix = normalize(prefix).encode()
+        if not prefix:
+            return []
+        self._ensure_built()
+        entries = self._entries
+        results = []
+        position = bisect_left(entries, prefix)
+        while position < len(entries) and len(results) < limit:
+            entry = entries[position]
+            if not entry.startswith(prefix):
+                break
+            _, title, pk = entry.split(SEPARATOR)
+            results.append((int(pk), title.decode()))
+            position += 1
+        return results
+
+    def __len__(self):
+        return len(self._entries)
+
+
+title_index = TitleIndex()
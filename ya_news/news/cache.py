@@ -0,0 +1,80 @@
+"""
+Версионированный кеш YaNews.
+
+Каждому пространству имён (например, комментариям одной новости)
+соответствует счётчик версии. Версия входит в ключи записей, поэтому
+для инвалидации достаточно увеличить счётчик — старые записи просто
+перестают запрашиваться и вытесняются кешем.
+"""
+import hashlib
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+from .stats import CacheStats
+
+NEWS_LIST_NAMESPACE = 'news:list'
+
+
+def _version_key(namespace):
+    return f'version:{namespace}'
+
+
+def get_version(namespace):
+    """Текущая версия пространства имён."""
+    key = _version_key(namespace)
+    version = cache.get(key)
+    if version is None:
+        # Начинаем не с единицы: если счётчик был вытеснен из кеша,
+        # новая версия не совпадёт ни с одной из прежних.
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(namespace):
+    """Увеличивает версию, делая недействительными все её записи."""
+    try:
+        return cache.incr(_version_key(namespace))
+    except ValueError:
+        return get_version(namespace)
+
+
+def invalidate(namespace):
+    """
+    Инвалидирует пространство имён сейчас и после фиксации транзакции.
+
+    Повторное увеличение версии после commit не даёт закешировать
+    состояние, прочитанное параллельным запросом до фиксации.
+    """
+    bump_version(namespace)
+    transaction.on_commit(lambda: bump_version(namespace))
+
+
+def invalidate_all():
+    """Сбрасывает весь кеш после массовой загрузки данных в обход сигналов."""
+    cache.clear()
+
+
+def make_key(namespace, *parts):
+    """Ключ записи с учётом текущей версии пространства имён."""
+    digest = hashlib.md5(
+        ':'.join(str(part) for part in parts).encode()
+    ).hexdigest()
+    return f'{namespace}:{get_version(namespace)}:{digest}'
+
+
+def news_namespace(news_id):
+    return f'news:{news_id}'
+
+
+def comments_namespace(news_id):
+    return f'news:{news_id}:comments'
+
+
+# Все счётчики объявлены здесь: команда cache_stats видит их, не
+# импортируя модули, которые их увеличивают.
+comments_stats = CacheStats('comments')
+page_stats = CacheStats('pages')
+feed_stats = CacheStats('feeds')
@@ -0,0 +1,76 @@
+"""
+Валидаторы для условных GET-запросов к главной и странице новости.
+
+Состояние страницы читается одним индексированным запросом и
+запоминается на объекте запроса: декоратор ``condition`` вызывает
+функции ETag и Last-Modified по отдельности.
+"""
+import hashlib
+
+from django.conf import settings
+from django.middleware.csrf import get_token
+
+from .models import News
+
+
+def _user_part(request):
+    """
+    Часть валидатора, зависящая от посетителя.
+
+    Страница пользователя содержит CSRF-токен формы. После нового входа
+    меняются сессия и токен, и ответ 304 со старой страницей сломал бы
+    отправку формы, поэтому в валидатор входят и они.
+    """
+    if not request.user.is_authenticated:
+        return 0
+    # Токен создаётся здесь, если его ещё нет: иначе валидатор первого
+    # ответа не совпал бы со следующим, пришедшим уже с cookie.
+    get_token(request)
+    secret = (
+        f'{request.session.session_key}:{request.META.get("CSRF_COOKIE")}'
+    )
+    digest = hashlib.md5(secret.encode()).hexdigest()[:16]
+    return f'{request.user.pk}-{digest}'
+
+
+def _detail_state(request, pk):
+    if not hasattr(request, 'news_state'):
+        request.news_state = News.objects.filter(pk=pk).values_list(
+            'modified', 'comment_count'
+        ).first()
+    return request.news_state
+
+
+def detail_etag(request, pk, **kwargs):
+    state = _detail_state(request, pk)
+    if state is None:
+        return None
+    modified, comment_count = state
+    return (
+        f'news-{pk}-{modified.timestamp()}-{comment_count}'
+        f'-{_user_part(request)}'
+    )
+
+
+def detail_last_modified(request, pk, **kwargs):
+    state = _detail_state(request, pk)
+    return state[0] if state else None
+
+
+def _home_state(request):
+    if not hasattr(request, 'home_state'):
+        request.home_state = list(News.objects.values_list(
+            'pk', 'modified'
+        )[:settings.NEWS_COUNT_ON_HOME_PAGE])
+    return request.home_state
+
+
+def home_etag(request, *args, **kwargs):
+    state = _home_state(request)
+    digest = hashlib.md5(repr(state).encode()).hexdigest()
+    return f'home-{digest}-{_user_part(request)}'
+
+
+def home_last_modified(request, *args, **kwargs):
+    state = _home_state(request)
+    return max((modified for _, modified in state), default=None)
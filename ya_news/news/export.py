@@ -0,0 +1,133 @@
+"""
+Выгрузка новостей и комментариев в формате NDJSON.
+
+Строки отдаются по мере чтения из базы: новости читаются
+``iterator(chunk_size)``, комментарии — одним запросом на пачку
+новостей, поэтому память не зависит от размера таблиц. Для
+инкрементальной выгрузки новости фильтруются по ``date``,
+а комментарии — по ключу ``(created, id)``: у нескольких комментариев
+может совпасть время создания, и одного ``created`` не хватит, чтобы
+продолжить выгрузку с места остановки.
+"""
+import json
+from itertools import groupby, islice
+
+from django.conf import settings
+from django.core.exceptions import BadRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import Comment, News
+
+COMMENT_FIELDS = ('id', 'news_id', 'author__username', 'text', 'created')
+
+
+def parse_watermark(value, parser, name='since'):
+    """Разбирает параметр ``name``, некорректное значение — ответ 400."""
+    if not value:
+        return None
+    try:
+        parsed = parser(value)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise BadRequest(f'Некорректное значение {name}.')
+    return parsed
+
+
+def parse_date_watermark(value):
+    return parse_watermark(value, parse_date)
+
+
+def parse_datetime_watermark(value):
+    return parse_watermark(value, parse_datetime)
+
+
+def parse_id_watermark(value):
+    return parse_watermark(value, int, 'after')
+
+
+def comment_row(values):
+    comment_id, news_id, author, text, created = values
+    return {
+        'id': comment_id,
+        'news': news_id,
+        'author': author,
+        'text': text,
+        'created': created,
+    }
+
+
+def chunks(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def export_news(since=None, chunk_size=None):
+    """
+    Новости с комментариями, начиная с даты ``since`` включительно.
+
+    Новости читаются в порядке индекса по дате, без сортировки выборки.
+    """
+    chunk_size = chunk_size or settings.EXPORT_CHUNK_SIZE
+    news = News.objects.order_by('-date', 'id')
+    if since is not None:
+        news = news.filter(date__gte=since)
+    news = news.values_list('id', 'title', 'text', 'date').iterator(
+        chunk_size=chunk_size
+    )
+    for chunk in chunks(news, chunk_size):
+        # Внутри пачки новости идут по ключу, как и их комментарии:
+        # оба потока сливаются без словаря комментариев всей пачки.
+        chunk.sort()
+        comments = groupby(
+            Comment.objects.filter(
+                news_id__in=[news_id for news_id, *_ in chunk]
+            ).order_by('news_id', 'created', 'id').values_list(
+                *COMMENT_FIELDS
+            ).iterator(chunk_size=chunk_size),
+            key=lambda values: values[1],
+        )
+        group_news_id, group = next(comments, (None, ()))
+        for news_id, title, text, date in chunk:
+            news_comments = []
+            if group_news_id == news_id:
+                news_comments = [comment_row(values) for values in group]
+                group_news_id, group = next(comments, (None, ()))
+            yield {
+                'id': news_id,
+                'title': title,
+                'text': text,
+                'date': date,
+                'comments': news_comments,
+            }
+
+
+def export_comments(since=None, after=None, chunk_size=None):
+    """
+    Комментарии в порядке ``(created, id)`` после водяного знака.
+
+    Водяной знак — ``created`` и ``id`` последней полученной строки.
+    Без ``after`` выгружаются комментарии, созданные строго позже
+    ``since``.
+    """
+    comments = Comment.objects.order_by('created', 'id')
+    if since is not None:
+        later = Q(created__gt=since)
+        if after is not None:
+            later |= Q(created=since, id__gt=after)
+        comments = comments.filter(later)
+    for values in comments.values_list(*COMMENT_FIELDS).iterator(
+        chunk_size=chunk_size or settings.EXPORT_CHUNK_SIZE
+    ):
+        yield comment_row(values)
+
+
+def ndjson(rows):
+    """Строки NDJSON для ``StreamingHttpResponse``."""
+    for row in rows:
+        yield json.dumps(
+            row, cls=DjangoJSONEncoder, ensure_ascii=False
+        ) + '\n'
@@ -0,0 +1,77 @@
+"""
+Ленты RSS и Atom с последними новостями.
+
+Лента одинакова для всех читателей, поэтому готовый ответ хранится
+в кеше в пространстве имён главной: любое изменение новостей или
+появление комментария меняет версию, и лента строится заново.
+ETag и Last-Modified сохраняются вместе с ответом, так что
+``ConditionalGetMiddleware`` отвечает на повторный опрос кодом 304
+без обращения к базе.
+"""
+from datetime import datetime, time
+
+from django.conf import settings
+from django.contrib.syndication.views import Feed
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.urls import reverse, reverse_lazy
+from django.utils import timezone
+from django.utils.cache import set_response_etag
+from django.utils.feedgenerator import Atom1Feed
+
+from .cache import NEWS_LIST_NAMESPACE, feed_stats, make_key
+from .models import News
+
+
+class LatestNewsFeed(Feed):
+    """Последние новости с числом комментариев в формате RSS."""
+    title = 'YaNews'
+    link = reverse_lazy('news:home')
+    description = 'Последние новости YaNews'
+
+    def items(self):
+        return News.objects.all()[:settings.NEWS_COUNT_ON_HOME_PAGE]
+
+    def item_title(self, item):
+        return item.title
+
+    def item_description(self, item):
+        return f'{item.text}\n\nКомментариев: {item.comment_count}'
+
+    def item_link(self, item):
+        return reverse('news:detail', args=(item.pk,))
+
+    def item_pubdate(self, item):
+        return timezone.make_aware(datetime.combine(item.date, time.min))
+
+    def item_updateddate(self, item):
+        return item.modified
+
+
+class LatestNewsAtomFeed(LatestNewsFeed):
+    """Те же новости в формате Atom."""
+    feed_type = Atom1Feed
+    subtitle = LatestNewsFeed.description
+
+
+def cached_feed(feed):
+    """Представление ленты, ответ которой живёт в кеше до смены версии."""
+
+    def view(request, *args, **kwargs):
+        key = make_key(NEWS_LIST_NAMESPACE, 'feed', request.path)
+        cached = cache.get(key)
+        if cached is not None:
+            feed_stats.hit()
+            content, headers = cached
+            return HttpResponse(content, headers=headers)
+        feed_stats.miss()
+        response = feed(request, *args, **kwargs)
+        set_response_etag(response)
+        cache.set(
+            key,
+            (response.content, dict(response.items())),
+            settings.PAGE_CACHE_TIMEOUT,
+        )
+        return response
+
+    return view
@@ -1,7 +1,9 @@
+from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.forms import ModelForm
 
 from .models import Comment
+from .profanity import WordMatcher, read_lexicon
 
 BAD_WORDS = (
     'редиска',
@@ -11,6 +13,23 @@ BAD_WORDS = (
 WARNING = 'Не ругайтесь!'
 
 
+def build_bad_words_matcher():
+    """Собирает автомат из встроенного списка и файла модераторов."""
+    words = list(BAD_WORDS)
+    if settings.BAD_WORDS_FILE:
+        words.extend(read_lexicon(settings.BAD_WORDS_FILE))
+    return WordMatcher(words)
+
+
+bad_words_matcher = build_bad_words_matcher()
+
+
+def reload_bad_words():
+    """Перечитывает словарь после его изменения модераторами."""
+    global bad_words_matcher
+    bad_words_matcher = build_bad_words_matcher()
+
+
 class CommentForm(ModelForm):
 
     class Meta:
@@ -20,8 +39,6 @@ class CommentForm(ModelForm):
     def clean_text(self):
         """Не позволяем ругаться в комментариях."""
         text = self.cleaned_data['text']
-        lowered_text = text.lower()
-        for word in BAD_WORDS:
-            if word in lowered_text:
-                raise ValidationError(WARNING)
+        if bad_words_matcher.search(text):
+            raise ValidationError(WARNING)
         return text
@@ -0,0 +1,68 @@
+"""
+Кеш отрендеренного блока комментариев.
+
+Блок одинаков для всех читателей, отличаются только ссылки
+«Редактировать» и «Удалить» у собственных комментариев. Поэтому
+в кеш кладётся HTML с маркерами на месте этих ссылок, а маркеры
+заменяются вторым, дешёвым проходом под конкретного пользователя.
+"""
+import re
+
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils.safestring import mark_safe
+
+from .cache import comments_namespace, comments_stats, make_key
+from .pagination import comments_page
+from .routers import pinned_to_primary
+
+CONTROLS_MARKER = re.compile(r'<!--controls:(\d+):(\d+)-->')
+CONTROLS_TEMPLATE = (
+    '<a href="{edit}">Редактировать</a> |\n'
+    '<a href="{delete}">Удалить</a>'
+)
+
+
+def render_comments(news_id, cursor=None):
+    """HTML страницы комментариев с маркерами, общий для всех."""
+    namespace = comments_namespace(news_id)
+    key = make_key(namespace, cursor or '')
+    # Только что написавший клиент должен увидеть свою запись,
+    # а в кеше может лежать блок, прочитанный из отставшей реплики.
+    html = None if pinned_to_primary() else cache.get(key)
+    if html is not None:
+        comments_stats.hit()
+        return html
+    comments_stats.miss()
+    comments, next_cursor = comments_page(news_id, cursor)
+    html = render_to_string('news/includes/comments.html', {
+        'comments': comments,
+        'next_cursor': next_cursor,
+        'news_id': news_id,
+    })
+    cache.set(key, html, settings.COMMENTS_CACHE_TIMEOUT)
+    return html
+
+
+def add_author_controls(html, user):
+    """Подставляет ссылки управления в комментарии пользователя."""
+    user_id = str(user.pk) if user.is_authenticated else None
+
+    def replace(match):
+        comment_id, author_id = match.groups()
+        if author_id != user_id:
+            return ''
+        return CONTROLS_TEMPLATE.format(
+            edit=reverse('news:edit', args=(comment_id,)),
+            delete=reverse('news:delete', args=(comment_id,)),
+        )
+
+    return mark_safe(CONTROLS_MARKER.sub(replace, html))
+
+
+def comments_block(request, news_id):
+    """Готовый блок комментариев для текущего запроса."""
+    html = render_comments(news_id, request.GET.get('cursor'))
+    return add_author_controls(html, request.user)
@@ -0,0 +1,101 @@
+import json
+import statistics
+import time
+from urllib.parse import urlencode
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.test import Client
+from django.urls import reverse
+
+from benchmarks.utils import percentile
+from news.models import Comment, News
+from news.queries import record_requests
+from news.urls import urlpatterns
+
+
+class Command(BaseCommand):
+    help = (
+        'Прогоняет все маршруты news.urls через тестовый клиент и выводит '
+        'задержки, число SQL-запросов и пропускную способность в JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=100)
+        parser.add_argument('--output', help='Файл для JSON-отчёта.')
+
+    def handle(self, *args, **options):
+        news = News.objects.order_by('-comment_count').first()
+        comment = Comment.objects.filter(news=news).first()
+        if comment is None:
+            self.stderr.write('Нет данных, запустите generate_data.')
+            return
+        author = get_user_model().objects.get(pk=comment.author_id)
+        # Аргументы маршрутов, нужна ли авторизация и строка запроса.
+        routes = {
+            'home': ((), False, ''),
+            'detail': ((news.pk,), False, ''),
+            'comments': ((news.pk,), False, ''),
+            'search': ((), False, '?' + urlencode({
+                'q': news.title.split()[0]
+            })),
+            'autocomplete': ((), False, '?' + urlencode({
+                'q': news.title[:3]
+            })),
+            'feed_rss': ((), False, ''),
+            'feed_atom': ((), False, ''),
+            'export_news': ((), False, '?' + urlencode({
+                'since': news.date.isoformat()
+            })),
+            'export_comments': ((), False, '?' + urlencode({
+                'since': comment.created.isoformat()
+            })),
+            'edit': ((comment.pk,), True, ''),
+            'delete': ((comment.pk,), True, ''),
+        }
+        anonymous = Client(SERVER_NAME='localhost')
+        authorized = Client(SERVER_NAME='localhost')
+        authorized.force_login(author)
+        report = {}
+        for pattern in urlpatterns:
+            if pattern.name not in routes:
+                self.stderr.write(
+                    f'Пропущен маршрут без образца: {pattern.name}'
+                )
+                continue
+            args, login, query = routes[pattern.name]
+            client = authorized if login else anonymous
+            report[pattern.name] = self.measure(
+                client,
+                reverse(f'news:{pattern.name}', args=args) + query,
+                options['requests'],
+            )
+        output = json.dumps(report, indent=2, sort_keys=True)
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                file.write(output)
+        self.stdout.write(output)
+
+    def measure(self, client, url, requests):
+        timings = []
+        with record_requests() as records:
+            started = time.perf_counter()
+            for _ in range(requests):
+                start = time.perf_counter()
+                response = client.get(url)
+                if response.streaming:
+                    # Выгрузка читает базу, пока отдаёт тело ответа.
+                    b''.join(response.streaming_content)
+                timings.append(time.perf_counter() - start)
+            elapsed = time.perf_counter() - started
+        return {
+            'url': url,
+            'requests': requests,
+            'p50_ms': round(percentile(timings, 50) * 1000, 3),
+            'p95_ms': round(percentile(timings, 95) * 1000, 3),
+            'p99_ms': round(percentile(timings, 99) * 1000, 3),
+            'queries': round(
+                statistics.mean(record.count for record in records), 2
+            ),
+            'rps': round(requests / elapsed, 1),
+        }
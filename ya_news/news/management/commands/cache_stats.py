@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+# Счётчики объявлены в news.cache, импорт их регистрирует.
+import news.cache  # noqa: F401
+from news.stats import STATS_REGISTRY
+
+
+class Command(BaseCommand):
+    help = 'Выводит число попаданий и промахов кешей YaNews.'
+
+    def handle(self, *args, **options):
+        for name, stats in STATS_REGISTRY.items():
+            snapshot = stats.snapshot()
+            self.stdout.write(
+                f'{name}: hits={snapshot["hits"]} '
+                f'misses={snapshot["misses"]} '
+                f'hit_ratio={snapshot["hit_ratio"]}'
+            )
@@ -0,0 +1,43 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from news.models import News
+from news.services import delete_news, delete_user
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет новости или пользователя вместе с комментариями '
+        'партиями, не загружая комментарии в память.'
+    )
+
+    def add_arguments(self, parser):
+        target = parser.add_mutually_exclusive_group(required=True)
+        target.add_argument(
+            '--news', type=int, nargs='+', metavar='ID',
+            help='Идентификаторы удаляемых новостей.'
+        )
+        target.add_argument('--user', help='Имя удаляемого пользователя.')
+        parser.add_argument('--batch-size', type=int)
+
+    def handle(self, *args, **options):
+        if options['news']:
+            total, deleted = delete_news(
+                News.objects.filter(pk__in=options['news']),
+                options['batch_size'],
+            )
+        else:
+            User = get_user_model()
+            try:
+                user = User.objects.get(username=options['user'])
+            except User.DoesNotExist:
+                raise CommandError(
+                    f'Пользователь {options["user"]} не найден.'
+                )
+            total, deleted = delete_user(user, options['batch_size'])
+        details = ', '.join(
+            f'{label}: {count}' for label, count in sorted(deleted.items())
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f'Удалено объектов: {total} ({details})')
+        )
@@ -0,0 +1,144 @@
+import random
+from datetime import date, datetime, time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from news.cache import invalidate_all
+from news.models import Comment, News
+from news.services import recount_comment_counts
+
+WORDS = (
+    'город', 'выпускник', 'робот', 'проект', 'студент', 'новость', 'блог',
+    'приложение', 'конкурс', 'рекурсия', 'сон', 'технология', 'команда',
+    'данные', 'сервер', 'запрос', 'победа', 'открытие', 'курс', 'код',
+)
+PERIOD_DAYS = 3 * 365
+
+
+class Command(BaseCommand):
+    help = (
+        'Детерминированно генерирует пользователей, новости и комментарии '
+        'с реалистичными распределениями.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--news', type=int, default=1000)
+        parser.add_argument('--comments', type=int, default=10000)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--end-date', type=date.fromisoformat, default=date(2025, 1, 1),
+            help='Дата самой свежей новости, от неё отсчитываются остальные.'
+        )
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        with transaction.atomic():
+            users = self.create_users(options['users'], options['seed'])
+            news = self.create_news(options['news'], options['end_date'])
+            self.create_comments(options['comments'], news, users)
+            recount_comment_counts()
+        invalidate_all()
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано: пользователей {len(users)}, новостей {len(news)}, '
+            f'комментариев {options["comments"]}'
+        ))
+
+    def sentence(self, min_words, max_words):
+        words = self.rng.choices(
+            WORDS, k=self.rng.randint(min_words, max_words)
+        )
+        return ' '.join(words).capitalize()
+
+    def create_users(self, count, seed):
+        """
+        Пользователи ``user-{seed}-{номер}`` в порядке номеров.
+
+        При повторном запуске с тем же seed уже созданные пользователи
+        не пересоздаются, а используются снова.
+        """
+        User = get_user_model()
+        password = make_password(None)
+        names = [f'user-{seed}-{index}' for index in range(count)]
+        User.objects.bulk_create(
+            (User(username=name, password=password) for name in names),
+            batch_size=self.batch_size,
+            ignore_conflicts=True,
+        )
+        # ignore_conflicts не возвращает ключей. По префиксу найдутся
+        # и пользователи прошлых запусков с большим --users.
+        pks = dict(User.objects.filter(
+            username__startswith=f'user-{seed}-'
+        ).values_list('username', 'pk'))
+        return [pks[name] for name in names]
+
+    def create_news(self, count, end_date):
+        first_id = (News.objects.order_by('-pk').values_list(
+            'pk', flat=True
+        ).first() or 0) + 1
+        News.objects.bulk_create(
+            (
+                News(
+                    title=self.sentence(2, 5)[:50],
+                    # Длина текста распределена логнормально.
+                    text=self.sentence(
+                        5, max(5, int(self.rng.lognormvariate(3.5, 0.6)))
+                    ),
+                    date=end_date - timedelta(
+                        days=self.rng.randrange(PERIOD_DAYS)
+                    ),
+                )
+                for _ in range(count)
+            ),
+            batch_size=self.batch_size,
+        )
+        return list(News.objects.filter(pk__gte=first_id).values_list(
+            'pk', 'date'
+        ))
+
+    def create_comments(self, count, news, users):
+        if not news or not users:
+            return
+        # Популярность новостей и активность авторов — закон Ципфа.
+        news_weights = self.cumulative_zipf(len(news))
+        user_weights = self.cumulative_zipf(len(users))
+        tz = timezone.get_current_timezone()
+        batch = []
+        for _ in range(count):
+            news_id, date = self.rng.choices(
+                news, cum_weights=news_weights
+            )[0]
+            published = timezone.make_aware(
+                datetime.combine(date, time(9)), tz
+            )
+            batch.append(Comment(
+                news_id=news_id,
+                author_id=self.rng.choices(
+                    users, cum_weights=user_weights
+                )[0],
+                text=self.sentence(3, 30),
+                # Большинство комментариев пишут в первые часы.
+                created=published + timedelta(
+                    minutes=self.rng.expovariate(1 / 180)
+                ),
+            ))
+            if len(batch) >= self.batch_size:
+                Comment.objects.bulk_create(batch)
+                batch = []
+        Comment.objects.bulk_create(batch)
+
+    def cumulative_zipf(self, size, exponent=1.1):
+        ranks = list(range(1, size + 1))
+        self.rng.shuffle(ranks)
+        total = 0
+        weights = []
+        for rank in ranks:
+            total += 1 / rank ** exponent
+            weights.append(total)
+        return weights
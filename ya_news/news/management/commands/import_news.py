@@ -0,0 +1,180 @@
+import json
+import time
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import reset_queries, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from news.cache import invalidate_all
+from news.models import Comment, News
+from news.services import recount_comment_counts
+from news.streaming import iter_json_array
+
+MODELS = {
+    'news.news': News,
+    'news.comment': Comment,
+}
+FOREIGN_KEYS = ('news', 'author')
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоково импортирует новости и комментарии из дампа в формате '
+        'fixtures. Прерванный импорт продолжается с флагом --resume.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', type=Path)
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--resume', action='store_true',
+            help='Продолжить с места, сохранённого в файле прогресса.'
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if not path.is_file():
+            raise CommandError(f'Файл {path} не найден.')
+        self.progress_path = path.with_name(path.name + '.progress')
+        self.batch_size = options['batch_size']
+        progress = {'offset': 0, 'records': 0, 'skipped': 0}
+        if options['resume'] and self.progress_path.exists():
+            progress = json.loads(self.progress_path.read_text())
+        progress.setdefault('duplicates', 0)
+        self.started = time.perf_counter()
+        self.imported = 0
+        news, comments = [], []
+        with path.open('rb') as dump:
+            records = iter_json_array(dump, offset=progress['offset'])
+            for record, offset in records:
+                progress['records'] += 1
+                instance = self.build(record, progress['records'])
+                if instance is None:
+                    progress['skipped'] += 1
+                elif isinstance(instance, News):
+                    news.append(instance)
+                else:
+                    comments.append(instance)
+                if len(news) + len(comments) >= self.batch_size:
+                    self.flush(news, comments, progress, offset)
+                    news, comments = [], []
+            if news or comments:
+                self.flush(news, comments, progress, offset)
+        recount_comment_counts()
+        invalidate_all()
+        self.progress_path.unlink(missing_ok=True)
+        self.stdout.write(self.style.SUCCESS(
+            f'Импортировано {self.imported} записей, '
+            f'пропущено {progress["skipped"]}, '
+            f'повторов {progress["duplicates"]}, {self.rate():.0f} в секунду'
+        ))
+
+    def build(self, record, number):
+        """Объект модели из записи дампа или None, если запись неверна."""
+        model = MODELS.get(record.get('model'))
+        if model is None:
+            self.stderr.write(f'Запись {number}: неизвестная модель.')
+            return None
+        fields = dict(record.get('fields', {}))
+        for name in FOREIGN_KEYS:
+            if name in fields:
+                fields[f'{name}_id'] = fields.pop(name)
+        undated = model is Comment and 'created' not in fields
+        if undated:
+            fields['created'] = timezone.now()
+        try:
+            instance = model(pk=record.get('pk'), **fields)
+            # Время выдано при импорте и при повторе будет другим.
+            instance._undated = undated
+            # Связи проверяются пакетно при записи, а не по одной.
+            instance.clean_fields(exclude=FOREIGN_KEYS)
+        except (TypeError, ValidationError) as error:
+            self.stderr.write(f'Запись {number}: {error}')
+            return None
+        return instance
+
+    def flush(self, news, comments, progress, offset):
+        with transaction.atomic():
+            # Повторная запись после сбоя не должна дублировать строки.
+            News.objects.bulk_create(news, ignore_conflicts=True)
+            comments = self.with_existing_relations(comments, progress)
+            comments = self.without_imported(comments, progress)
+            Comment.objects.bulk_create(comments, ignore_conflicts=True)
+        self.imported += len(news) + len(comments)
+        # В режиме DEBUG Django копит текст всех запросов в памяти.
+        reset_queries()
+        progress['offset'] = offset
+        self.progress_path.write_text(json.dumps(progress))
+        self.stdout.write(
+            f'{progress["records"]} записей, {self.rate():.0f} в секунду'
+        )
+
+    def with_existing_relations(self, comments, progress):
+        """Отбрасывает комментарии к несуществующим новостям и авторам."""
+        news_ids = set(News.objects.filter(
+            pk__in={comment.news_id for comment in comments}
+        ).values_list('pk', flat=True))
+        author_ids = set(get_user_model().objects.filter(
+            pk__in={comment.author_id for comment in comments}
+        ).values_list('pk', flat=True))
+        valid = [
+            comment for comment in comments
+            if comment.news_id in news_ids and comment.author_id in author_ids
+        ]
+        if len(valid) < len(comments):
+            progress['skipped'] += len(comments) - len(valid)
+            self.stderr.write(
+                f'Пропущено комментариев без новости или автора: '
+                f'{len(comments) - len(valid)}'
+            )
+        return valid
+
+    def without_imported(self, comments, progress):
+        """
+        Отбрасывает уже импортированные комментарии без ``pk``.
+
+        Для них ``ignore_conflicts`` не работает: ключ им выдаёт база.
+        Повтор распознаётся по новости, автору, тексту и времени
+        создания, а у комментария без времени — по новости, автору
+        и тексту. Отброшенные повторы попадают в отчёт.
+        """
+        new = [comment for comment in comments if comment.pk is None]
+        if not new:
+            return comments
+        existing = Comment.objects.filter(
+            Q(created__in={
+                comment.created for comment in new if not comment._undated
+            }) | Q(text__in={
+                comment.text for comment in new if comment._undated
+            }),
+            news_id__in={comment.news_id for comment in new},
+            author_id__in={comment.author_id for comment in new},
+        ).values_list('news_id', 'author_id', 'text', 'created')
+        seen = set()
+        for key in existing:
+            seen.update((key, key[:3] + (None,)))
+        unique = []
+        for comment in comments:
+            if comment.pk is None:
+                key = (
+                    comment.news_id, comment.author_id, comment.text,
+                    None if comment._undated else comment.created,
+                )
+                if key in seen:
+                    continue
+                seen.update((key, key[:3] + (None,)))
+            unique.append(comment)
+        if len(unique) < len(comments):
+            progress['duplicates'] += len(comments) - len(unique)
+            self.stderr.write(
+                f'Пропущено повторов комментариев без pk: '
+                f'{len(comments) - len(unique)}'
+            )
+        return unique
+
+    def rate(self):
+        return self.imported / (time.perf_counter() - self.started or 1)
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from news.services import recount_comment_counts
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счётчики комментариев у всех новостей.'
+
+    def handle(self, *args, **options):
+        updated = recount_comment_counts()
+        self.stdout.write(
+            self.style.SUCCESS(f'Обновлено новостей: {updated}')
+        )
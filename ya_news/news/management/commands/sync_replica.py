@@ -0,0 +1,45 @@
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from news.cache import invalidate_all
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирует основную базу SQLite в файлы реплик через backup API: '
+        'копия согласована даже при параллельной записи.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'paths', nargs='*',
+            help='Файлы реплик, по умолчанию из DATABASE_REPLICAS.'
+        )
+        parser.add_argument('--pages', type=int, default=1024, help=(
+            'Сколько страниц копировать за шаг, между шагами '
+            'основная база доступна для записи.'
+        ))
+
+    def handle(self, *args, **options):
+        source = connections[DEFAULT_DB_ALIAS]
+        if source.vendor != 'sqlite':
+            raise CommandError('Копирование поддерживается только для SQLite.')
+        paths = options['paths'] or [
+            connections[alias].settings_dict['NAME']
+            for alias in settings.DATABASE_REPLICAS
+        ]
+        if not paths:
+            raise CommandError('Реплики не настроены.')
+        source.ensure_connection()
+        for path in paths:
+            target = sqlite3.connect(path)
+            try:
+                source.connection.backup(target, pages=options['pages'])
+            finally:
+                target.close()
+            self.stdout.write(self.style.SUCCESS(f'Реплика обновлена: {path}'))
+        # В кеше могли остаться страницы, прочитанные из устаревших копий.
+        invalidate_all()
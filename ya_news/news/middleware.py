@@ -0,0 +1,85 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+from .cache import (
+    NEWS_LIST_NAMESPACE, comments_namespace, get_version, news_namespace,
+    page_stats,
+)
+
+
+def page_namespaces(view_name, view_kwargs):
+    """Пространства имён, от которых зависит страница, или None."""
+    if view_name == 'news:home':
+        return (NEWS_LIST_NAMESPACE,)
+    if view_name == 'news:detail':
+        news_id = view_kwargs['pk']
+        return (news_namespace(news_id), comments_namespace(news_id))
+    return None
+
+
+class AnonymousPageCacheMiddleware:
+    """
+    Кеширует целые ответы главной и страницы новости для анонимов.
+
+    Авторизованные пользователи всегда получают свежую страницу.
+    Ключ записи включает версии новости и её комментариев, поэтому
+    запись становится недействительной ровно тогда, когда они меняются.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        key = getattr(request, 'page_cache_key', None)
+        if key is not None and self.is_cacheable(response):
+            cache.set(
+                key,
+                (response.content, response.status_code,
+                 dict(response.items())),
+                settings.PAGE_CACHE_TIMEOUT,
+            )
+            response['X-Page-Cache'] = 'MISS'
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return None
+        if request.user.is_authenticated:
+            return None
+        namespaces = page_namespaces(
+            request.resolver_match.view_name, view_kwargs
+        )
+        if namespaces is None:
+            return None
+        key = self.make_key(namespaces, request.get_full_path())
+        cached = cache.get(key)
+        if cached is None:
+            page_stats.miss()
+            request.page_cache_key = key
+            return None
+        page_stats.hit()
+        content, status, headers = cached
+        response = HttpResponse(content, status=status, headers=headers)
+        response['X-Page-Cache'] = 'HIT'
+        return response
+
+    @staticmethod
+    def make_key(namespaces, path):
+        versions = ':'.join(
+            f'{namespace}={get_version(namespace)}'
+            for namespace in namespaces
+        )
+        digest = hashlib.md5(f'{versions}:{path}'.encode()).hexdigest()
+        return f'page:{digest}'
+
+    @staticmethod
+    def is_cacheable(response):
+        return (
+            response.status_code == 200
+            and not response.streaming
+            and not response.cookies
+        )
@@ -0,0 +1,73 @@
+from django.db import migrations
+
+# unicode61 не считает «ё» буквой «е» с диакритикой, поэтому в индекс
+# попадает текст с заменой «ё» на «е». Та же замена делается в запросе.
+TITLE = "replace(replace({}.title, 'ё', 'е'), 'Ё', 'Е')"
+TEXT = "replace(replace({}.text, 'ё', 'е'), 'Ё', 'Е')"
+NEW = f"{TITLE.format('new')}, {TEXT.format('new')}"
+OLD = f"{TITLE.format('old')}, {TEXT.format('old')}"
+
+CREATE_SQL = (
+    """
+    CREATE VIRTUAL TABLE news_news_fts USING fts5(
+        title, text,
+        content='news_news', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    f"""
+    CREATE TRIGGER news_news_fts_insert AFTER INSERT ON news_news BEGIN
+        INSERT INTO news_news_fts(rowid, title, text)
+        VALUES (new.id, {NEW});
+    END
+    """,
+    f"""
+    CREATE TRIGGER news_news_fts_delete AFTER DELETE ON news_news BEGIN
+        INSERT INTO news_news_fts(news_news_fts, rowid, title, text)
+        VALUES ('delete', old.id, {OLD});
+    END
+    """,
+    f"""
+    CREATE TRIGGER news_news_fts_update AFTER UPDATE OF title, text
+    ON news_news BEGIN
+        INSERT INTO news_news_fts(news_news_fts, rowid, title, text)
+        VALUES ('delete', old.id, {OLD});
+        INSERT INTO news_news_fts(rowid, title, text)
+        VALUES (new.id, {NEW});
+    END
+    """,
+    f"""
+    INSERT INTO news_news_fts(rowid, title, text)
+    SELECT id, {TITLE.format('news_news')}, {TEXT.format('news_news')}
+    FROM news_news
+    """,
+)
+
+DROP_SQL = (
+    'DROP TRIGGER IF EXISTS news_news_fts_insert',
+    'DROP TRIGGER IF EXISTS news_news_fts_delete',
+    'DROP TRIGGER IF EXISTS news_news_fts_update',
+    'DROP TABLE IF EXISTS news_news_fts',
+)
+
+
+def run_on_sqlite(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0004_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_on_sqlite(CREATE_SQL), run_on_sqlite(DROP_SQL)
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 3.2.15 on 2026-10-18 05:30
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0006_comment_created_idx'),
+    ]
+
+    # Значение по умолчанию задаёт Django, а не база: столбец не меняется,
+    # и пересоздавать большую таблицу комментариев не нужно.
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='comment',
+                    name='created',
+                    field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,64 @@
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import BadRequest
+from django.utils.dateparse import parse_datetime
+
+from .models import Comment
+
+CURSOR_SALT = 'news.pagination.cursor'
+
+
+def encode_cursor(*values, salt=CURSOR_SALT):
+    """Упаковывает значения ключа страницы в непрозрачную строку."""
+    return signing.dumps(values, salt=salt, compress=True)
+
+
+def decode_cursor(cursor, types, salt=CURSOR_SALT):
+    """
+    Распаковывает курсор со значениями типов ``types``.
+
+    Подделанный курсор, как и подписанный курсор другой формы,
+    приводит к ответу 400, а не к ошибке при разборе ключа.
+    """
+    try:
+        values = signing.loads(cursor, salt=salt)
+    except signing.BadSignature:
+        values = None
+    if not (
+        isinstance(values, list)
+        and len(values) == len(types)
+        and all(map(isinstance, values, types))
+    ):
+        raise BadRequest('Некорректный курсор.')
+    return values
+
+
+def comments_page(news_id, cursor=None, limit=None):
+    """
+    Страница комментариев новости по ключу ``(created, id)``.
+
+    Возвращает список комментариев и курсор следующей страницы
+    (``None``, если страница последняя). Стоимость запроса не зависит
+    от того, насколько далеко читатель пролистал обсуждение.
+    """
+    limit = limit or settings.COMMENTS_PER_PAGE
+    comments = Comment.objects.filter(news_id=news_id).select_related(
+        'author'
+    ).order_by('created', 'id')
+    if cursor:
+        created, last_id = decode_cursor(cursor, (str, int))
+        try:
+            created = parse_datetime(created)
+        except ValueError:
+            created = None
+        if created is None:
+            raise BadRequest('Некорректный курсор.')
+        comments = comments.filter(created__gte=created).exclude(
+            created=created, id__lte=last_id
+        )
+    page = list(comments[:limit + 1])
+    if len(page) <= limit:
+        return page, None
+    page = page[:limit]
+    last = page[-1]
+    return page, encode_cursor(last.created.isoformat(), last.id)
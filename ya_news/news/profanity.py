@@ -0,0 +1,94 @@
+"""
+Поиск запрещённых слов за один проход по тексту.
+
+Словарь компилируется в автомат Ахо — Корасик, поэтому время проверки
+зависит от длины комментария, а не от размера словаря. Текст и словарь
+одинаково нормализуются: регистр, «ё» и латинские буквы, похожие
+на кириллические.
+"""
+from collections import deque
+
+LOOKALIKES = str.maketrans({
+    'ё': 'е',
+    'a': 'а',
+    'b': 'в',
+    'c': 'с',
+    'e': 'е',
+    'h': 'н',
+    'k': 'к',
+    'm': 'м',
+    'o': 'о',
+    'p': 'р',
+    't': 'т',
+    'x': 'х',
+    'y': 'у',
+})
+
+
+def normalize(text):
+    """Приводит текст к виду, в котором сравниваются слова."""
+    return text.lower().translate(LOOKALIKES)
+
+
+def read_lexicon(path):
+    """Слова из файла: по одному в строке, ``#`` начинает комментарий."""
+    with open(path, encoding='utf-8') as lexicon:
+        for line in lexicon:
+            word = line.split('#', 1)[0].strip()
+            if word:
+                yield word
+
+
+class WordMatcher:
+    """Автомат Ахо — Корасик для проверки вхождения любого из слов."""
+
+    def __init__(self, words):
+        self.transitions = [{}]
+        self.terminal = [False]
+        for word in words:
+            self._add(normalize(word))
+        self._link()
+
+    def _add(self, word):
+        if not word:
+            return
+        state = 0
+        for char in word:
+            next_state = self.transitions[state].get(char)
+            if next_state is None:
+                next_state = len(self.transitions)
+                self.transitions[state][char] = next_state
+                self.transitions.append({})
+                self.terminal.append(False)
+            state = next_state
+        self.terminal[state] = True
+
+    def _link(self):
+        """Строит суффиксные ссылки обходом в ширину."""
+        self.fail = [0] * len(self.transitions)
+        queue = deque(self.transitions[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.transitions[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and char not in self.transitions[fallback]:
+                    fallback = self.fail[fallback]
+                link = self.transitions[fallback].get(char, 0)
+                self.fail[next_state] = link if link != next_state else 0
+                if self.terminal[self.fail[next_state]]:
+                    self.terminal[next_state] = True
+
+    def search(self, text):
+        """Есть ли в тексте хотя бы одно слово из словаря."""
+        transitions, fail, terminal = (
+            self.transitions, self.fail, self.terminal
+        )
+        state = 0
+        for char in normalize(text):
+            while state and char not in transitions[state]:
+                state = fail[state]
+            state = transitions[state].get(char, 0)
+            if terminal[state]:
+                return True
+        return False
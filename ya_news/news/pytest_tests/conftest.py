@@ -1,11 +1,97 @@
+import os
 from datetime import timedelta
+from io import StringIO
 
 import pytest
 from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connections
+from django.test import override_settings
 from django.test.client import Client
 from django.utils import timezone
 
 from news.models import Comment, News
+from news.queries import over_budget, record_requests
+from news.services import recount_comment_counts
+from news.stats import reset_stats
+
+
+@pytest.fixture(autouse=True, scope='session')
+def cache_dir(tmp_path_factory):
+    """
+    Тесты пишут в отдельный каталог кеша, а не в кеш сервера.
+
+    Каталог передаётся и дочерним процессам через YANEWS_CACHE_DIR.
+    """
+    location = str(tmp_path_factory.mktemp('cache'))
+    os.environ['YANEWS_CACHE_DIR'] = location
+    caches = {
+        'default': {**settings.CACHES['default'], 'LOCATION': location},
+        'stats': {
+            **settings.CACHES['stats'],
+            'LOCATION': os.path.join(location, 'stats'),
+        },
+    }
+    with override_settings(CACHES=caches):
+        yield location
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Кеш и счётчики не должны переживать отдельный тест."""
+    cache.clear()
+    reset_stats()
+
+
+@pytest.fixture(autouse=True)
+def query_budget(request):
+    """
+    Проверяет, что представления укладываются в бюджет SQL-запросов.
+
+    Бюджеты берутся из ``settings.QUERY_BUDGETS``, маркер
+    ``query_budget`` переопределяет их для отдельного теста:
+    ``@pytest.mark.query_budget(**{'news:home': 2})``.
+    """
+    budgets = dict(settings.QUERY_BUDGETS)
+    marker = request.node.get_closest_marker('query_budget')
+    if marker:
+        budgets.update(marker.kwargs)
+    with record_requests() as records:
+        yield
+    exceeded = over_budget(records, budgets)
+    if exceeded:
+        pytest.fail('\n'.join(
+            f'{record.view_name} ({record.path}): {record.count} '
+            f'запросов при бюджете {budgets[record.view_name]}'
+            for record in exceeded
+        ))
+
+
+@pytest.fixture
+def file_replica(transactional_db, settings, tmp_path):
+    """
+    Реплика — файловая копия тестовой базы, созданная ``sync_replica``.
+
+    В отличие от зеркала из настроек, реплика не видит записей
+    в основную базу до следующей синхронизации. Фикстура возвращает
+    функцию, которая синхронизирует копию.
+    """
+    alias = 'file_replica'
+    connections.databases[alias] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': str(tmp_path / 'replica.sqlite3'),
+    }
+    settings.DATABASE_REPLICAS = [alias]
+
+    def sync():
+        call_command('sync_replica', stdout=StringIO())
+
+    sync()
+    yield sync
+    connections[alias].close()
+    del connections[alias]
+    del connections.databases[alias]
 
 
 @pytest.fixture
@@ -84,6 +170,8 @@ def comments(news, author):
         ) for index in range(10)
     ]
     Comment.objects.bulk_create(comments)
+    # bulk_create не отправляет сигналы, поэтому счётчик пересчитываем.
+    recount_comment_counts()
 
 
 @pytest.fixture
@@ -0,0 +1,238 @@
+import json
+import subprocess
+import sys
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.conf import settings
+from django.db.models import Sum
+from django.urls import reverse
+
+from news.models import Comment, News
+from news.urls import urlpatterns
+
+
+def generate(**options):
+    call_command('generate_data', stdout=StringIO(), **options)
+
+
+def snapshot():
+    return (
+        list(News.objects.order_by('date', 'title', 'text').values_list(
+            'title', 'text', 'date', 'comment_count'
+        )),
+        sorted(Comment.objects.values_list('text', 'created')),
+    )
+
+
+@pytest.mark.django_db
+def test_generate_data_creates_requested_volume():
+    """Команда создаёт заданное число объектов и верные счётчики."""
+    generate(users=3, news=5, comments=40)
+
+    assert get_user_model().objects.count() == 3
+    assert News.objects.count() == 5
+    assert Comment.objects.count() == 40
+    assert News.objects.aggregate(
+        total=Sum('comment_count')
+    )['total'] == 40
+
+
+@pytest.mark.django_db
+def test_generate_data_is_deterministic():
+    """При одинаковом seed генерируются одинаковые данные."""
+    generate(users=3, news=5, comments=40, seed=7)
+    first = snapshot()
+    get_user_model().objects.all().delete()
+    News.objects.all().delete()
+
+    generate(users=3, news=5, comments=40, seed=7)
+
+    assert snapshot() == first
+
+
+@pytest.mark.django_db
+def test_generate_data_reuses_users_of_same_seed():
+    """Повторный запуск с тем же seed использует созданных пользователей."""
+    generate(users=3, news=5, comments=40, seed=7)
+    last_pk = Comment.objects.order_by('-pk').values_list(
+        'pk', flat=True
+    ).first()
+
+    generate(users=2, news=5, comments=40, seed=7)
+
+    assert get_user_model().objects.count() == 3
+    assert Comment.objects.count() == 80
+    assert set(Comment.objects.filter(
+        pk__gt=last_pk
+    ).values_list('author__username', flat=True)) <= {'user-7-0', 'user-7-1'}
+
+
+@pytest.mark.django_db
+def test_benchmark_routes_covers_every_route(tmp_path):
+    """Отчёт бенчмарка содержит каждый маршрут news.urls."""
+    generate(users=3, news=5, comments=40)
+    output = tmp_path / 'report.json'
+
+    call_command(
+        'benchmark_routes', requests=2, output=output, stdout=StringIO()
+    )
+
+    report = json.loads(output.read_text())
+    assert set(report) == {pattern.name for pattern in urlpatterns}
+    assert all(route['p99_ms'] >= route['p50_ms'] for route in report.values())
+
+
+@pytest.mark.django_db
+def test_import_news_loads_fixture():
+    """Импорт дампа в формате fixtures создаёт все новости."""
+    fixture = settings.BASE_DIR / 'news' / 'fixtures' / 'news.json'
+    records = json.loads(fixture.read_text(encoding='utf-8'))
+
+    call_command('import_news', fixture, stdout=StringIO())
+
+    assert News.objects.count() == len(records)
+
+
+@pytest.mark.django_db
+def test_import_news_resumes_and_skips_invalid(tmp_path, author):
+    """Импорт продолжается с сохранённого смещения, неверное пропускает."""
+    records = [
+        {'model': 'news.news', 'pk': index, 'fields': {
+            'title': f'Новость {index}', 'text': 'Текст', 'date': '2024-01-01'
+        }}
+        for index in (1, 2, 3)
+    ] + [
+        {'model': 'news.comment', 'fields': {
+            'news': news_id, 'author': author.id, 'text': 'Комментарий',
+            'created': '2024-01-02T10:00:00Z',
+        }}
+        for news_id in (3, 404)
+    ]
+    dump = tmp_path / 'dump.json'
+    content = json.dumps(records, ensure_ascii=False)
+    dump.write_text(content, encoding='utf-8')
+    first_record_end = content.index('}}') + len('}}')
+    progress = tmp_path / 'dump.json.progress'
+    progress.write_text(json.dumps({
+        'offset': len(content[:first_record_end].encode('utf-8')),
+        'records': 1,
+        'skipped': 0,
+    }))
+
+    call_command(
+        'import_news', dump, resume=True, stdout=StringIO(), stderr=StringIO()
+    )
+
+    assert list(News.objects.order_by('pk').values_list('pk', flat=True)) == [
+        2, 3
+    ]
+    comment = Comment.objects.get()
+    assert comment.created.isoformat() == '2024-01-02T10:00:00+00:00'
+    assert News.objects.get(pk=3).comment_count == 1
+    assert not progress.exists()
+
+
+@pytest.mark.django_db
+def test_import_news_replay_keeps_comments_unique(tmp_path, news, author):
+    """Повторный импорт не дублирует комментарии без pk."""
+    comment = {'news': news.id, 'author': author.id, 'text': 'Комментарий'}
+    records = [
+        {'model': 'news.comment', 'fields': {
+            **comment, 'created': '2024-01-02T10:00:00Z',
+        }},
+        {'model': 'news.comment', 'fields': comment},
+    ]
+    dump = tmp_path / 'dump.json'
+    dump.write_text(json.dumps(records), encoding='utf-8')
+
+    stdout = StringIO()
+    for _ in range(2):
+        call_command('import_news', dump, stdout=stdout, stderr=StringIO())
+
+    assert Comment.objects.count() == 1
+    assert News.objects.get(pk=news.id).comment_count == 1
+    # Комментарий без времени совпал с первым по тексту, при повторе
+    # совпали оба.
+    assert 'повторов 1,' in stdout.getvalue()
+    assert 'повторов 2,' in stdout.getvalue()
+
+
+@pytest.mark.django_db
+def test_import_news_keeps_comments_with_different_text(
+    tmp_path, news, author
+):
+    """Комментарии без pk с одним временем, но разным текстом не сливаются."""
+    records = [
+        {'model': 'news.comment', 'fields': {
+            'news': news.id, 'author': author.id, 'text': text,
+            'created': '2024-01-02T10:00:00Z',
+        }}
+        for text in ('Первый', 'Второй')
+    ] + [
+        {'model': 'news.comment', 'fields': {
+            'news': news.id, 'author': author.id, 'text': 'Без времени',
+        }}
+    ]
+    dump = tmp_path / 'dump.json'
+    dump.write_text(json.dumps(records), encoding='utf-8')
+
+    call_command('import_news', dump, stdout=StringIO(), stderr=StringIO())
+
+    assert set(Comment.objects.values_list('text', flat=True)) == {
+        'Первый', 'Второй', 'Без времени'
+    }
+
+
+@pytest.mark.django_db
+def test_chunked_delete_removes_news_and_comments():
+    """Команда удаляет новости вместе со всеми комментариями."""
+    generate(users=3, news=5, comments=40)
+    doomed = list(News.objects.values_list('pk', flat=True)[:2])
+    expected = Comment.objects.exclude(news__in=doomed).count()
+
+    call_command(
+        'chunked_delete', news=doomed, batch_size=7, stdout=StringIO()
+    )
+
+    assert News.objects.count() == 3
+    assert Comment.objects.count() == expected
+
+
+def test_chunked_delete_writes_to_primary_with_replica(file_replica):
+    """С настроенной репликой комментарии удаляются из основной базы."""
+    generate(users=3, news=5, comments=40)
+    file_replica()
+    doomed = list(News.objects.values_list('pk', flat=True)[:2])
+    expected = Comment.objects.using('default').exclude(
+        news__in=doomed
+    ).count()
+
+    call_command(
+        'chunked_delete', news=doomed, batch_size=7, stdout=StringIO()
+    )
+
+    assert News.objects.using('default').count() == 3
+    assert Comment.objects.using('default').count() == expected
+    # Реплика меняется только синхронизацией.
+    assert Comment.objects.using('file_replica').count() == 40
+
+
+@pytest.mark.django_db
+def test_cache_stats_sees_counters_of_other_processes(
+    client, news, settings
+):
+    """Команда в отдельном процессе видит попадания, записанные сервером."""
+    settings.CACHE_STATS_FLUSH_SECONDS = 0
+    url = reverse('news:detail', args=(news.id,))
+    client.get(url)
+    client.get(url)
+
+    output = subprocess.run(
+        [sys.executable, 'manage.py', 'cache_stats'],
+        cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+    ).stdout
+
+    assert 'pages: hits=1 misses=1 hit_ratio=0.5' in output
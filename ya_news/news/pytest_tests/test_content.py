@@ -1,8 +1,20 @@
+import json
+from datetime import timedelta
+from http import HTTPStatus
+
 import pytest
 from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 
+from news.autocomplete import TitleIndex, title_index
+from news.cache import comments_stats
 from news.forms import CommentForm
+from news.models import Comment, News
+from news.pagination import encode_cursor
+from news.search import CURSOR_SALT as SEARCH_CURSOR_SALT
 
 
 @pytest.mark.django_db
@@ -30,6 +42,21 @@ def test_news_order(client, news_list):
     assert all_dates == sorted_dates
 
 
+@pytest.mark.django_db
+def test_home_page_does_not_load_comments(client, news, comments):
+    """Число комментариев на главной выводится без запросов к комментариям."""
+    url = reverse('news:home')
+
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    news_from_page = response.context['object_list'][0]
+
+    assert not any(
+        'news_comment' in query['sql'] for query in queries.captured_queries
+    )
+    assert news_from_page.comment_count == news.comment_set.count()
+
+
 @pytest.mark.django_db
 def test_comments_order(client, news, comments):
     """Сортировка комментариев по времени создания в порядке возрастания."""
@@ -43,6 +70,214 @@ def test_comments_order(client, news, comments):
     assert all_timestamps == sorted_timestamps
 
 
+@pytest.mark.django_db
+def test_comments_are_paginated_by_cursor(client, news, comments, settings):
+    """Комментарии отдаются страницами, следующие — по курсору."""
+    settings.COMMENTS_PER_PAGE = 4
+    url = reverse('news:comments', args=(news.id,))
+
+    seen_ids = []
+    cursor = ''
+    pages = 0
+    while cursor is not None:
+        page = client.get(url, {'cursor': cursor}).json()
+        seen_ids += [comment['id'] for comment in page['comments']]
+        cursor = page['next']
+        pages += 1
+
+    expected_ids = list(
+        news.comment_set.order_by('created', 'id').values_list('id', flat=True)
+    )
+    assert seen_ids == expected_ids
+    assert pages == 3
+
+
+@pytest.mark.django_db
+def test_forged_cursor_is_rejected(client, news_id_for_args):
+    """Подделанный курсор приводит к ответу 400."""
+    url = reverse('news:comments', args=news_id_for_args)
+
+    response = client.get(url, {'cursor': 'forged'})
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    'name, cursor',
+    (
+        ('news:comments', encode_cursor(1.5, 2, salt=SEARCH_CURSOR_SALT)),
+        ('news:comments', encode_cursor('вчера', 2)),
+        ('news:comments', encode_cursor(1)),
+        ('news:search', encode_cursor('2025-01-01T00:00:00', 2)),
+        ('news:search', encode_cursor('1.5', 2, salt=SEARCH_CURSOR_SALT)),
+    ),
+)
+def test_cursor_of_other_shape_is_rejected(client, news, name, cursor):
+    """Подписанный курсор другого списка или формы даёт ответ 400."""
+    args = (news.pk,) if name == 'news:comments' else None
+
+    response = client.get(
+        reverse(name, args=args), {'q': 'заголовок', 'cursor': cursor}
+    )
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_comments_block_is_cached_until_comment_changes(
+    not_author_client, news, comment
+):
+    """Блок комментариев берётся из кеша, пока комментарии не изменятся."""
+    url = reverse('news:detail', args=(news.id,))
+    not_author_client.get(url)
+    before = comments_stats.snapshot()
+
+    not_author_client.get(url)
+    comment.text = 'Обновлённый текст'
+    comment.save()
+    response = not_author_client.get(url)
+
+    after = comments_stats.snapshot()
+    assert after['hits'] - before['hits'] == 1
+    assert after['misses'] - before['misses'] == 1
+    assert 'Обновлённый текст' in response.content.decode()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    'parametrized_client, controls_visible',
+    (
+        (pytest.lazy_fixture('author_client'), True),
+        (pytest.lazy_fixture('not_author_client'), False),
+        (pytest.lazy_fixture('client'), False),
+    ),
+)
+def test_comment_controls_only_for_author(
+    parametrized_client, controls_visible, news_id_for_args,
+    comment_id_for_args
+):
+    """Ссылки управления комментарием видит только его автор."""
+    url = reverse('news:detail', args=news_id_for_args)
+    edit_url = reverse('news:edit', args=comment_id_for_args)
+
+    response = parametrized_client.get(url)
+
+    assert (edit_url in response.content.decode()) == controls_visible
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    'name, args',
+    (
+        ('news:home', None),
+        ('news:detail', pytest.lazy_fixture('news_id_for_args')),
+    ),
+)
+def test_anonymous_pages_are_cached(client, name, args):
+    """Повторный анонимный запрос обслуживается из кеша страниц."""
+    url = reverse(name, args=args)
+
+    first = client.get(url)
+    second = client.get(url)
+
+    assert first['X-Page-Cache'] == 'MISS'
+    assert second['X-Page-Cache'] == 'HIT'
+    assert second.content == first.content
+
+
+@pytest.mark.django_db
+def test_authorized_client_bypasses_page_cache(
+    not_author_client, news_id_for_args
+):
+    """Авторизованный пользователь всегда получает свежую страницу."""
+    url = reverse('news:detail', args=news_id_for_args)
+
+    not_author_client.get(url)
+    response = not_author_client.get(url)
+
+    assert 'X-Page-Cache' not in response
+
+
+@pytest.mark.django_db
+def test_page_cache_is_invalidated_by_changes(client, author, news):
+    """Новый комментарий и правка новости сбрасывают кеш страниц."""
+    detail_url = reverse('news:detail', args=(news.id,))
+    home_url = reverse('news:home')
+    client.get(detail_url)
+    client.get(home_url)
+
+    Comment.objects.create(news=news, author=author, text='Свежий')
+    detail = client.get(detail_url)
+    home = client.get(home_url)
+    news.title = 'Новый заголовок'
+    news.save()
+    detail_after_edit = client.get(detail_url)
+
+    assert detail['X-Page-Cache'] == 'MISS'
+    assert 'Свежий' in detail.content.decode()
+    assert home['X-Page-Cache'] == 'MISS'
+    assert detail_after_edit['X-Page-Cache'] == 'MISS'
+    assert 'Новый заголовок' in detail_after_edit.content.decode()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    'name, args',
+    (
+        ('news:home', None),
+        ('news:detail', pytest.lazy_fixture('news_id_for_args')),
+    ),
+)
+def test_unchanged_page_is_not_modified(not_author_client, name, args):
+    """Неизменившаяся страница отдаётся ответом 304 без рендеринга."""
+    url = reverse(name, args=args)
+    etag = not_author_client.get(url)['ETag']
+
+    response = not_author_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    assert not response.templates
+
+
+@pytest.mark.django_db
+def test_comment_edit_changes_etag(author_client, comment, form_data):
+    """Правка комментария меняет ETag страницы новости."""
+    url = reverse('news:detail', args=(comment.news_id,))
+    etag = author_client.get(url)['ETag']
+
+    author_client.post(reverse('news:edit', args=(comment.id,)), form_data)
+    response = author_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == HTTPStatus.OK
+    assert response['ETag'] != etag
+
+
+@pytest.mark.django_db
+def test_new_login_changes_etag(author_client, author, news_id_for_args):
+    """После нового входа страница с новым CSRF-токеном отдаётся целиком."""
+    url = reverse('news:detail', args=news_id_for_args)
+    etag = author_client.get(url)['ETag']
+
+    author_client.logout()
+    author_client.force_login(author)
+    response = author_client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == HTTPStatus.OK
+    assert response['ETag'] != etag
+
+
+@pytest.mark.django_db
+def test_cached_anonymous_page_is_not_modified(client, news_id_for_args):
+    """Ответ из кеша страниц тоже учитывает If-None-Match."""
+    url = reverse('news:detail', args=news_id_for_args)
+    etag = client.get(url)['ETag']
+
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+
 @pytest.mark.django_db
 def test_anonymous_client_has_no_form(client, news_id_for_args):
     """Анонимный пользователь не видит форму добавления комментариев."""
@@ -62,3 +297,296 @@ def test_authorized_client_has_form(not_author_client, news_id_for_args):
 
     assert 'form' in response.context
     assert isinstance(response.context['form'], CommentForm)
+
+
+@pytest.mark.django_db
+def test_search_ranks_title_matches_first(client):
+    """Совпадение в заголовке ранжируется выше совпадения в тексте."""
+    in_text = News.objects.create(title='Погода', text='Ёлки и робототехника')
+    in_title = News.objects.create(title='Роботы на заводе', text='Текст')
+    News.objects.create(title='Спорт', text='Ничего интересного')
+
+    response = client.get(reverse('news:search'), {'q': 'елки робот'})
+    assert list(response.context['results']) == [in_text]
+
+    response = client.get(reverse('news:search'), {'q': 'робот'})
+    assert list(response.context['results']) == [in_title, in_text]
+
+
+@pytest.mark.django_db
+def test_search_index_follows_changes(client, news):
+    """Триггеры обновляют индекс при изменении и удалении новости."""
+    url = reverse('news:search')
+    news.title = 'Космодром'
+    news.save()
+
+    assert list(client.get(url, {'q': 'космодром'}).context['results']) == [
+        news
+    ]
+    assert not client.get(url, {'q': 'заголовок'}).context['results']
+    news.delete()
+    assert not client.get(url, {'q': 'космодром'}).context['results']
+
+
+@pytest.mark.django_db
+def test_search_is_paginated_by_cursor(client, settings):
+    """Результаты поиска листаются по курсору без повторов."""
+    settings.SEARCH_RESULTS_PER_PAGE = 3
+    News.objects.bulk_create(
+        News(title=f'Выпуск {index}', text='Новости ' * index)
+        for index in range(1, 8)
+    )
+    url = reverse('news:search')
+
+    seen = []
+    cursor = ''
+    while cursor is not None:
+        context = client.get(url, {'q': 'новости', 'cursor': cursor}).context
+        seen += [news.pk for news in context['results']]
+        cursor = context['next_cursor']
+
+    assert sorted(seen) == sorted(News.objects.values_list('pk', flat=True))
+    assert len(seen) == len(set(seen))
+
+
+@pytest.mark.django_db
+def test_autocomplete_folds_case_and_yo(client):
+    """Подсказки не зависят от регистра и написания «ё»."""
+    News.objects.create(title='Ёжик в тумане', text='Текст')
+    News.objects.create(title='Ежевика созрела', text='Текст')
+    News.objects.create(title='Погода', text='Текст')
+    url = reverse('news:autocomplete')
+
+    titles = [
+        item['title'] for item in client.get(url, {'q': 'ЕЖ'}).json()[
+            'results'
+        ]
+    ]
+
+    assert titles == ['Ежевика созрела', 'Ёжик в тумане']
+
+
+@pytest.mark.django_db
+def test_autocomplete_follows_changes_without_queries(
+    client, news, django_capture_on_commit_callbacks
+):
+    """После фиксации индекс обновляется сигналами, без запросов к БД."""
+    url = reverse('news:autocomplete')
+    client.get(url, {'q': 'заг'})
+    with django_capture_on_commit_callbacks(execute=True):
+        news.title = 'Космос'
+        news.save()
+        added = News.objects.create(title='Космодром', text='Текст')
+
+    with CaptureQueriesContext(connection) as queries:
+        results = client.get(url, {'q': 'косм'}).json()['results']
+    assert len(queries) == 0
+    assert [item['id'] for item in results] == [added.id, news.id]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        news.delete()
+    assert not client.get(url, {'q': 'заг'}).json()['results']
+    assert [
+        item['id'] for item in client.get(url, {'q': 'косм'}).json()[
+            'results'
+        ]
+    ] == [added.id]
+
+
+@pytest.mark.django_db
+def test_autocomplete_index_of_other_process_is_rebuilt(
+    news, django_capture_on_commit_callbacks
+):
+    """Индекс другого процесса перестраивается, откат не виден."""
+    other = TitleIndex()
+    other.lookup('заг')
+    title_index.lookup('заг')
+    with django_capture_on_commit_callbacks(execute=True):
+        with pytest.raises(DatabaseError):
+            with transaction.atomic():
+                News.objects.create(title='Фантом', text='Текст')
+                raise DatabaseError
+        news.title = 'Космос'
+        news.save()
+
+    assert other.lookup('косм') == [(news.id, 'Космос')]
+    assert not title_index.lookup('фант')
+
+
+@pytest.mark.django_db
+def test_admin_news_page_is_paginated(admin_client, news, author):
+    """Страница новости в админке не зависит от числа комментариев."""
+    url = reverse('admin:news_news_change', args=(news.id,))
+    Comment.objects.create(news=news, author=author, text='Первый')
+    admin_client.get(url)
+    with CaptureQueriesContext(connection) as few:
+        admin_client.get(url)
+
+    Comment.objects.bulk_create(
+        Comment(news=news, author=author, text=f'Текст {index}')
+        for index in range(60)
+    )
+    with CaptureQueriesContext(connection) as many:
+        response = admin_client.get(url, {'comments_page': 2})
+
+    formset = response.context['inline_admin_formsets'][0].formset
+    assert len(formset.forms) == formset.per_page
+    assert formset.page_obj.number == 2
+    assert len(many) == len(few)
+
+
+@pytest.mark.django_db
+def test_admin_comment_pages_are_elided(admin_client, news, author):
+    """Ссылок на страницы комментариев немного и у большого обсуждения."""
+    url = reverse('admin:news_news_change', args=(news.id,))
+    Comment.objects.bulk_create(
+        Comment(news=news, author=author, text=f'Текст {index}')
+        for index in range(600)
+    )
+
+    content = admin_client.get(url, {'comments_page': 15}).content.decode()
+
+    assert content.count('?comments_page=') == 10
+    assert '…' in content
+
+
+@pytest.mark.django_db
+def test_admin_news_changelist_has_no_n_plus_one(admin_client):
+    """Список новостей в админке выполняет постоянное число запросов."""
+    url = reverse('admin:news_news_changelist')
+    News.objects.create(title='Новость', text='Текст')
+    admin_client.get(url)
+    with CaptureQueriesContext(connection) as few:
+        admin_client.get(url)
+
+    News.objects.bulk_create(
+        News(title=f'Новость {index}', text='Текст') for index in range(30)
+    )
+    with CaptureQueriesContext(connection) as many:
+        admin_client.get(url)
+
+    assert len(many) == len(few)
+
+
+def read_ndjson(response):
+    return [
+        json.loads(line)
+        for line in b''.join(response.streaming_content).splitlines()
+    ]
+
+
+@pytest.mark.django_db
+def test_export_news_streams_comments(client, news, comments, settings):
+    """Выгрузка новостей: комментарии читаются одним запросом на пачку."""
+    settings.EXPORT_CHUNK_SIZE = 2
+    News.objects.bulk_create(
+        News(title=f'Новость {index}', text='Текст') for index in range(4)
+    )
+
+    response = client.get(reverse('news:export_news'))
+    with CaptureQueriesContext(connection) as queries:
+        rows = read_ndjson(response)
+
+    assert response['Content-Type'].startswith('application/x-ndjson')
+    assert len(rows) == News.objects.count()
+    # Новости читаются одним курсором, комментарии — по запросу
+    # на каждую из трёх пачек.
+    assert len(queries) == 1 + 3
+    exported = next(row for row in rows if row['id'] == news.pk)
+    assert [comment['text'] for comment in exported['comments']] == [
+        comment.text for comment in news.comment_set.order_by('created')
+    ]
+
+
+@pytest.mark.django_db
+def test_export_is_filtered_by_watermarks(client, news, comments):
+    """Параметр since отсекает уже выгруженные новости и комментарии."""
+    news.refresh_from_db()
+    old = News.objects.create(
+        title='Старая', text='Текст', date=news.date - timedelta(days=1)
+    )
+    watermark = news.comment_set.order_by('created')[4].created
+
+    news_rows = read_ndjson(client.get(
+        reverse('news:export_news'), {'since': news.date.isoformat()}
+    ))
+    comment_rows = read_ndjson(client.get(
+        reverse('news:export_comments'), {'since': watermark.isoformat()}
+    ))
+
+    assert old.pk not in [row['id'] for row in news_rows]
+    assert [row['text'] for row in comment_rows] == [
+        f'Текст {index}' for index in range(5, 10)
+    ]
+
+
+@pytest.mark.django_db
+def test_export_comments_resumes_inside_same_timestamp(client, news, author):
+    """Комментарии с одинаковым created не теряются между выгрузками."""
+    created = timezone.now()
+    Comment.objects.bulk_create(
+        Comment(news=news, author=author, text=f'Текст {index}',
+                created=created)
+        for index in range(3)
+    )
+    first = Comment.objects.order_by('id').first()
+
+    rows = read_ndjson(client.get(reverse('news:export_comments'), {
+        'since': created.isoformat(), 'after': first.pk,
+    }))
+
+    assert [row['text'] for row in rows] == ['Текст 1', 'Текст 2']
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('params', (
+    {'since': 'вчера'},
+    {'after': '1'},
+    {'since': '2025-01-01T00:00:00', 'after': 'первый'},
+))
+def test_export_comments_rejects_bad_watermark(client, params):
+    """Некорректный водяной знак комментариев приводит к ответу 400."""
+    response = client.get(reverse('news:export_comments'), params)
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_export_rejects_bad_watermark(client):
+    """Некорректный since приводит к ответу 400."""
+    response = client.get(reverse('news:export_news'), {'since': 'вчера'})
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('name', ('news:feed_rss', 'news:feed_atom'))
+def test_feed_poll_is_not_modified_without_queries(
+    client, news_list, name
+):
+    """Повторный опрос ленты получает 304 без обращения к базе."""
+    url = reverse(name)
+    response = client.get(url)
+
+    with CaptureQueriesContext(connection) as queries:
+        poll = client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+
+    assert response.content.count(b'<title>') == (
+        settings.NEWS_COUNT_ON_HOME_PAGE + 1
+    )
+    assert 'Last-Modified' in response
+    assert poll.status_code == HTTPStatus.NOT_MODIFIED
+    assert len(queries) == 0
+
+
+@pytest.mark.django_db
+def test_feed_follows_comment_count(client, author, news):
+    """Новый комментарий обновляет ленту и её ETag."""
+    url = reverse('news:feed_rss')
+    etag = client.get(url)['ETag']
+
+    Comment.objects.create(news=news, author=author, text='Текст')
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == HTTPStatus.OK
+    assert 'Комментариев: 1' in response.content.decode()
@@ -1,11 +1,17 @@
+from io import StringIO
 from http import HTTPStatus
 
 import pytest
+from django.contrib import admin
+from django.core.management import call_command
 from django.urls import reverse
 from pytest_django.asserts import assertFormError, assertRedirects
 
+from news import forms
+from news.admin import ChunkedDeleteMixin
 from news.forms import BAD_WORDS, WARNING
-from news.models import Comment
+from news.models import Comment, News
+from news.services import delete_user
 
 
 @pytest.mark.django_db
@@ -44,6 +50,43 @@ def test_user_cant_use_bad_words(author_client, news_id_for_args):
     assert Comment.objects.count() == 0
 
 
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    'disguised_word',
+    ('РЕДИСКА', 'рeдискa', 'нeгoдяй', 'Негодяйка'),
+)
+def test_disguised_bad_words_are_caught(
+    author_client, news_id_for_args, disguised_word
+):
+    """Регистр, «ё» и латинские двойники не спасают от фильтра."""
+    url = reverse('news:detail', args=news_id_for_args)
+
+    response = author_client.post(url, data={'text': disguised_word})
+
+    assertFormError(response, 'form', 'text', errors=WARNING)
+    assert Comment.objects.count() == 0
+
+
+@pytest.mark.django_db
+def test_bad_words_from_lexicon_file(
+    author_client, news_id_for_args, settings, tmp_path
+):
+    """Словарь модераторов подгружается из файла."""
+    lexicon = tmp_path / 'bad_words.txt'
+    lexicon.write_text('# словарь\nбрюзга\n', encoding='utf-8')
+    settings.BAD_WORDS_FILE = lexicon
+    forms.reload_bad_words()
+    url = reverse('news:detail', args=news_id_for_args)
+
+    try:
+        response = author_client.post(url, data={'text': 'Вот брюзга!'})
+    finally:
+        settings.BAD_WORDS_FILE = None
+        forms.reload_bad_words()
+
+    assertFormError(response, 'form', 'text', errors=WARNING)
+
+
 @pytest.mark.django_db
 def test_author_can_delete_comment(
     author_client, comment_id_for_args, news_id_for_args
@@ -96,3 +139,77 @@ def test_user_cant_edit_comment_of_another_user(
 
     assert response.status_code == HTTPStatus.NOT_FOUND
     assert Comment.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_comment_count_follows_create_and_delete(
+    author_client, news, form_data
+):
+    """Счётчик комментариев растёт при создании и падает при удалении."""
+    url = reverse('news:detail', args=(news.id,))
+
+    author_client.post(url, data=form_data)
+    news.refresh_from_db()
+    assert news.comment_count == 1
+
+    comment = Comment.objects.get()
+    author_client.post(reverse('news:delete', args=(comment.id,)))
+    news.refresh_from_db()
+    assert news.comment_count == 0
+
+
+@pytest.mark.django_db
+def test_comment_count_after_cascade_delete(author, news, comment):
+    """Каскадное удаление комментариев уменьшает счётчик."""
+    author.delete()
+
+    news.refresh_from_db()
+    assert news.comment_count == 0
+
+
+@pytest.mark.django_db
+def test_recount_comments_command(news, comments):
+    """Команда recount_comments восстанавливает счётчики."""
+    News.objects.update(comment_count=0)
+
+    call_command('recount_comments', stdout=StringIO())
+
+    news.refresh_from_db()
+    assert news.comment_count == news.comment_set.count()
+
+
+@pytest.mark.django_db
+def test_delete_user_keeps_counters(author, not_author, news, settings):
+    """Партионное удаление пользователя уменьшает счётчики новостей."""
+    settings.DELETE_BATCH_SIZE = 3
+    other_news = News.objects.create(title='Другая', text='Текст')
+    for target in (news, news, other_news, news, other_news):
+        Comment.objects.create(news=target, author=author, text='Текст')
+    Comment.objects.create(news=news, author=not_author, text='Текст')
+
+    delete_user(author)
+
+    news.refresh_from_db()
+    other_news.refresh_from_db()
+    assert (news.comment_count, other_news.comment_count) == (1, 0)
+    assert Comment.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_admin_deletes_news_with_comments(admin_client, news, comments):
+    """Удаление новости из админки удаляет её комментарии."""
+    url = reverse('admin:news_news_delete', args=(news.id,))
+
+    summary = f'{Comment._meta.verbose_name_plural}: 10'
+    assert summary in admin_client.get(url).content.decode()
+    admin_client.post(url, {'post': 'yes'})
+
+    assert not News.objects.filter(pk=news.pk).exists()
+    assert Comment.objects.count() == 0
+
+
+def test_chunked_delete_admin_requires_service():
+    """Админка без сервиса удаления не создаётся, а не падает при удалении."""
+    with pytest.raises(TypeError):
+        class BrokenAdmin(ChunkedDeleteMixin, admin.ModelAdmin):
+            comments_lookup = 'news'
@@ -0,0 +1,74 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+pytestmark = pytest.mark.skipif(
+    connection.vendor != 'sqlite',
+    reason='Планы запросов проверяются только для SQLite.',
+)
+
+
+def bad_plan_steps(sql):
+    """Шаги плана с полным просмотром таблицы или временной сортировкой."""
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        steps = [row[-1] for row in cursor.fetchall()]
+    return [
+        step for step in steps
+        if 'TEMP B-TREE' in step
+        or (step.startswith('SCAN ') and ' USING ' not in step)
+    ]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    'name, args',
+    (
+        ('news:home', None),
+        ('news:detail', pytest.lazy_fixture('news_id_for_args')),
+        ('news:comments', pytest.lazy_fixture('news_id_for_args')),
+        ('news:edit', pytest.lazy_fixture('comment_id_for_args')),
+        ('news:delete', pytest.lazy_fixture('comment_id_for_args')),
+    ),
+)
+def test_hot_queries_use_indexes(author_client, comments, name, args):
+    """Запросы представлений не сканируют таблицы и не сортируют на лету."""
+    url = reverse(name, args=args)
+
+    with CaptureQueriesContext(connection) as queries:
+        author_client.get(url)
+    selects = [
+        query['sql'] for query in queries.captured_queries
+        if query['sql'].startswith('SELECT')
+    ]
+
+    assert selects
+    for sql in selects:
+        assert not bad_plan_steps(sql), sql
+
+
+@pytest.mark.django_db
+def test_next_comments_page_uses_index(client, news, comments, settings):
+    """Страница комментариев по курсору читается по составному индексу."""
+    settings.COMMENTS_PER_PAGE = 3
+    url = reverse('news:comments', args=(news.id,))
+    cursor = client.get(url).json()['next']
+
+    with CaptureQueriesContext(connection) as queries:
+        client.get(url, {'cursor': cursor})
+
+    for query in queries.captured_queries:
+        assert not bad_plan_steps(query['sql']), query['sql']
+
+
+@pytest.mark.django_db
+def test_connection_pragmas(settings):
+    """Соединение получает настройки из SQLITE_PRAGMAS."""
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA busy_timeout')
+        busy_timeout = cursor.fetchone()[0]
+        cursor.execute('PRAGMA cache_size')
+        cache_size = cursor.fetchone()[0]
+    assert busy_timeout == settings.SQLITE_PRAGMAS['busy_timeout']
+    assert cache_size == settings.SQLITE_PRAGMAS['cache_size']
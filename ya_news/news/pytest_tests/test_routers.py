@@ -1,16 +1,32 @@
+import contextvars
+import sqlite3
+from contextlib import closing
 from http import HTTPStatus
+from io import StringIO
 
 import pytest
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import Client
 from django.urls import reverse
 from pytest_django.asserts import assertRedirects
 
+from news.models import News
+from news.queries import over_budget, record_requests
+from news.routers import PIN_COOKIE, PrimaryPinMiddleware, ReplicaRouter
+
 
 @pytest.mark.django_db
 @pytest.mark.parametrize(
     'name, args',
     (
         ('news:detail', pytest.lazy_fixture('news_id_for_args')),
+        ('news:comments', pytest.lazy_fixture('news_id_for_args')),
         ('news:home', None),
+        ('news:search', None),
+        ('news:autocomplete', None),
         ('users:login', None),
         ('users:logout', None),
         ('users:signup', None),
@@ -60,3 +76,161 @@ def test_redirect_for_anonymous_client(client, name, comment_id_for_args):
     response = client.get(url)
 
     assertRedirects(response, expected_url)
+
+
+@pytest.mark.django_db
+def test_query_budget_detects_excess(client, news_id_for_args):
+    """Превышение бюджета SQL-запросов обнаруживается."""
+    url = reverse('news:detail', args=news_id_for_args)
+
+    with record_requests() as records:
+        client.get(url)
+
+    assert over_budget(records, {'news:detail': 1})
+    assert not over_budget(records, settings.QUERY_BUDGETS)
+
+
+@pytest.mark.django_db
+def test_streaming_response_queries_are_counted(client, news, comment):
+    """Запросы потокового ответа считаются, пока отдаётся его тело."""
+    with record_requests() as records:
+        response = client.get(reverse('news:export_news'))
+        assert not records
+        b''.join(response.streaming_content)
+
+    record, = records
+    assert record.view_name == 'news:export_news'
+    # Новости одним курсором и комментарии их единственной пачки.
+    assert record.count == 2
+
+
+@pytest.mark.django_db
+def test_query_count_headers_in_debug(client, settings):
+    """В режиме отладки число и время запросов отдаются в заголовках."""
+    settings.DEBUG = True
+
+    response = client.get(reverse('news:home'))
+
+    assert int(response['X-Query-Count']) >= 1
+    assert response['X-Query-Time'].endswith('ms')
+
+
+def test_reads_go_to_replica_and_writes_to_primary(settings):
+    """Новости читаются из реплики, записи и пользователи — из основной."""
+    settings.DATABASE_REPLICAS = ['replica']
+    router = ReplicaRouter()
+
+    def route():
+        return router.db_for_read(News), router.db_for_write(News)
+
+    assert contextvars.Context().run(route) == ('replica', 'default')
+    assert router.db_for_read(get_user_model()) == 'default'
+    # Маршрут записи ещё не запись: get_or_create спрашивает его
+    # и для чтения существующей строки.
+    assert contextvars.Context().run(
+        lambda: route() and router.db_for_read(News)
+    ) == 'replica'
+
+
+@pytest.mark.django_db(transaction=True)
+def test_writer_is_pinned_to_primary(settings, rf, news):
+    """После записи клиент получает cookie и читает из основной базы."""
+    settings.DATABASE_REPLICAS = ['replica']
+    router = ReplicaRouter()
+    reads = []
+
+    def view(request):
+        reads.append(router.db_for_read(News))
+        News.objects.get_or_create(pk=news.pk)
+        if request.method == 'POST':
+            News.objects.filter(pk=news.pk).update(title='Новый')
+            reads.append(router.db_for_read(News))
+        return HttpResponse()
+
+    middleware = PrimaryPinMiddleware(view)
+    response = contextvars.Context().run(middleware, rf.post('/'))
+    request = rf.get('/')
+    request.COOKIES[PIN_COOKIE] = response.cookies[PIN_COOKIE].value
+    contextvars.Context().run(middleware, request)
+    response = contextvars.Context().run(middleware, rf.get('/'))
+
+    assert reads == ['replica', 'default', 'default', 'replica']
+    assert PIN_COOKIE not in response.cookies
+
+
+@pytest.mark.parametrize(
+    'name, args',
+    (
+        ('news:detail', pytest.lazy_fixture('news_id_for_args')),
+        ('news:comments', pytest.lazy_fixture('news_id_for_args')),
+        ('news:home', None),
+        ('news:search', None),
+        ('news:autocomplete', None),
+    ),
+)
+def test_pages_are_read_from_file_replica(
+    client, file_replica, name, args
+):
+    """Страницы новостей читаются из копии, созданной sync_replica."""
+    file_replica()
+    News.objects.update(title='Не синхронизировано')
+
+    response = client.get(reverse(name, args=args), {'q': 'Заголовок'})
+
+    assert response.status_code == HTTPStatus.OK
+    assert 'Не синхронизировано' not in response.content.decode()
+    assert PIN_COOKIE not in response.cookies
+
+
+def test_search_pages_are_full_on_lagging_replica(
+    client, file_replica, settings
+):
+    """Поиск по отстающей реплике не теряет результатов на страницах."""
+    settings.SEARCH_RESULTS_PER_PAGE = 2
+    News.objects.bulk_create(
+        News(title=f'Выпуск {index}', text='Текст') for index in range(3)
+    )
+    file_replica()
+    News.objects.bulk_create(
+        News(title=f'Выпуск выпуск {index}', text='Текст')
+        for index in range(3)
+    )
+
+    pages = []
+    cursor = ''
+    while cursor is not None:
+        context = client.get(
+            reverse('news:search'), {'q': 'выпуск', 'cursor': cursor}
+        ).context
+        pages.append([news.title for news in context['results']])
+        cursor = context['next_cursor']
+
+    assert [len(page) for page in pages] == [2, 1]
+
+
+def test_commenter_reads_primary_until_replica_syncs(
+    author_client, file_replica, news
+):
+    """Автор комментария видит его сразу, остальные — после синхронизации."""
+    file_replica()
+    url = reverse('news:detail', args=(news.id,))
+
+    response = author_client.post(url, {'text': 'Свежий комментарий'})
+
+    assert PIN_COOKIE in response.cookies
+    assert 'Свежий комментарий' not in Client().get(url).content.decode()
+    assert 'Свежий комментарий' in author_client.get(url).content.decode()
+    file_replica()
+    assert 'Свежий комментарий' in Client().get(url).content.decode()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_sync_replica_copies_database(news, tmp_path):
+    """Команда создаёт файловую копию основной базы."""
+    path = tmp_path / 'replica.sqlite3'
+
+    call_command('sync_replica', str(path), stdout=StringIO())
+
+    with closing(sqlite3.connect(path)) as replica:
+        titles = replica.execute('SELECT title FROM news_news').fetchall()
+    assert titles == [(news.title,)]
@@ -0,0 +1,96 @@
+"""
+Маршрутизация запросов к основной базе и репликам только для чтения.
+
+Записи всегда идут в ``default``, чтения моделей новостей — в случайную
+реплику из ``settings.DATABASE_REPLICAS``. Сессии и пользователи всегда
+читаются из основной базы: отстающая реплика разлогинила бы только что
+вошедшего пользователя. Чтение уходит в основную базу и если:
+
+- идёт транзакция: внутри неё нужно видеть собственные изменения;
+- в текущем запросе уже была запись: её замечает обёртка выполнения
+  SQL, а не ``db_for_write`` — маршрут записи запрашивают и методы,
+  которые в итоге ничего не пишут, например ``get_or_create``;
+- клиент недавно писал: после записи ``PrimaryPinMiddleware`` ставит
+  cookie, и следующие ``REPLICA_PIN_SECONDS`` секунд (например, страница
+  после редиректа с формы комментария) читаются с основной базы, пока
+  реплика не догнала изменения.
+
+Кеш общий для всех читателей и может хранить данные отставшей
+реплики, поэтому закреплённые запросы его не читают, а ``sync_replica``
+очищает кеш после обновления копий.
+"""
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+PIN_COOKIE = 'pin_primary'
+
+REPLICATED_APPS = {'news'}
+
+_pinned = ContextVar('pinned', default=False)
+_wrote = ContextVar('wrote', default=False)
+
+WRITE_STATEMENTS = ('INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+
+
+def track_writes(execute, sql, params, many, context):
+    """Закрепляет запрос за основной базой после первой записи."""
+    result = execute(sql, params, many, context)
+    if sql.lstrip()[:7].upper().startswith(WRITE_STATEMENTS):
+        _wrote.set(True)
+        _pinned.set(True)
+    return result
+
+
+def pinned_to_primary():
+    """Читает ли текущий запрос из основной базы, минуя реплики."""
+    return bool(settings.DATABASE_REPLICAS) and _pinned.get()
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        replicas = settings.DATABASE_REPLICAS
+        if (
+            not replicas
+            or model._meta.app_label not in REPLICATED_APPS
+            or _pinned.get()
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики содержат те же данные, что и основная база.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+class PrimaryPinMiddleware:
+    """Закрепляет за основной базой запросы клиента, который недавно писал."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        pinned = _pinned.set(PIN_COOKIE in request.COOKIES)
+        wrote = _wrote.set(False)
+        try:
+            with connections[DEFAULT_DB_ALIAS].execute_wrapper(track_writes):
+                response = self.get_response(request)
+            if _wrote.get() and settings.DATABASE_REPLICAS:
+                response.set_cookie(
+                    PIN_COOKIE, '1', max_age=settings.REPLICA_PIN_SECONDS,
+                    httponly=True, samesite='Lax',
+                )
+            return response
+        finally:
+            _pinned.reset(pinned)
+            _wrote.reset(wrote)
@@ -0,0 +1,102 @@
+"""
+Полнотекстовый поиск по новостям.
+
+На SQLite используется таблица FTS5 ``news_news_fts``, которую
+поддерживают триггеры из миграции. Результаты упорядочены по bm25
+(совпадение в заголовке весит больше), страницы листаются по ключу
+``(score, id)``. На других СУБД поиск деградирует до ``icontains``.
+"""
+import re
+
+from django.conf import settings
+from django.db import connections, router
+from django.db.models import Q
+
+from .models import News
+from .pagination import decode_cursor, encode_cursor
+
+# Курсор поиска подписан своей солью: курсор комментариев
+# не должен приниматься поиском, и наоборот.
+CURSOR_SALT = 'news.search.cursor'
+
+TITLE_WEIGHT = 10.0
+TEXT_WEIGHT = 1.0
+
+SEARCH_SQL = f'''
+    SELECT rowid, bm25(news_news_fts, {TITLE_WEIGHT}, {TEXT_WEIGHT}) AS score
+    FROM news_news_fts
+    WHERE news_news_fts MATCH %s {{after}}
+    ORDER BY score, rowid
+    LIMIT %s
+'''
+AFTER_SQL = f'''
+    AND (
+        bm25(news_news_fts, {TITLE_WEIGHT}, {TEXT_WEIGHT}) > %s
+        OR (
+            bm25(news_news_fts, {TITLE_WEIGHT}, {TEXT_WEIGHT}) = %s
+            AND rowid > %s
+        )
+    )
+'''
+
+
+def match_expression(query):
+    """
+    Запрос FTS5: все слова обязательны, последнее ищется как префикс.
+
+    Префиксом считается только последнее, возможно недописанное, слово:
+    раскрытие префикса в сотни терминов стоит дороже самого поиска.
+    """
+    words = re.findall(r'\w+', query.casefold().replace('ё', 'е'))
+    if not words:
+        return ''
+    return ' '.join(f'"{word}"' for word in words) + '*'
+
+
+def search_news(query, cursor=None, limit=None):
+    """Страница найденных новостей и курсор следующей страницы."""
+    limit = limit or settings.SEARCH_RESULTS_PER_PAGE
+    expression = match_expression(query)
+    if not expression:
+        return [], None
+    after = decode_cursor(
+        cursor, ((int, float), int), CURSOR_SALT
+    ) if cursor else None
+    # Индекс и новости читаются из одной базы: иначе новость, которой
+    # ещё нет в отстающей реплике, выпала бы со страницы навсегда.
+    using = router.db_for_read(News)
+    if connections[using].vendor == 'sqlite':
+        rows = fts_rows(using, expression, after, limit + 1)
+    else:
+        rows = icontains_rows(using, query, after, limit + 1)
+    news = News.objects.using(using).in_bulk(
+        [news_id for news_id, _ in rows[:limit]]
+    )
+    page = [news[news_id] for news_id, _ in rows[:limit] if news_id in news]
+    if len(rows) <= limit:
+        return page, None
+    last_id, last_score = rows[limit - 1]
+    return page, encode_cursor(last_score, last_id, salt=CURSOR_SALT)
+
+
+def fts_rows(using, expression, after, limit):
+    params = [expression]
+    if after:
+        score, last_id = after
+        params += [score, score, last_id]
+    params.append(limit)
+    sql = SEARCH_SQL.format(after=AFTER_SQL if after else '')
+    with connections[using].cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+
+def icontains_rows(using, query, after, limit):
+    news = News.objects.using(using).filter(
+        Q(title__icontains=query) | Q(text__icontains=query)
+    ).order_by('pk')
+    if after:
+        news = news.filter(pk__gt=after[1])
+    return [(news_id, 0) for news_id in news.values_list('pk', flat=True)[
+        :limit
+    ]]
@@ -0,0 +1,141 @@
+from collections import Counter
+
+from django.conf import settings
+from django.db import router, transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from .cache import NEWS_LIST_NAMESPACE, comments_namespace, invalidate
+from .models import Comment, News
+
+
+def touch_news(news_id, comment_delta=0):
+    """
+    Отмечает изменение обсуждения новости.
+
+    Обновляет время изменения и атомарно сдвигает счётчик
+    комментариев на ``comment_delta``.
+    """
+    changes = {'modified': timezone.now()}
+    if comment_delta:
+        changes['comment_count'] = Greatest(
+            F('comment_count') + comment_delta, 0
+        )
+    News.objects.filter(pk=news_id).update(**changes)
+
+
+def recount_comment_counts():
+    """
+    Пересчитывает счётчики комментариев всех новостей.
+
+    Выполняется одним UPDATE с группирующим подзапросом по комментариям.
+    Возвращает число обновлённых новостей.
+    """
+    total = Comment.objects.filter(
+        news=OuterRef('pk')
+    ).order_by().values('news').annotate(
+        total=Count('pk')
+    ).values('total')
+    return News.objects.update(
+        comment_count=Coalesce(
+            Subquery(total, output_field=IntegerField()), 0
+        )
+    )
+
+
+def delete_in_batches(queryset, fields=(), on_batch=None, batch_size=None):
+    """
+    Удаляет строки ``queryset`` партиями запросами ``DELETE ... WHERE``.
+
+    Объекты не загружаются в память, сигналы удаления не отправляются:
+    их последствия выполняет ``on_batch``, которому передаются значения
+    ``pk`` и ``fields`` удалённой партии. Каждая партия удаляется в
+    отдельной транзакции. Зависимые строки должны быть удалены заранее.
+    Партии читаются из базы для записи: ``queryset.db`` вне транзакции
+    указывает на реплику. Возвращает число удалённых строк.
+    """
+    batch_size = batch_size or settings.DELETE_BATCH_SIZE
+    model = queryset.model
+    db = router.db_for_write(model)
+    queryset = queryset.using(db).order_by()
+    deleted = 0
+    while True:
+        with transaction.atomic(using=db):
+            rows = list(queryset.values_list('pk', *fields)[:batch_size])
+            if not rows:
+                return deleted
+            # QuerySet.delete() собрал бы объекты в память ради сигналов
+            # и каскада, а их здесь заменяет on_batch. _raw_delete —
+            # приватный API, поэтому версия Django закреплена
+            # в requirements.txt.
+            model._base_manager.using(db).filter(
+                pk__in=[row[0] for row in rows]
+            )._raw_delete(db)
+            if on_batch:
+                on_batch(rows)
+        deleted += len(rows)
+
+
+def delete_comments(comments, batch_size=None):
+    """
+    Удаляет комментарии партиями, сохраняя верными счётчики новостей.
+
+    Вместо ``post_delete`` на каждый комментарий счётчик каждой
+    затронутой новости уменьшается одним UPDATE на партию.
+    """
+    def on_batch(rows):
+        for news_id, count in Counter(news for _, news in rows).items():
+            touch_news(news_id, -count)
+            invalidate(comments_namespace(news_id))
+
+    deleted = delete_in_batches(
+        comments, ('news_id',), on_batch, batch_size
+    )
+    if deleted:
+        invalidate(NEWS_LIST_NAMESPACE)
+    return deleted
+
+
+def delete_news(news, batch_size=None):
+    """
+    Удаляет новости вместе с комментариями, не загружая их в память.
+
+    Счётчики удаляемых новостей не обновляются. Сами новости удаляются
+    обычным ``delete()``, чтобы сработали их сигналы: к этому моменту
+    каскадно удалять уже нечего. Возвращает результат в формате
+    ``QuerySet.delete()``.
+    """
+    batch_size = batch_size or settings.DELETE_BATCH_SIZE
+    news_ids = list(news.using(router.db_for_write(News)).values_list(
+        'pk', flat=True
+    ))
+    comments = news_count = 0
+    for start in range(0, len(news_ids), batch_size):
+        chunk = news_ids[start:start + batch_size]
+        comments += delete_in_batches(
+            Comment.objects.filter(news_id__in=chunk),
+            batch_size=batch_size,
+        )
+        news_count += News.objects.filter(pk__in=chunk).delete()[0]
+        for news_id in chunk:
+            invalidate(comments_namespace(news_id))
+    return news_count + comments, {
+        News._meta.label: news_count, Comment._meta.label: comments,
+    }
+
+
+def delete_user(user, batch_size=None):
+    """Удаляет пользователя, предварительно удалив его комментарии партиями."""
+    comments = delete_comments(
+        Comment.objects.filter(author=user), batch_size
+    )
+    total, deleted = user.delete()
+    deleted[Comment._meta.label] = comments
+    return total + comments, deleted
+
+
+def delete_users(users, batch_size=None):
+    """``delete_user`` для каждого пользователя из ``users``."""
+    for user in users:
+        delete_user(user, batch_size)
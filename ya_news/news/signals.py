@@ -0,0 +1,52 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .autocomplete import title_index
+from .cache import (
+    NEWS_LIST_NAMESPACE, comments_namespace, invalidate, news_namespace,
+)
+from .models import Comment, News
+from .services import touch_news
+
+
+@receiver(post_save, sender=News)
+@receiver(post_delete, sender=News)
+def news_changed(sender, instance, **kwargs):
+    """Изменение новости сбрасывает её страницу и главную."""
+    invalidate(news_namespace(instance.pk))
+    invalidate(NEWS_LIST_NAMESPACE)
+
+
+@receiver(post_save, sender=News)
+def news_saved(sender, instance, **kwargs):
+    """Новый или переименованный заголовок попадает в подсказки."""
+    pk, title = instance.pk, instance.title
+    transaction.on_commit(lambda: title_index.changed(pk, title))
+
+
+@receiver(post_delete, sender=News)
+def news_deleted(sender, instance, **kwargs):
+    pk = instance.pk
+    transaction.on_commit(lambda: title_index.changed(pk))
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, **kwargs):
+    """Новый комментарий увеличивает счётчик новости, правка — её время."""
+    touch_news(instance.news_id, 1 if created else 0)
+    if created:
+        invalidate(NEWS_LIST_NAMESPACE)
+    invalidate(comments_namespace(instance.news_id))
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    """
+    Удалённый комментарий уменьшает счётчик новости.
+
+    Срабатывает и при каскадном удалении, и при удалении из админки.
+    """
+    touch_news(instance.news_id, -1)
+    invalidate(NEWS_LIST_NAMESPACE)
+    invalidate(comments_namespace(instance.news_id))
@@ -0,0 +1,20 @@
+"""
+Настройка соединений SQLite.
+
+Каждое новое соединение получает PRAGMA из ``settings.SQLITE_PRAGMAS``.
+WAL позволяет читателям не блокировать писателя, а ``busy_timeout``
+заставляет писателя подождать освобождения блокировки вместо ошибки
+``database is locked``. Вместе с ``CONN_MAX_AGE`` настройка выполняется
+один раз на соединение, а не на каждый запрос.
+"""
+from django.conf import settings
+
+
+def configure_connection(sender, connection, **kwargs):
+    """Обработчик ``connection_created``: применяет PRAGMA к соединению."""
+    if connection.vendor != 'sqlite':
+        return
+    # Напрямую через драйвер, минуя курсор Django: служебные запросы
+    # не должны попадать в счётчики запросов и в debug-лог.
+    for name, value in settings.SQLITE_PRAGMAS.items():
+        connection.connection.execute(f'PRAGMA {name} = {value}')
@@ -0,0 +1,98 @@
+"""
+Счётчики попаданий и промахов кешей.
+
+События копятся в памяти процесса и переносятся в общий кеш ``stats``
+не чаще раза в ``CACHE_STATS_FLUSH_SECONDS`` и при выходе из процесса:
+запись в файловый кеш на каждом попадании стоила бы дороже самого
+попадания. У кеша ``stats`` свой каталог из нескольких записей,
+поэтому данные основного кеша счётчики не вытесняют. Переносы из
+разных процессов не атомарны, так что итоги приблизительны.
+"""
+import atexit
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import caches
+
+STATS_REGISTRY = {}
+
+EVENTS = ('hits', 'misses')
+
+
+class CacheStats:
+    """Попадания и промахи одного кеша."""
+
+    def __init__(self, name):
+        self.name = name
+        self.pending = Counter()
+        self.flushed_at = time.monotonic()
+        self.lock = threading.Lock()
+        STATS_REGISTRY[name] = self
+
+    def key(self, event):
+        return f'stats:{self.name}:{event}'
+
+    def hit(self):
+        self.count('hits')
+
+    def miss(self):
+        self.count('misses')
+
+    def count(self, event):
+        with self.lock:
+            self.pending[event] += 1
+            due = (
+                time.monotonic() - self.flushed_at
+                >= settings.CACHE_STATS_FLUSH_SECONDS
+            )
+        if due:
+            self.flush()
+
+    def flush(self):
+        """Переносит накопленные события в общий кеш."""
+        with self.lock:
+            pending, self.pending = self.pending, Counter()
+            self.flushed_at = time.monotonic()
+        store = caches['stats']
+        for event, count in pending.items():
+            key = self.key(event)
+            if not store.add(key, count, None):
+                try:
+                    store.incr(key, count)
+                except ValueError:
+                    store.add(key, count, None)
+
+    def snapshot(self):
+        """Итоги всех процессов вместе с ещё не перенесёнными событиями."""
+        stored = caches['stats'].get_many(
+            [self.key(event) for event in EVENTS]
+        )
+        with self.lock:
+            hits, misses = (
+                stored.get(self.key(event), 0) + self.pending[event]
+                for event in EVENTS
+            )
+        total = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': round(hits / total, 3) if total else None,
+        }
+
+
+def flush_stats():
+    for stats in STATS_REGISTRY.values():
+        stats.flush()
+
+
+def reset_stats():
+    """Обнуляет счётчики всех процессов и текущего."""
+    for stats in STATS_REGISTRY.values():
+        with stats.lock:
+            stats.pending.clear()
+    caches['stats'].clear()
+
+
+atexit.register(flush_stats)
@@ -0,0 +1,98 @@
+"""
+Потоковый разбор больших JSON-массивов.
+
+Файл читается блоками, в памяти одновременно находится только
+текущая запись и непрочитанный хвост блока. Вместе с записью
+возвращается смещение в байтах сразу за ней, по которому можно
+продолжить прерванный разбор.
+"""
+import codecs
+import json
+
+CHUNK_SIZE = 64 * 1024
+MAX_RECORD_SIZE = 16 * 1024 * 1024
+WHITESPACE = ' \t\r\n'
+
+
+class JSONArrayReader:
+    """Читатель JSON-массива из двоичного файла, начиная со смещения."""
+
+    def __init__(self, file, offset=0, chunk_size=CHUNK_SIZE):
+        self.file = file
+        self.offset = offset
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.utf8 = codecs.getincrementaldecoder('utf-8')()
+        self.buffer = ''
+        self.position = 0
+        self.at_eof = False
+        self.started = offset > 0
+        file.seek(offset)
+
+    def __iter__(self):
+        while self.skip_separators():
+            if self.buffer[self.position] == ']':
+                return
+            record = self.decode()
+            if record is not None:
+                yield record, self.offset
+
+    def fill(self):
+        """Дочитывает следующий блок, сохраняя непрочитанный хвост."""
+        self.buffer = self.buffer[self.position:]
+        self.position = 0
+        chunk = self.file.read(self.chunk_size)
+        self.at_eof = not chunk
+        self.buffer += self.utf8.decode(chunk, final=self.at_eof)
+
+    def skip_separators(self):
+        """Пропускает пробелы, запятые и открывающую скобку массива."""
+        while True:
+            skip = WHITESPACE + ',' if self.started else WHITESPACE
+            start = self.position
+            while (
+                self.position < len(self.buffer)
+                and self.buffer[self.position] in skip
+            ):
+                self.position += 1
+            self.offset += len(
+                self.buffer[start:self.position].encode('utf-8')
+            )
+            if self.position == len(self.buffer):
+                if self.at_eof:
+                    raise ValueError(
+                        'Неожиданный конец файла: массив не закрыт.'
+                    )
+                self.fill()
+            elif self.started:
+                return True
+            elif self.buffer[self.position] != '[':
+                raise ValueError('Ожидался JSON-массив.')
+            else:
+                self.position += 1
+                self.offset += 1
+                self.started = True
+
+    def decode(self):
+        """Очередная запись или None, если она ещё не прочитана целиком."""
+        try:
+            record, end = self.decoder.raw_decode(self.buffer, self.position)
+        except json.JSONDecodeError:
+            unread = len(self.buffer) - self.position
+            if self.at_eof or unread > MAX_RECORD_SIZE:
+                raise
+            self.fill()
+            return None
+        self.offset += len(self.buffer[self.position:end].encode('utf-8'))
+        self.position = end
+        return record
+
+
+def iter_json_array(file, offset=0, chunk_size=CHUNK_SIZE):
+    """
+    Возвращает пары ``(запись, смещение)`` из JSON-массива в файле.
+
+    ``file`` открыт в двоичном режиме. При ``offset > 0`` разбор
+    продолжается с этой позиции, как будто массив уже открыт.
+    """
+    return iter(JSONArrayReader(file, offset, chunk_size))
@@ -1,12 +1,32 @@
 from django.urls import path
 
 from news import views
+from news.feeds import LatestNewsAtomFeed, LatestNewsFeed, cached_feed
 
 app_name = 'news'
 
 urlpatterns = [
     path('', views.NewsList.as_view(), name='home'),
     path('news/<int:pk>/', views.NewsDetailView.as_view(), name='detail'),
+    path(
+        'news/<int:pk>/comments/',
+        views.NewsCommentsPage.as_view(),
+        name='comments'
+    ),
+    path('search/', views.NewsSearch.as_view(), name='search'),
+    path(
+        'autocomplete/',
+        views.NewsAutocomplete.as_view(),
+        name='autocomplete'
+    ),
+    path('feed/rss/', cached_feed(LatestNewsFeed()), name='feed_rss'),
+    path('feed/atom/', cached_feed(LatestNewsAtomFeed()), name='feed_atom'),
+    path('export/news/', views.NewsExport.as_view(), name='export_news'),
+    path(
+        'export/comments/',
+        views.CommentsExport.as_view(),
+        name='export_comments'
+    ),
     path(
         'delete_comment/<int:pk>/',
         views.CommentDelete.as_view(),
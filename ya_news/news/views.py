@@ -1,13 +1,33 @@
 from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.exceptions import BadRequest
+from django.db import transaction
+from django.http import JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django.urls import reverse
+from django.utils.decorators import method_decorator
 from django.views import generic
-
+from django.views.decorators.http import condition
+
+from .autocomplete import title_index
+from .conditional import (
+    detail_etag, detail_last_modified, home_etag, home_last_modified,
+)
+from .export import (
+    export_comments, export_news, ndjson, parse_date_watermark,
+    parse_datetime_watermark, parse_id_watermark,
+)
 from .forms import CommentForm
+from .fragments import comments_block
 from .models import Comment, News
+from .pagination import comments_page
+from .search import search_news
 
 
+@method_decorator(
+    condition(etag_func=home_etag, last_modified_func=home_last_modified),
+    name='get'
+)
 class NewsList(generic.ListView):
     """Список новостей."""
     model = News
@@ -18,10 +38,10 @@ class NewsList(generic.ListView):
         Выводим только несколько последних новостей.
 
         Их количество определяется в настройках проекта.
+        Число комментариев берётся из денормализованного поля
+        ``comment_count``, сами комментарии в память не загружаются.
         """
-        return self.model.objects.prefetch_related(
-            'comment_set'
-        )[:settings.NEWS_COUNT_ON_HOME_PAGE]
+        return self.model.objects.all()[:settings.NEWS_COUNT_ON_HOME_PAGE]
 
 
 class NewsDetail(generic.DetailView):
@@ -29,14 +49,13 @@ class NewsDetail(generic.DetailView):
     template_name = 'news/detail.html'
 
     def get_object(self, queryset=None):
-        obj = get_object_or_404(
-            self.model.objects.prefetch_related('comment_set__author'),
-            pk=self.kwargs['pk']
-        )
-        return obj
+        return get_object_or_404(self.model, pk=self.kwargs['pk'])
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
+        context['comments_html'] = comments_block(
+            self.request, self.object.pk
+        )
         if self.request.user.is_authenticated:
             context['form'] = CommentForm()
         return context
@@ -59,16 +78,22 @@ class NewsComment(
         comment = form.save(commit=False)
         comment.news = self.object
         comment.author = self.request.user
-        comment.save()
+        # Комментарий и счётчик новости сохраняются в одной транзакции.
+        with transaction.atomic():
+            comment.save()
         return super().form_valid(form)
 
     def get_success_url(self):
-        post = self.get_object()
-        return reverse('news:detail', kwargs={'pk': post.pk}) + '#comments'
+        return reverse(
+            'news:detail', kwargs={'pk': self.object.pk}
+        ) + '#comments'
 
 
 class NewsDetailView(generic.View):
 
+    @method_decorator(condition(
+        etag_func=detail_etag, last_modified_func=detail_last_modified
+    ))
     def get(self, request, *args, **kwargs):
         view = NewsDetail.as_view()
         return view(request, *args, **kwargs)
@@ -78,14 +103,103 @@ class NewsDetailView(generic.View):
         return view(request, *args, **kwargs)
 
 
+class NewsCommentsPage(generic.View):
+    """Следующая страница комментариев новости в формате JSON."""
+
+    def get(self, request, *args, **kwargs):
+        news = get_object_or_404(News, pk=kwargs['pk'])
+        comments, next_cursor = comments_page(
+            news.pk, request.GET.get('cursor')
+        )
+        return JsonResponse({
+            'comments': [
+                {
+                    'id': comment.pk,
+                    'author': str(comment.author),
+                    'text': comment.text,
+                    'created': comment.created.isoformat(),
+                }
+                for comment in comments
+            ],
+            'next': next_cursor,
+        })
+
+
+class NewsSearch(generic.TemplateView):
+    """Полнотекстовый поиск по заголовкам и текстам новостей."""
+    template_name = 'news/search.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        query = self.request.GET.get('q', '').strip()
+        results, next_cursor = search_news(
+            query, self.request.GET.get('cursor')
+        )
+        context.update(
+            query=query, results=results, next_cursor=next_cursor
+        )
+        return context
+
+
+class NewsAutocomplete(generic.View):
+    """Подсказки заголовков по введённому началу, без обращения к БД."""
+
+    def get(self, request, *args, **kwargs):
+        return JsonResponse({
+            'results': [
+                {'id': pk, 'title': title}
+                for pk, title in title_index.lookup(request.GET.get('q', ''))
+            ],
+        })
+
+
+class ExportView(generic.View):
+    """
+    Потоковая выгрузка в NDJSON.
+
+    Параметр ``since`` задаёт водяной знак инкрементальной выгрузки.
+    Параметры разбираются до начала ответа, чтобы ошибка в них
+    вернула 400, а не оборвала поток.
+    """
+    parse_since = None
+    export = None
+
+    def get_export_kwargs(self):
+        return {'since': self.parse_since(self.request.GET.get('since'))}
+
+    def get(self, request, *args, **kwargs):
+        return StreamingHttpResponse(
+            ndjson(self.export(**self.get_export_kwargs())),
+            content_type='application/x-ndjson; charset=utf-8',
+        )
+
+
+class NewsExport(ExportView):
+    """Новости с комментариями, начиная с даты ``since``."""
+    parse_since = staticmethod(parse_date_watermark)
+    export = staticmethod(export_news)
+
+
+class CommentsExport(ExportView):
+    """Комментарии после водяного знака ``since`` и ``after``."""
+    parse_since = staticmethod(parse_datetime_watermark)
+    export = staticmethod(export_comments)
+
+    def get_export_kwargs(self):
+        kwargs = super().get_export_kwargs()
+        kwargs['after'] = parse_id_watermark(self.request.GET.get('after'))
+        if kwargs['after'] is not None and kwargs['since'] is None:
+            raise BadRequest('Параметр after задаётся вместе с since.')
+        return kwargs
+
+
 class CommentBase(LoginRequiredMixin):
     """Базовый класс для работы с комментариями."""
     model = Comment
 
     def get_success_url(self):
-        comment = self.get_object()
         return reverse(
-            'news:detail', kwargs={'pk': comment.news.pk}
+            'news:detail', kwargs={'pk': self.object.news_id}
         ) + '#comments'
 
     def get_queryset(self):
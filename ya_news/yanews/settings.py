@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 from django.urls import reverse_lazy
@@ -21,13 +22,17 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'news.queries.QueryCountMiddleware',
+    'news.routers.PrimaryPinMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'django.middleware.http.ConditionalGetMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'news.middleware.AnonymousPageCacheMiddleware',
 ]
 
 ROOT_URLCONF = 'yanews.urls'
@@ -51,12 +56,67 @@ TEMPLATES = [
 WSGI_APPLICATION = 'yanews.wsgi.application'
 
 
+# Соединения живут между запросами, PRAGMA выполняются один раз.
+CONN_MAX_AGE = 60
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': CONN_MAX_AGE,
+    }
+}
+
+# Применяются к каждому новому соединению SQLite, см. news/sqlite.py.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    # Отрицательное значение — размер кеша страниц в КиБ.
+    'cache_size': -64000,
+    'mmap_size': 256 * 2**20,
+    'busy_timeout': 5000,
+}
+
+# Реплики только для чтения — пути к копиям базы через запятую, например
+# YANEWS_DB_REPLICAS=replica.sqlite3. Копии обновляет команда sync_replica.
+# В тестах реплики зеркалируют тестовую базу.
+DATABASE_REPLICAS = []
+for index, name in enumerate(
+    filter(None, os.environ.get('YANEWS_DB_REPLICAS', '').split(',')), 1
+):
+    DATABASES[f'replica{index}'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / name.strip(),
+        'CONN_MAX_AGE': CONN_MAX_AGE,
+        'TEST': {'MIRROR': 'default'},
     }
+    DATABASE_REPLICAS.append(f'replica{index}')
+
+DATABASE_ROUTERS = ['news.routers.ReplicaRouter']
+
+# Сколько секунд после записи клиент читает из основной базы.
+REPLICA_PIN_SECONDS = 5
+
+
+# Версии пространств имён и счётчики попаданий должны быть общими
+# для всех процессов сервера, поэтому кеш хранится в файлах, а не
+# в памяти процесса. Каталог задаётся переменной YANEWS_CACHE_DIR.
+CACHE_DIR = os.environ.get('YANEWS_CACHE_DIR', BASE_DIR / '.cache')
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': CACHE_DIR,
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+    # Счётчики попаданий лежат отдельно: их не вытесняют записи
+    # основного кеша, а запись счётчика не перебирает его файлы.
+    'stats': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(CACHE_DIR, 'stats'),
+    },
 }
+# Как часто процесс переносит накопленные счётчики в кеш stats.
+CACHE_STATS_FLUSH_SECONDS = 10
 
 
 AUTH_PASSWORD_VALIDATORS = []
@@ -80,3 +140,37 @@ LOGIN_URL = reverse_lazy('users:login')
 LOGIN_REDIRECT_URL = reverse_lazy('news:home')
 
 NEWS_COUNT_ON_HOME_PAGE = 10
+
+COMMENTS_PER_PAGE = 50
+
+COMMENTS_CACHE_TIMEOUT = 60 * 60
+
+SEARCH_RESULTS_PER_PAGE = 20
+
+AUTOCOMPLETE_LIMIT = 10
+
+# Сколько строк выгрузки NDJSON читается из базы за один раз.
+EXPORT_CHUNK_SIZE = 500
+
+# Сколько строк удаляется одним запросом при удалении зависимых объектов.
+DELETE_BATCH_SIZE = 1000
+
+# Сколько SQL-запросов может выполнить один запрос к представлению.
+QUERY_BUDGETS = {
+    'news:home': 4,
+    'news:detail': 7,
+    'news:comments': 4,
+    'news:search': 3,
+    'news:autocomplete': 1,
+    # Сессия и пользователь, если есть, и выборка новостей при промахе.
+    'news:feed_rss': 3,
+    'news:feed_atom': 3,
+    'news:edit': 5,
+    'news:delete': 6,
+}
+
+# Файл со словарём запрещённых слов, по одному слову в строке.
+BAD_WORDS_FILE = None
+
+# Страницы инвалидируются по версиям, а не по времени жизни.
+PAGE_CACHE_TIMEOUT = None
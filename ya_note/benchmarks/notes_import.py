@@ -0,0 +1,83 @@
+"""
+Пропускная способность выгрузки и загрузки заметок в NDJSON.
+
+Запуск: ``python -m benchmarks.notes_import [--notes 100000]``.
+Загрузка идёт через представление, как у клиента: с указанными
+уникальными slug и с пустыми, которые выбираются по заголовкам.
+Заголовки повторяются, поэтому у пустых slug много суффиксов.
+Затем загруженное выгружается обратно.
+"""
+import argparse
+import json
+import random
+import time
+
+from benchmarks.utils import print_table, setup_django, test_database
+
+WORDS = (
+    'список', 'покупок', 'идея', 'план', 'встреча', 'проект', 'книга',
+    'фильм', 'рецепт', 'задача', 'отпуск', 'звонок', 'отчёт', 'курс',
+)
+
+
+def make_body(count, rng, with_slugs):
+    lines = []
+    for index in range(count):
+        record = {
+            'title': ' '.join(rng.choices(WORDS, k=rng.randint(1, 4))),
+            'text': ' '.join(rng.choices(WORDS, k=rng.randint(5, 50))),
+        }
+        if with_slugs:
+            record['slug'] = f'import-{index}'
+        lines.append(json.dumps(record, ensure_ascii=False))
+    return '\n'.join(lines).encode()
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def run(count):
+    from django.contrib.auth import get_user_model
+    from django.test import Client
+    from django.urls import reverse
+
+    rng = random.Random(42)
+    rows = []
+    for label, with_slugs in (
+        ('указанные slug', True), ('пустые slug', False),
+    ):
+        author = get_user_model().objects.create(username=label)
+        client = Client()
+        client.force_login(author)
+        body = make_body(count, rng, with_slugs)
+        response, seconds = timed(lambda: client.post(
+            reverse('notes:import'), body,
+            content_type='application/x-ndjson',
+        ))
+        created = response.json()['created']
+        rows.append(
+            (f'загрузка, {label}', created, round(created / seconds))
+        )
+        exported, seconds = timed(lambda: b''.join(
+            client.get(reverse('notes:export')).streaming_content
+        ).count(b'\n'))
+        rows.append(
+            (f'выгрузка, {label}', exported, round(exported / seconds))
+        )
+    print_table(('операция', 'заметок', 'заметок/с'), rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--notes', type=int, default=100000)
+    args = parser.parse_args()
+    setup_django()
+    with test_database():
+        run(args.notes)
+
+
+if __name__ == '__main__':
+    main()
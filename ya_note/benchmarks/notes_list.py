@@ -0,0 +1,87 @@
+"""
+Список заметок автора, у которого их очень много.
+
+Запуск: ``python -m benchmarks.notes_list [--notes 100000] [--repeat 20]``.
+Сравнивается прежний список — все заметки автора со всеми полями —
+со страницей по ключу ``id``: первой, из середины и последней,
+в HTML и в JSON. Время страницы не должно зависеть от её номера.
+"""
+import argparse
+
+from benchmarks.utils import (
+    measure, print_table, setup_django, summary, test_database,
+)
+
+BATCH_SIZE = 5000
+TEXT = 'Текст заметки. ' * 60
+
+
+def populate(author, count):
+    from notes.models import Note, ShardAssignment
+
+    # Реестр slug для чтения не нужен, заметки пишутся сразу в шард.
+    shard = ShardAssignment.objects.shard_for(author.pk, create=True)
+    for start in range(0, count, BATCH_SIZE):
+        Note.objects.using(shard).bulk_create(
+            Note(
+                title=f'Заметка {index}',
+                text=TEXT,
+                slug=f'note-{index}',
+                author=author,
+            )
+            for index in range(start, min(start + BATCH_SIZE, count))
+        )
+
+
+def run(count, repeat):
+    from django.contrib.auth import get_user_model
+    from django.test import Client
+    from django.urls import reverse
+
+    from notes.models import Note
+    from notes.pagination import encode_cursor
+
+    author = get_user_model().objects.create(username='bench')
+    populate(author, count)
+    notes = Note.objects.for_author(author)
+    ids = list(notes.order_by('id').values_list('id', flat=True))
+    client = Client()
+    client.force_login(author)
+
+    rows = [(
+        'все заметки',
+        summary(measure(lambda: list(notes.all()), repeat=repeat)),
+    )]
+    for label, after in (
+        ('первая', None),
+        ('середина', ids[len(ids) // 2]),
+        ('последняя', ids[-2]),
+    ):
+        query = {'cursor': encode_cursor(after)} if after else {}
+        for name in ('list', 'page'):
+            url = reverse(f'notes:{name}')
+            rows.append((
+                f'{label} ({name})',
+                summary(measure(
+                    lambda: client.get(url, query), repeat=repeat
+                )),
+            ))
+    print_table(
+        ('страница', 'p50 мс', 'p95 мс'),
+        [(label, result['p50_ms'], result['p95_ms'])
+         for label, result in rows],
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--notes', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    setup_django()
+    with test_database():
+        run(args.notes, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""
+Поиск по заметкам автора: индекс FTS5 против фильтра ``icontains``.
+
+Запуск: ``python -m benchmarks.notes_search [--notes 50000]
+[--others 200000] [--repeat 20]``. В шарде автора лежат и заметки
+других пользователей: поиск не должен замедляться от чужих совпадений.
+Для каждого запроса измеряется первая страница результатов. Фильтр
+``icontains`` просматривает все заметки шарда и не ранжирует их,
+FTS5 читает только списки вхождений слов и автора.
+"""
+import argparse
+import random
+
+from benchmarks.utils import (
+    measure, print_table, setup_django, summary, test_database,
+)
+
+BATCH_SIZE = 5000
+WORDS = (
+    'список', 'покупок', 'идея', 'план', 'встреча', 'проект', 'книга',
+    'фильм', 'рецепт', 'задача', 'отпуск', 'звонок', 'отчёт', 'курс',
+)
+# Слово, которое встречается примерно в одной заметке из тысячи.
+RARE_WORD = 'космодром'
+QUERIES = (
+    ('частое слово', 'план'),
+    ('редкое слово', RARE_WORD),
+    ('два слова', 'план встреча'),
+    ('префикс', 'рец'),
+)
+
+
+def make_text(rng, words):
+    text = rng.choices(WORDS, k=words)
+    if rng.random() < 0.001:
+        text.append(RARE_WORD)
+    return ' '.join(text)
+
+
+def populate(shard, authors, count, rng, prefix):
+    from notes.models import Note
+
+    # Реестр slug для поиска не нужен, заметки пишутся сразу в шард.
+    for start in range(0, count, BATCH_SIZE):
+        Note.objects.using(shard).bulk_create(
+            Note(
+                title=make_text(rng, rng.randint(1, 4)),
+                text=make_text(rng, rng.randint(20, 80)),
+                slug=f'{prefix}-{index}',
+                author=rng.choice(authors),
+            )
+            for index in range(start, min(start + BATCH_SIZE, count))
+        )
+
+
+def run(count, others, repeat):
+    from django.contrib.auth import get_user_model
+    from django.db.models import Q
+
+    from notes.models import Note, ShardAssignment
+    from notes.search import search_notes
+
+    rng = random.Random(42)
+    User = get_user_model()
+    author = User.objects.create(username='bench')
+    strangers = [
+        User.objects.create(username=f'stranger-{index}')
+        for index in range(100)
+    ]
+    shard = ShardAssignment.objects.shard_for(author.pk, create=True)
+    populate(shard, [author], count, rng, 'own')
+    populate(shard, strangers, others, rng, 'other')
+
+    def icontains(query):
+        notes = Note.objects.for_author(author)
+        for word in query.split():
+            notes = notes.filter(
+                Q(title__icontains=word) | Q(text__icontains=word)
+            )
+        return list(notes.only('id', 'slug', 'title').order_by('id')[:20])
+
+    rows = []
+    for label, query in QUERIES:
+        for method, func in (
+            ('icontains', icontains),
+            ('fts5', lambda query: search_notes(author, query, limit=20)),
+        ):
+            result = summary(measure(lambda: func(query), repeat=repeat))
+            rows.append(
+                (label, method, result['p50_ms'], result['p95_ms'])
+            )
+    print_table(('запрос', 'способ', 'p50 мс', 'p95 мс'), rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--notes', type=int, default=50000)
+    parser.add_argument('--others', type=int, default=200000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    setup_django()
+    with test_database():
+        run(args.notes, args.others, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Общие утилиты для бенчмарков YaNote.
+
+Бенчмарки запускаются из каталога ``ya_note`` как модули, например:
+``python -m benchmarks.notes_list``. Каждый запуск работает во временной
+тестовой базе данных и не трогает рабочую ``db.sqlite3``.
+"""
+import os
+import statistics
+import time
+from contextlib import contextmanager
+
+
+def setup_django():
+    """Инициализирует Django с настройками проекта."""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanote.settings')
+    import django
+    django.setup()
+
+
+@contextmanager
+def test_database():
+    """Создаёт временную тестовую БД и удаляет её по завершении."""
+    from django.test.utils import (
+        setup_databases, setup_test_environment, teardown_databases,
+        teardown_test_environment,
+    )
+    setup_test_environment(debug=False)
+    old_config = setup_databases(verbosity=0, interactive=False)
+    try:
+        yield
+    finally:
+        teardown_databases(old_config, verbosity=0)
+        teardown_test_environment()
+
+
+def measure(func, repeat=50, warmup=3):
+    """Возвращает список длительностей вызова ``func`` в секундах."""
+    for _ in range(warmup):
+        func()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def percentile(timings, percent):
+    """Перцентиль по методу ближайшего ранга."""
+    ordered = sorted(timings)
+    index = max(0, round(percent / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+
+def summary(timings):
+    """Медиана и p95 в миллисекундах."""
+    return {
+        'p50_ms': round(statistics.median(timings) * 1000, 3),
+        'p95_ms': round(percentile(timings, 95) * 1000, 3),
+    }
+
+
+def print_table(header, rows):
+    """Печатает результаты простой текстовой таблицей."""
+    widths = [
+        max(len(str(value)) for value in column)
+        for column in zip(header, *rows)
+    ]
+    for row in (header, *rows):
+        print('  '.join(
+            str(value).rjust(width) for value, width in zip(row, widths)
+        ))
@@ -1,5 +1,92 @@
+from django.conf import settings
 from django.contrib import admin
+from django.contrib.auth import get_permission_codename, get_user_model
+from django.contrib.auth.admin import UserAdmin
+from django.db import DEFAULT_DB_ALIAS
+from django.http import QueryDict
 
 from .models import Note
+from .services import delete_user
 
-admin.site.register(Note)
+User = get_user_model()
+
+admin.site.unregister(User)
+
+
+class ShardFilter(admin.SimpleListFilter):
+    """Шард, заметки которого показывает список. По умолчанию — default."""
+    title = 'шард'
+    parameter_name = 'shard'
+
+    def lookups(self, request, model_admin):
+        return [(shard, shard) for shard in settings.NOTE_SHARDS]
+
+    def queryset(self, request, queryset):
+        return queryset.using(shard_of(self.value()))
+
+
+def shard_of(value):
+    return value if value in settings.NOTE_SHARDS else DEFAULT_DB_ALIAS
+
+
+@admin.register(Note)
+class NoteAdmin(admin.ModelAdmin):
+    """
+    Заметки в админке, по одному шарду за раз.
+
+    В разных шардах ``pk`` заметок повторяются, поэтому объединить
+    шарды в одном списке нельзя. Шард выбирается фильтром, а страницы
+    заметки берут его из сохранённых фильтров списка.
+    """
+    list_display = ('title', 'slug')
+    list_filter = (ShardFilter,)
+    # Общее число считалось бы по default, а не по выбранному шарду.
+    show_full_result_count = False
+
+    def get_queryset(self, request):
+        filters = QueryDict(request.GET.get('_changelist_filters', ''))
+        return super().get_queryset(request).using(
+            shard_of(filters.get(ShardFilter.parameter_name))
+        )
+
+    def delete_queryset(self, request, queryset):
+        # Note.delete() освобождает slug в реестре.
+        for note in queryset:
+            note.delete()
+
+
+@admin.register(User)
+class ChunkedDeleteUserAdmin(UserAdmin):
+    """
+    Удаление пользователей вместе с заметками без загрузки их в память.
+
+    Страница подтверждения показывает число заметок вместо полного
+    списка, а сами заметки удаляются партиями.
+    """
+
+    def get_deleted_objects(self, objs, request):
+        objs = list(objs)
+        notes = sum(
+            queryset.count() for queryset in
+            Note.objects.filter(author__in=objs).on_each_shard()
+        )
+        deleted_objects = [str(obj) for obj in objs]
+        model_count = {self.opts.verbose_name_plural: len(objs)}
+        perms_needed = set()
+        if notes:
+            note_opts = Note._meta
+            deleted_objects.append(
+                f'{note_opts.verbose_name_plural}: {notes}'
+            )
+            model_count[note_opts.verbose_name_plural] = notes
+            codename = get_permission_codename('delete', note_opts)
+            if not request.user.has_perm(f'{note_opts.app_label}.{codename}'):
+                perms_needed.add(note_opts.verbose_name)
+        return deleted_objects, model_count, perms_needed, []
+
+    def delete_model(self, request, obj):
+        delete_user(obj)
+
+    def delete_queryset(self, request, queryset):
+        for user in queryset:
+            delete_user(user)
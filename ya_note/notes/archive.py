@@ -0,0 +1,190 @@
+"""
+Выгрузка и загрузка заметок автора в формате NDJSON.
+
+Выгрузка читает шард автора ``iterator(chunk_size)`` и отдаёт строки
+по мере чтения. Загрузка читает тело запроса построчно, проверяет
+записи правилами ``NoteForm`` и сохраняет их пакетами по
+``IMPORT_BATCH_SIZE``: занятость указанных slug проверяется одним
+запросом на пакет, пустые slug выбираются пакетно, заметки пишутся
+в шард одним ``bulk_create`` в отдельной транзакции.
+"""
+import json
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+
+from .cache import AuthorCache
+from .forms import WARNING, NoteImportForm
+from .models import Note, NoteSlug, ShardAssignment
+from .slugs import reserve_slugs
+
+# Сколько ошибок попадает в ответ, остальные только считаются.
+MAX_REPORTED_ERRORS = 100
+
+CHUNK_SIZE = 64 * 1024
+
+
+def iter_lines(stream, chunk_size=CHUNK_SIZE):
+    """
+    Строки двоичного потока, прочитанного блоками.
+
+    ``readline`` у потока запроса Django копирует весь непрочитанный
+    остаток тела на каждой строке, поэтому строки выделяются здесь.
+    """
+    tail = b''
+    for chunk in iter(lambda: stream.read(chunk_size), b''):
+        lines = (tail + chunk).split(b'\n')
+        tail = lines.pop()
+        yield from lines
+    if tail:
+        yield tail
+
+
+def export_notes(author, chunk_size=None):
+    """Заметки автора по возрастанию ключа."""
+    notes = Note.objects.for_author(author).order_by('id').values_list(
+        'title', 'text', 'slug'
+    )
+    for title, text, slug in notes.iterator(
+        chunk_size=chunk_size or settings.EXPORT_CHUNK_SIZE
+    ):
+        yield {'title': title, 'text': text, 'slug': slug}
+
+
+def ndjson(rows):
+    """Строки NDJSON для ``StreamingHttpResponse``."""
+    for row in rows:
+        yield json.dumps(
+            row, cls=DjangoJSONEncoder, ensure_ascii=False
+        ) + '\n'
+
+
+class NoteImport:
+    """
+    Загрузка заметок автора из строк NDJSON.
+
+    Ошибочные записи пропускаются, итог возвращает ``run``: число
+    созданных заметок и ошибки с номерами строк.
+    """
+
+    def __init__(self, author, batch_size=None):
+        self.author = author
+        self.batch_size = batch_size or settings.IMPORT_BATCH_SIZE
+        self.shard = ShardAssignment.objects.shard_for(
+            author.pk, create=True
+        )
+        self.form = NoteImportForm()
+        self.created = 0
+        self.skipped = 0
+        self.errors = []
+
+    def run(self, lines):
+        batch = []
+        for number, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            note = self.build(number, line)
+            if note is not None:
+                batch.append((number, note))
+            if len(batch) >= self.batch_size:
+                self.save(batch)
+                batch = []
+        if batch:
+            self.save(batch)
+        return {
+            'created': self.created,
+            'skipped': self.skipped,
+            'errors': self.errors,
+        }
+
+    def error(self, number, errors):
+        self.skipped += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'line': number, 'errors': errors})
+
+    def build(self, number, line):
+        """Заметка из строки или None, если запись неверна."""
+        try:
+            record = json.loads(line)
+        except ValueError:
+            record = None
+        if not isinstance(record, dict):
+            self.error(number, {'__all__': [
+                {'message': 'Строка не является объектом JSON.', 'code': ''}
+            ]})
+            return None
+        note = Note(author=self.author)
+        if not self.form.validate(record, note):
+            self.error(number, self.form.errors.get_json_data())
+            return None
+        return note
+
+    def save(self, batch):
+        """Резервирует slug пакета и пишет его заметки в шард."""
+        taken = self.taken([note for _, note in batch])
+        pending = []
+        for number, note in batch:
+            if note.slug in taken:
+                self.slug_taken(number, note)
+                continue
+            if note.slug:
+                # Повтор slug внутри пакета тоже занят.
+                taken.add(note.slug)
+            pending.append((number, note, bool(note.slug)))
+        notes = self.reserve(pending)
+        if not notes:
+            return
+        try:
+            with transaction.atomic(using=self.shard):
+                Note.objects.using(self.shard).bulk_create(notes)
+        except Exception:
+            NoteSlug.objects.filter(
+                slug__in=[note.slug for note in notes]
+            ).delete()
+            raise
+        # bulk_create не отправляет сигналов.
+        AuthorCache(self.author.pk).invalidate(using=self.shard)
+        self.created += len(notes)
+
+    def taken(self, notes):
+        """Указанные slug заметок, которые уже есть в реестре."""
+        return set(NoteSlug.objects.filter(
+            slug__in=[note.slug for note in notes if note.slug]
+        ).values_list('slug', flat=True))
+
+    def slug_taken(self, number, note):
+        self.error(number, {'slug': [
+            {'message': note.slug + WARNING, 'code': 'unique'}
+        ]})
+
+    def reserve(self, pending):
+        """
+        Резервирует slug записей ``(номер, заметка, slug указан)``.
+
+        Указанный slug может занять параллельный запрос уже после
+        проверки пакета: такие записи отклоняются как занятые,
+        остальные резервируются заново. Возвращает заметки с slug.
+        """
+        while pending:
+            for _, note, explicit in pending:
+                if not explicit:
+                    note.slug = ''
+            notes = [note for _, note, _ in pending]
+            try:
+                reserve_slugs(notes)
+                return notes
+            except IntegrityError:
+                taken = self.taken(
+                    note for _, note, explicit in pending if explicit
+                )
+                if not taken:
+                    raise
+            remaining = []
+            for number, note, explicit in pending:
+                if explicit and note.slug in taken:
+                    self.slug_taken(number, note)
+                else:
+                    remaining.append((number, note, explicit))
+            pending = remaining
+        return []
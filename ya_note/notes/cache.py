@@ -0,0 +1,89 @@
+"""
+Кеш заметок YaNote.
+
+Записи автора — страницы списка и отдельные заметки — хранятся
+под общей версией, которая передаётся в аргумент ``version`` кеша
+Django. Сама версия лежит в кеше отдельным ключом: любое изменение
+заметок автора увеличивает её, и старые записи перестают читаться.
+Кеш общий для всех процессов сервера, поэтому версию видят все они.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .stats import CacheStats
+
+# Отличает отсутствие записи от закешированного None.
+MISSING = object()
+
+
+class AuthorCache:
+    """Записи кеша заметок одного автора."""
+
+    def __init__(self, author_id):
+        self.prefix = f'notes:{author_id}'
+        self.version_key = f'{self.prefix}:version'
+
+    def version(self):
+        version = cache.get(self.version_key)
+        if version is None:
+            # Если счётчик вытеснен, новый начинается с текущего
+            # времени и не совпадёт ни с одной из прежних версий.
+            cache.add(self.version_key, time.time_ns(), None)
+            version = cache.get(self.version_key)
+        return version
+
+    def bump(self):
+        try:
+            cache.incr(self.version_key)
+        except ValueError:
+            self.version()
+
+    def invalidate(self, using=None):
+        """
+        Меняет версию сейчас и ещё раз после фиксации транзакции.
+
+        Второй раз нужен, чтобы не осталось записи, прочитанной
+        параллельным запросом до фиксации. Заметки пишутся в шард,
+        поэтому ждать нужно транзакцию ``using``.
+        """
+        self.bump()
+        transaction.on_commit(self.bump, using=using)
+
+    def get_or_compute(self, stats, parts, compute):
+        """
+        Значение ``compute()`` из кеша автора.
+
+        ``None`` тоже кешируется: отсутствие заметки — такой же ответ.
+        Версия читается один раз, поэтому значение, посчитанное
+        во время инвалидации, попадает в уже устаревшую версию.
+        """
+        digest = hashlib.md5(
+            ':'.join(str(part) for part in parts).encode()
+        ).hexdigest()
+        key = f'{self.prefix}:{digest}'
+        version = self.version()
+        value = cache.get(key, MISSING, version=version)
+        if value is not MISSING:
+            stats.hit()
+            return value
+        stats.miss()
+        value = compute()
+        cache.set(
+            key, value, settings.NOTES_CACHE_TIMEOUT, version=version
+        )
+        return value
+
+
+def invalidate_all():
+    """Сбрасывает весь кеш после массовой загрузки данных в обход сигналов."""
+    cache.clear()
+
+
+# Все счётчики объявлены здесь: команда cache_stats видит их, не
+# импортируя модули, которые их увеличивают.
+list_stats = CacheStats('notes:list')
+detail_stats = CacheStats('notes:detail')
@@ -1,8 +1,7 @@
 from django import forms
 from django.core.exceptions import ValidationError
-from pytils.translit import slugify
 
-from .models import Note
+from .models import Note, NoteSlug
 
 WARNING = ' - такой slug уже существует, придумайте уникальное значение!'
 
@@ -15,14 +14,56 @@ class NoteForm(forms.ModelForm):
         fields = ('title', 'text', 'slug')
 
     def clean_slug(self):
-        """Обрабатывает случай, если slug не уникален."""
+        """
+        Обрабатывает случай, если slug не уникален.
+
+        Заметки разных авторов лежат в разных шардах, поэтому занятость
+        slug проверяется по общему реестру в базе ``default``. Пустой
+        slug свободный вариант получит при сохранении.
+        """
         cleaned_data = super().clean()
         slug = cleaned_data.get('slug')
-        if not slug:
-            title = cleaned_data.get('title')
-            slug = slugify(title)[:100]
-        if Note.objects.filter(
-                slug=slug
-        ).exclude(id=self.instance.pk).exists():
+        if (
+            slug
+            and slug != self.instance.get_saved_slug()
+            and NoteSlug.objects.filter(slug=slug).exists()
+        ):
             raise ValidationError(slug + WARNING)
         return slug
+
+
+class NoteImportForm(NoteForm):
+    """
+    Проверка записей импорта по правилам ``NoteForm``.
+
+    Занятость slug проверяется сразу для пакета записей, а не запросом
+    на каждую. Конструктор формы копирует её поля, поэтому одна форма
+    проверяет все записи импорта по очереди через ``validate``.
+    """
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('data', {})
+        super().__init__(*args, **kwargs)
+
+    def validate(self, data, instance):
+        """
+        Проверяет запись ``data``, заполняя новый объект ``instance``.
+
+        Значения полей в JSON должны быть строками: форма привела бы
+        к строке и число, и список.
+        """
+        self.data = data
+        self.instance = instance
+        self.full_clean()
+        for name in self.fields:
+            if not isinstance(data.get(name, ''), str):
+                self.add_error(name, ValidationError(
+                    'Значение должно быть строкой.', code='invalid'
+                ))
+        return self.is_valid()
+
+    def clean_slug(self):
+        return self.cleaned_data.get('slug')
+
+    def validate_unique(self):
+        pass
@@ -0,0 +1,110 @@
+import json
+import statistics
+import time
+from urllib.parse import urlencode
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+from django.test import Client
+from django.urls import reverse
+
+from benchmarks.utils import percentile
+from notes.models import Note
+from notes.queries import record_requests
+from notes.urls import urlpatterns
+
+
+class Command(BaseCommand):
+    help = (
+        'Прогоняет все маршруты notes.urls через тестовый клиент и выводит '
+        'задержки, число SQL-запросов и пропускную способность в JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=100)
+        parser.add_argument('--output', help='Файл для JSON-отчёта.')
+
+    def handle(self, *args, **options):
+        # Самый активный автор — худший случай для списка заметок.
+        # Заметки лежат в шардах, поэтому считаем по реестру slug.
+        author = get_user_model().objects.annotate(
+            notes_count=Count('noteslug')
+        ).order_by('-notes_count').first()
+        note = author and Note.objects.for_author(author).first()
+        if note is None:
+            self.stderr.write('Нет данных, запустите generate_data.')
+            return
+        routes = {
+            'home': (),
+            'add': (),
+            'edit': (note.slug,),
+            'detail': (note.slug,),
+            'delete': (note.slug,),
+            'list': (),
+            'page': (),
+            'search': (),
+            'export': (),
+            'success': (),
+            'import': (),
+        }
+        # Параметры строки запроса.
+        queries = {'search': {'q': note.title.split()[0]}}
+        # Маршруты, которые принимают только POST, и тела их запросов.
+        bodies = {
+            'import': json.dumps(
+                {'title': note.title, 'text': note.text}, ensure_ascii=False
+            ).encode(),
+        }
+        client = Client()
+        client.force_login(author)
+        report = {}
+        for pattern in urlpatterns:
+            if pattern.name not in routes:
+                self.stderr.write(
+                    f'Пропущен маршрут без образца: {pattern.name}'
+                )
+                continue
+            url = reverse(f'notes:{pattern.name}', args=routes[pattern.name])
+            if pattern.name in queries:
+                url += '?' + urlencode(queries[pattern.name])
+            report[pattern.name] = self.measure(
+                client,
+                url,
+                options['requests'],
+                bodies.get(pattern.name),
+            )
+        output = json.dumps(report, indent=2, sort_keys=True)
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                file.write(output)
+        self.stdout.write(output)
+
+    def measure(self, client, url, requests, body=None):
+        timings = []
+        with record_requests() as records:
+            started = time.perf_counter()
+            for _ in range(requests):
+                start = time.perf_counter()
+                if body is None:
+                    response = client.get(url)
+                else:
+                    response = client.post(
+                        url, body, content_type='application/x-ndjson'
+                    )
+                if response.streaming:
+                    # Выгрузка читает базу, пока отдаёт тело ответа.
+                    b''.join(response.streaming_content)
+                timings.append(time.perf_counter() - start)
+            elapsed = time.perf_counter() - started
+        return {
+            'url': url,
+            'requests': requests,
+            'p50_ms': round(percentile(timings, 50) * 1000, 3),
+            'p95_ms': round(percentile(timings, 95) * 1000, 3),
+            'p99_ms': round(percentile(timings, 99) * 1000, 3),
+            'queries': round(
+                statistics.mean(record.count for record in records), 2
+            ),
+            'rps': round(requests / elapsed, 1),
+        }
@@ -0,0 +1,29 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from notes.services import delete_user
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет пользователя вместе с заметками партиями, '
+        'не загружая заметки в память.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', required=True)
+        parser.add_argument('--batch-size', type=int)
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        try:
+            user = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f'Пользователь {options["user"]} не найден.')
+        total, deleted = delete_user(user, options['batch_size'])
+        details = ', '.join(
+            f'{label}: {count}' for label, count in sorted(deleted.items())
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f'Удалено объектов: {total} ({details})')
+        )
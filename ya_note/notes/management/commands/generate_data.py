@@ -0,0 +1,101 @@
+import random
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from notes.cache import invalidate_all
+from notes.models import Note, NoteSlug, ShardAssignment
+from notes.slugs import transliterate
+
+WORDS = (
+    'список', 'покупок', 'идея', 'план', 'встреча', 'проект', 'книга',
+    'фильм', 'рецепт', 'задача', 'отпуск', 'звонок', 'отчёт', 'курс',
+    'код', 'ревью', 'подарок', 'цель', 'привычка', 'заметка',
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Детерминированно генерирует пользователей и заметки '
+        'с реалистичными распределениями.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--notes', type=int, default=10000)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        with transaction.atomic():
+            users = self.create_users(options['users'], options['seed'])
+            self.create_notes(options['notes'], users, options['seed'])
+        invalidate_all()
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано: пользователей {len(users)}, '
+            f'заметок {options["notes"]}'
+        ))
+
+    def sentence(self, min_words, max_words):
+        words = self.rng.choices(
+            WORDS, k=self.rng.randint(min_words, max_words)
+        )
+        return ' '.join(words).capitalize()
+
+    def create_users(self, count, seed):
+        User = get_user_model()
+        password = make_password(None)
+        User.objects.bulk_create(
+            (
+                User(username=f'user-{seed}-{index}', password=password)
+                for index in range(count)
+            ),
+            batch_size=self.batch_size,
+        )
+        return list(User.objects.filter(
+            username__startswith=f'user-{seed}-'
+        ).values_list('pk', flat=True))
+
+    def create_notes(self, count, users, seed):
+        if not users:
+            return
+        # Число заметок у пользователей распределено по Парето:
+        # у немногих — тысячи, у большинства — единицы.
+        weights = [self.rng.paretovariate(1.2) for _ in users]
+        authors = self.rng.choices(users, weights=weights, k=count)
+        shards = {
+            author_id: ShardAssignment.objects.shard_for(
+                author_id, create=True
+            )
+            for author_id in set(authors)
+        }
+        batch = []
+        for index, author_id in enumerate(authors):
+            title = self.sentence(1, 4)
+            batch.append(Note(
+                title=title,
+                text=self.sentence(
+                    3, max(3, int(self.rng.lognormvariate(3, 0.8)))
+                ),
+                slug=f'{transliterate(title)[:80]}-{seed}-{index}',
+                author_id=author_id,
+            ))
+            if len(batch) >= self.batch_size:
+                self.save_notes(batch, shards)
+                batch = []
+        self.save_notes(batch, shards)
+
+    def save_notes(self, notes, shards):
+        """Сохраняет заметки в шарды авторов, а их slug — в реестр."""
+        NoteSlug.objects.bulk_create(
+            NoteSlug(slug=note.slug, author_id=note.author_id)
+            for note in notes
+        )
+        for shard in set(shards.values()):
+            Note.objects.using(shard).bulk_create(
+                note for note in notes if shards[note.author_id] == shard
+            )
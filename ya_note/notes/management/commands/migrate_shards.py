@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+
+class Command(BaseCommand):
+    help = (
+        'Применяет миграции к основной базе и ко всем шардам заметок: '
+        'migrate без --database обновляет только default.'
+    )
+
+    def handle(self, *args, **options):
+        for alias in dict.fromkeys([DEFAULT_DB_ALIAS, *settings.NOTE_SHARDS]):
+            self.stdout.write(f'База {alias}:')
+            call_command(
+                'migrate', database=alias, interactive=False,
+                verbosity=options['verbosity'], stdout=self.stdout,
+            )
@@ -0,0 +1,135 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from notes.cache import AuthorCache
+from notes.models import Note, ShardAssignment
+from notes.services import delete_in_batches
+
+
+class Command(BaseCommand):
+    help = (
+        'Переносит заметки автора в другой шард: копирует их партиями, '
+        'переключает назначение шарда и удаляет заметки из старого. '
+        'Пока заметки переносятся, автор не может их менять.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument('shard', choices=settings.NOTE_SHARDS)
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        try:
+            author = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(
+                f'Пользователь {options["username"]} не найден.'
+            )
+        source = ShardAssignment.objects.shard_for(author.pk)
+        target = options['shard']
+        if source == target:
+            self.stdout.write(f'Заметки уже в шарде {target}.')
+            return
+        # Пока флаг стоит, представления не меняют заметки автора.
+        # Если перенос прервётся, флаг останется, а повторный запуск
+        # продолжит копирование.
+        ShardAssignment.objects.update_or_create(
+            author=author, defaults={'shard': source, 'moving': True}
+        )
+        copied = self.copy_notes(author, source, target, options)
+        # Запросы, начатые до установки флага, могли успеть изменить
+        # заметки: второй проход докопирует их.
+        copied += self.copy_notes(author, source, target, options)
+        dropped = self.drop_stale(author, source, target, options)
+        # С этого момента представления читают и пишут в новый шард.
+        ShardAssignment.objects.filter(author=author).update(
+            shard=target, moving=False
+        )
+        # В кеше лежат заметки, загруженные из старого шарда.
+        AuthorCache(author.pk).invalidate()
+        deleted = delete_in_batches(
+            Note.objects.using(source).filter(author=author),
+            batch_size=options['batch_size'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Перенесено заметок: {copied} ({source} -> {target}), '
+            f'удалено лишних из {target}: {dropped}, '
+            f'удалено из {source}: {deleted}'
+        ))
+
+    def copy_notes(self, author, source, target, options):
+        """
+        Копирует заметки партиями по возрастанию ключа.
+
+        Ключи в шардах независимы, поэтому в новом шарде заметки
+        получают новые ключи и сопоставляются со старыми по slug:
+        slug уникален во всех шардах, реестр не меняется. Уже
+        скопированные заметки пропускаются, изменённые обновляются,
+        поэтому повторный проход копирует только отличия.
+        Возвращает число созданных и обновлённых заметок.
+        """
+        notes = Note.objects.using(source).filter(
+            author=author
+        ).order_by('pk').values_list('pk', 'title', 'text', 'slug')
+        copies = Note.objects.using(target).filter(author=author)
+        copied = last_pk = 0
+        while True:
+            batch = list(
+                notes.filter(pk__gt=last_pk)[:options['batch_size']]
+            )
+            if not batch:
+                return copied
+            last_pk = batch[-1][0]
+            existing = {
+                slug: (pk, title, text)
+                for pk, title, text, slug in copies.filter(
+                    slug__in=[row[3] for row in batch]
+                ).values_list('pk', 'title', 'text', 'slug')
+            }
+            created, updated = [], []
+            for _, title, text, slug in batch:
+                if slug not in existing:
+                    created.append(Note(
+                        title=title, text=text, slug=slug, author=author,
+                    ))
+                elif existing[slug][1:] != (title, text):
+                    updated.append(Note(
+                        pk=existing[slug][0], title=title, text=text,
+                        slug=slug, author=author,
+                    ))
+            with transaction.atomic(using=target):
+                Note.objects.using(target).bulk_create(created)
+                Note.objects.using(target).bulk_update(
+                    updated, ('title', 'text')
+                )
+            copied += len(created) + len(updated)
+
+    def drop_stale(self, author, source, target, options):
+        """
+        Удаляет из нового шарда копии заметок, которых нет в старом.
+
+        Они остаются, если заметку удалили или сменили ей slug
+        после копирования. Возвращает число удалённых копий.
+        """
+        copies = Note.objects.using(target).filter(
+            author=author
+        ).order_by('pk').values_list('pk', 'slug')
+        notes = Note.objects.using(source).filter(author=author)
+        dropped = last_pk = 0
+        while True:
+            batch = list(
+                copies.filter(pk__gt=last_pk)[:options['batch_size']]
+            )
+            if not batch:
+                return dropped
+            last_pk = batch[-1][0]
+            kept = set(notes.filter(
+                slug__in=[slug for _, slug in batch]
+            ).values_list('slug', flat=True))
+            stale = [pk for pk, slug in batch if slug not in kept]
+            if stale:
+                Note.objects.using(target).filter(pk__in=stale).delete()
+            dropped += len(stale)
@@ -0,0 +1,64 @@
+# Generated by Django 3.2.15 on 2026-10-18 04:45
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def register_existing_notes(apps, schema_editor):
+    """До шардирования все заметки лежали в default: закрепляем их там."""
+    Note = apps.get_model('notes', 'Note')
+    NoteSlug = apps.get_model('notes', 'NoteSlug')
+    ShardAssignment = apps.get_model('notes', 'ShardAssignment')
+    db = schema_editor.connection.alias
+    notes = Note.objects.using(db)
+    NoteSlug.objects.using(db).bulk_create(
+        (
+            NoteSlug(slug=slug, author_id=author_id)
+            for slug, author_id in notes.values_list(
+                'slug', 'author_id'
+            ).iterator()
+        ),
+        batch_size=1000,
+    )
+    ShardAssignment.objects.using(db).bulk_create(
+        ShardAssignment(author_id=author_id, shard=db)
+        for author_id in notes.values_list(
+            'author_id', flat=True
+        ).distinct().order_by()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('notes', '0002_note_author_id_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ShardAssignment',
+            fields=[
+                ('author', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='note_shard', serialize=False, to='auth.user')),
+                ('shard', models.CharField(max_length=100)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='note',
+            name='author',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.CreateModel(
+            name='NoteSlug',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('slug', models.SlugField(max_length=100, unique=True)),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.RunPython(
+            register_existing_notes, migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,80 @@
+from django.db import migrations
+
+# unicode61 не считает «ё» буквой «е» с диакритикой, поэтому в индекс
+# попадает текст с заменой «ё» на «е». Та же замена делается в запросе.
+# Автор тоже индексируется: поиск фильтрует по нему внутри MATCH,
+# не перебирая совпадения чужих заметок.
+TITLE = "replace(replace({}.title, 'ё', 'е'), 'Ё', 'Е')"
+TEXT = "replace(replace({}.text, 'ё', 'е'), 'Ё', 'Е')"
+NEW = f"{TITLE.format('new')}, {TEXT.format('new')}, new.author_id"
+OLD = f"{TITLE.format('old')}, {TEXT.format('old')}, old.author_id"
+
+CREATE_SQL = (
+    """
+    CREATE VIRTUAL TABLE notes_note_fts USING fts5(
+        title, text, author_id,
+        content='notes_note', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    f"""
+    CREATE TRIGGER notes_note_fts_insert AFTER INSERT ON notes_note BEGIN
+        INSERT INTO notes_note_fts(rowid, title, text, author_id)
+        VALUES (new.id, {NEW});
+    END
+    """,
+    f"""
+    CREATE TRIGGER notes_note_fts_delete AFTER DELETE ON notes_note BEGIN
+        INSERT INTO notes_note_fts(notes_note_fts, rowid, title, text,
+                                   author_id)
+        VALUES ('delete', old.id, {OLD});
+    END
+    """,
+    f"""
+    CREATE TRIGGER notes_note_fts_update AFTER UPDATE OF title, text, author_id
+    ON notes_note BEGIN
+        INSERT INTO notes_note_fts(notes_note_fts, rowid, title, text,
+                                   author_id)
+        VALUES ('delete', old.id, {OLD});
+        INSERT INTO notes_note_fts(rowid, title, text, author_id)
+        VALUES (new.id, {NEW});
+    END
+    """,
+    f"""
+    INSERT INTO notes_note_fts(rowid, title, text, author_id)
+    SELECT id, {TITLE.format('notes_note')}, {TEXT.format('notes_note')},
+        author_id
+    FROM notes_note
+    """,
+)
+
+DROP_SQL = (
+    'DROP TRIGGER IF EXISTS notes_note_fts_insert',
+    'DROP TRIGGER IF EXISTS notes_note_fts_delete',
+    'DROP TRIGGER IF EXISTS notes_note_fts_update',
+    'DROP TABLE IF EXISTS notes_note_fts',
+)
+
+
+def run_on_sqlite(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0003_note_shards'),
+    ]
+
+    operations = [
+        # Таблица заметок есть в каждом шарде, индекс — тоже.
+        migrations.RunPython(
+            run_on_sqlite(CREATE_SQL), run_on_sqlite(DROP_SQL),
+            hints={'model_name': 'note'},
+        ),
+    ]
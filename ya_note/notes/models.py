@@ -1,6 +1,79 @@
+import zlib
+
 from django.conf import settings
 from django.db import models
-from pytils.translit import slugify
+
+
+class ShardAssignmentManager(models.Manager):
+
+    def shard_for(self, author_id, create=False):
+        """
+        Алиас базы, в которой хранятся заметки автора.
+
+        Новый автор попадает в шард по стабильному хешу своего ключа.
+        С ``create=True`` выбор сохраняется в таблице назначений: тогда
+        добавление шардов в настройки не переносит уже существующих
+        авторов, а команда ``move_author_notes`` может его изменить.
+        """
+        shards = settings.NOTE_SHARDS
+        if len(shards) == 1:
+            return shards[0]
+        shard = self.filter(author_id=author_id).values_list(
+            'shard', flat=True
+        ).first()
+        if shard is not None:
+            return shard
+        shard = shards[zlib.crc32(str(author_id).encode()) % len(shards)]
+        if create:
+            shard = self.get_or_create(
+                author_id=author_id, defaults={'shard': shard}
+            )[0].shard
+        return shard
+
+    def is_moving(self, author_id):
+        """Переносит ли ``move_author_notes`` заметки автора сейчас."""
+        return self.filter(author_id=author_id, moving=True).exists()
+
+
+class ShardAssignment(models.Model):
+    """Шард, закреплённый за автором. Хранится в базе ``default``."""
+    author = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='note_shard',
+    )
+    shard = models.CharField(max_length=100)
+    # Пока заметки переносятся, представления не принимают изменений.
+    moving = models.BooleanField(default=False)
+
+    objects = ShardAssignmentManager()
+
+
+class NoteSlug(models.Model):
+    """
+    Реестр slug всех заметок в базе ``default``.
+
+    Уникальный индекс шарда видит только его заметки, уникальность
+    между шардами обеспечивает этот реестр.
+    """
+    slug = models.SlugField(max_length=100, unique=True)
+    author = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+    )
+
+
+class NoteQuerySet(models.QuerySet):
+
+    def for_author(self, author):
+        """Заметки автора из его шарда."""
+        shard = ShardAssignment.objects.shard_for(author.pk)
+        return self.using(shard).filter(author=author)
+
+    def on_each_shard(self):
+        """Копии запроса для каждого шарда."""
+        return [self.using(shard) for shard in settings.NOTE_SHARDS]
 
 
 class Note(models.Model):
@@ -22,16 +95,78 @@ class Note(models.Model):
         help_text=('Укажите адрес для страницы заметки. Используйте только '
                    'латиницу, цифры, дефисы и знаки подчёркивания')
     )
+    # Пользователи живут в default, заметки — в шардах: внешний ключ
+    # между базами СУБД проверить не может.
     author = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
+        db_constraint=False,
     )
 
+    objects = NoteQuerySet.as_manager()
+
+    class Meta:
+        indexes = (
+            models.Index(fields=('author', 'id'), name='note_author_id_idx'),
+        )
+
     def __str__(self):
         return self.title
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Сохранённый slug нужен, чтобы при переименовании
+        # освободить его в реестре.
+        if 'slug' in field_names:
+            instance._saved_slug = instance.slug
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None):
+        super().refresh_from_db(using, fields)
+        if fields is None or 'slug' in fields:
+            self._saved_slug = self.slug
+
+    def get_saved_slug(self):
+        if self._state.adding:
+            return None
+        if not hasattr(self, '_saved_slug'):
+            self._saved_slug = type(self).objects.using(
+                self._state.db
+            ).filter(pk=self.pk).values_list('slug', flat=True).first()
+        return self._saved_slug
+
     def save(self, *args, **kwargs):
-        if not self.slug:
-            max_slug_length = self._meta.get_field('slug').max_length
-            self.slug = slugify(self.title)[:max_slug_length]
-        super().save(*args, **kwargs)
+        """
+        Сохраняет заметку в шард автора и резервирует её slug в реестре.
+
+        Пустой slug выбирается по заголовку, занятый указанный slug
+        приводит к ``IntegrityError`` ещё до записи в шард. Если запись
+        в шард не удалась, резерв снимается.
+        """
+        # slugs импортирует модели, поэтому импорт отложен.
+        from .slugs import reserve_slug
+
+        saved_slug = self.get_saved_slug()
+        if self._state.adding:
+            kwargs['using'] = ShardAssignment.objects.shard_for(
+                self.author_id, create=True
+            )
+        if not self.slug or self.slug != saved_slug:
+            reserve_slug(self, keep=saved_slug)
+        if self.slug == saved_slug:
+            super().save(*args, **kwargs)
+            return
+        try:
+            super().save(*args, **kwargs)
+        except Exception:
+            NoteSlug.objects.filter(slug=self.slug).delete()
+            raise
+        if saved_slug is not None:
+            NoteSlug.objects.filter(slug=saved_slug).delete()
+        self._saved_slug = self.slug
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        NoteSlug.objects.filter(slug=self.slug).delete()
+        return result
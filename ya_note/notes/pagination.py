@@ -0,0 +1,50 @@
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import BadRequest
+
+CURSOR_SALT = 'notes.pagination.cursor'
+
+
+def encode_cursor(*values, salt=CURSOR_SALT):
+    """Упаковывает значения ключа страницы в непрозрачную строку."""
+    return signing.dumps(values, salt=salt, compress=True)
+
+
+def decode_cursor(cursor, types, salt=CURSOR_SALT):
+    """
+    Распаковывает курсор со значениями типов ``types``.
+
+    Подделанный курсор, как и подписанный курсор другой формы,
+    приводит к ответу 400, а не к ошибке при разборе ключа.
+    """
+    try:
+        values = signing.loads(cursor, salt=salt)
+    except signing.BadSignature:
+        values = None
+    if not (
+        isinstance(values, list)
+        and len(values) == len(types)
+        and all(map(isinstance, values, types))
+    ):
+        raise BadRequest('Некорректный курсор.')
+    return values
+
+
+def notes_page(queryset, cursor=None, limit=None):
+    """
+    Страница заметок по ключу ``id``.
+
+    Из базы читаются только выводимые в списке поля. Возвращает список
+    заметок и курсор следующей страницы (``None``, если страница
+    последняя). Стоимость запроса не зависит от номера страницы.
+    """
+    limit = limit or settings.NOTES_PER_PAGE
+    notes = queryset.only('id', 'slug', 'title').order_by('id')
+    if cursor:
+        last_id, = decode_cursor(cursor, (int,))
+        notes = notes.filter(id__gt=last_id)
+    page = list(notes[:limit + 1])
+    if len(page) <= limit:
+        return page, None
+    page = page[:limit]
+    return page, encode_cursor(page[-1].id)
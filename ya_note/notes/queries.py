@@ -0,0 +1,116 @@
+"""
+Учёт SQL-запросов по запросам и представлениям.
+
+Счётчик подключается через ``execute_wrapper`` ко всем соединениям
+на время обработки запроса. Итоги копятся по имени представления,
+а в режиме отладки отдаются в заголовках ответа.
+"""
+import threading
+import time
+from collections import defaultdict, namedtuple
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+RequestQueries = namedtuple(
+    'RequestQueries', ('view_name', 'path', 'count', 'duration')
+)
+
+view_stats = defaultdict(lambda: {'requests': 0, 'queries': 0, 'time': 0.0})
+_stats_lock = threading.Lock()
+_recorders = []
+
+
+class QueryCounter:
+    """Считает число и суммарное время выполненных запросов."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - start
+
+
+@contextmanager
+def record_requests():
+    """Собирает статистику всех запросов, обработанных внутри блока."""
+    records = []
+    _recorders.append(records)
+    try:
+        yield records
+    finally:
+        # Списки сравниваются по значению, поэтому удаляем по identity.
+        _recorders[:] = [
+            recorder for recorder in _recorders if recorder is not records
+        ]
+
+
+def over_budget(records, budgets):
+    """Запросы, превысившие бюджет своего представления."""
+    return [
+        record for record in records
+        if record.view_name in budgets
+        and record.count > budgets[record.view_name]
+    ]
+
+
+class QueryCountMiddleware:
+    """
+    Считает SQL-запросы каждого HTTP-запроса.
+
+    Потоковый ответ читает базу, пока отдаёт тело, поэтому для него
+    счётчик остаётся подключённым до конца тела, а заголовков
+    с числом запросов у такого ответа нет.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        counter = QueryCounter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(counter))
+            response = self.get_response(request)
+            if response.streaming:
+                response.streaming_content = self.stream(
+                    response.streaming_content, stack.pop_all(),
+                    request, counter,
+                )
+                return response
+        record = self.record(request, counter)
+        if settings.DEBUG:
+            response['X-Query-Count'] = record.count
+            response['X-Query-Time'] = f'{record.duration * 1000:.2f}ms'
+        return response
+
+    def stream(self, content, wrappers, request, counter):
+        try:
+            with wrappers:
+                yield from content
+        finally:
+            self.record(request, counter)
+
+    def record(self, request, counter):
+        match = request.resolver_match
+        record = RequestQueries(
+            match.view_name if match else None,
+            request.path,
+            counter.count,
+            counter.duration,
+        )
+        with _stats_lock:
+            stats = view_stats[record.view_name]
+            stats['requests'] += 1
+            stats['queries'] += record.count
+            stats['time'] += record.duration
+        for records in _recorders:
+            records.append(record)
+        return record
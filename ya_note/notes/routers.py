@@ -0,0 +1,39 @@
+"""
+Маршрутизация заметок по шардам.
+
+Заметки автора лежат в одной базе из ``settings.NOTE_SHARDS``,
+остальные модели, реестр slug и назначения шардов — в ``default``.
+Запросы к заметкам без конкретного объекта роутер направить не может,
+поэтому представления выбирают шард явно через
+``Note.objects.for_author``, а новые заметки сами выбирают шард в
+``Note.save``. Роутер отвечает за загруженные объекты и миграции.
+"""
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+
+def is_note(model):
+    return model._meta.label_lower == 'notes.note'
+
+
+class NoteShardRouter:
+
+    def db_for_read(self, model, **hints):
+        instance = hints.get('instance')
+        if is_note(model) and instance is not None:
+            return instance._state.db
+        if not is_note(model):
+            return DEFAULT_DB_ALIAS
+        return None
+
+    def db_for_write(self, model, **hints):
+        return self.db_for_read(model, **hints)
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Автор заметки всегда в default, заметка — в любом шарде.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if app_label == 'notes' and model_name == 'note':
+            return db in settings.NOTE_SHARDS
+        return db == DEFAULT_DB_ALIAS
@@ -0,0 +1,100 @@
+"""
+Полнотекстовый поиск по заметкам автора.
+
+На SQLite используется таблица FTS5 ``notes_note_fts`` в шарде автора,
+её поддерживают триггеры из миграции. Автор отбирается условием
+на колонку ``author_id`` внутри MATCH, поэтому чужие заметки с теми же
+словами не читаются. Результаты упорядочены по bm25 (совпадение
+в заголовке весит больше), страницы листаются по ключу ``(score, id)``.
+На других СУБД поиск деградирует до ``icontains``.
+"""
+import re
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Q
+
+from .models import Note, ShardAssignment
+from .pagination import decode_cursor, encode_cursor
+
+# Курсор поиска подписан своей солью: курсор списка заметок
+# не должен приниматься поиском, и наоборот.
+CURSOR_SALT = 'notes.search.cursor'
+
+TITLE_WEIGHT = 10.0
+TEXT_WEIGHT = 1.0
+BM25 = f'bm25(notes_note_fts, {TITLE_WEIGHT}, {TEXT_WEIGHT}, 0)'
+
+SEARCH_SQL = f'''
+    SELECT rowid, {BM25} AS score
+    FROM notes_note_fts
+    WHERE notes_note_fts MATCH %s {{after}}
+    ORDER BY score, rowid
+    LIMIT %s
+'''
+AFTER_SQL = f'''
+    AND ({BM25} > %s OR ({BM25} = %s AND rowid > %s))
+'''
+
+
+def match_expression(query, author_id):
+    """
+    Запрос FTS5 по заметкам автора.
+
+    Все слова обязательны и ищутся только в заголовке и тексте,
+    последнее — как префикс: раскрытие префикса в сотни терминов
+    стоит дороже самого поиска.
+    """
+    words = re.findall(r'\w+', query.casefold().replace('ё', 'е'))
+    if not words:
+        return ''
+    phrases = ' '.join(f'"{word}"' for word in words) + '*'
+    return f'author_id : "{author_id}" AND {{title text}} : ({phrases})'
+
+
+def search_notes(author, query, cursor=None, limit=None):
+    """Страница найденных заметок автора и курсор следующей страницы."""
+    limit = limit or settings.SEARCH_RESULTS_PER_PAGE
+    expression = match_expression(query, author.pk)
+    if not expression:
+        return [], None
+    after = decode_cursor(
+        cursor, ((int, float), int), CURSOR_SALT
+    ) if cursor else None
+    shard = ShardAssignment.objects.shard_for(author.pk)
+    notes = Note.objects.using(shard).filter(author=author)
+    if connections[shard].vendor == 'sqlite':
+        rows = fts_rows(shard, expression, after, limit + 1)
+    else:
+        rows = icontains_rows(notes, query, after, limit + 1)
+    notes = notes.only('id', 'slug', 'title').in_bulk(
+        [note_id for note_id, _ in rows[:limit]]
+    )
+    page = [notes[note_id] for note_id, _ in rows[:limit] if note_id in notes]
+    if len(rows) <= limit:
+        return page, None
+    last_id, last_score = rows[limit - 1]
+    return page, encode_cursor(last_score, last_id, salt=CURSOR_SALT)
+
+
+def fts_rows(shard, expression, after, limit):
+    params = [expression]
+    if after:
+        score, last_id = after
+        params += [score, score, last_id]
+    params.append(limit)
+    sql = SEARCH_SQL.format(after=AFTER_SQL if after else '')
+    with connections[shard].cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+
+def icontains_rows(notes, query, after, limit):
+    notes = notes.filter(
+        Q(title__icontains=query) | Q(text__icontains=query)
+    ).order_by('pk')
+    if after:
+        notes = notes.filter(pk__gt=after[1])
+    return [(note_id, 0) for note_id in notes.values_list('pk', flat=True)[
+        :limit
+    ]]
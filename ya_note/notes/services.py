@@ -0,0 +1,53 @@
+from django.conf import settings
+from django.db import transaction
+
+from .cache import AuthorCache
+from .models import Note
+
+
+def delete_in_batches(queryset, fields=(), on_batch=None, batch_size=None):
+    """
+    Удаляет строки ``queryset`` партиями запросами ``DELETE ... WHERE``.
+
+    Объекты не загружаются в память, сигналы удаления не отправляются:
+    их последствия выполняет ``on_batch``, которому передаются значения
+    ``pk`` и ``fields`` удалённой партии. Каждая партия удаляется в
+    отдельной транзакции. Возвращает число удалённых строк.
+    """
+    batch_size = batch_size or settings.DELETE_BATCH_SIZE
+    model = queryset.model
+    queryset = queryset.order_by()
+    deleted = 0
+    while True:
+        with transaction.atomic(using=queryset.db):
+            rows = list(queryset.values_list('pk', *fields)[:batch_size])
+            if not rows:
+                return deleted
+            # QuerySet.delete() собрал бы объекты в память ради сигналов
+            # и каскада, а их здесь заменяет on_batch. _raw_delete —
+            # приватный API, поэтому версия Django закреплена
+            # в requirements.txt.
+            model._base_manager.using(queryset.db).filter(
+                pk__in=[row[0] for row in rows]
+            )._raw_delete(queryset.db)
+            if on_batch:
+                on_batch(rows)
+        deleted += len(rows)
+
+
+def delete_user(user, batch_size=None):
+    """
+    Удаляет пользователя, предварительно удалив его заметки партиями.
+
+    Заметки ищутся во всех шардах: после прерванного переноса
+    у автора могут остаться заметки и вне его шарда.
+    """
+    notes = sum(
+        delete_in_batches(queryset, batch_size=batch_size)
+        for queryset in Note.objects.filter(author=user).on_each_shard()
+    )
+    # Партии удаляются без сигналов.
+    AuthorCache(user.pk).invalidate()
+    total, deleted = user.delete()
+    deleted[Note._meta.label] = notes
+    return total + notes, deleted
@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import AuthorCache
+from .models import Note
+from .services import delete_in_batches
+
+
+@receiver(post_save, sender=Note)
+@receiver(post_delete, sender=Note)
+def note_changed(sender, instance, using, **kwargs):
+    """Изменение заметки сбрасывает кеш её автора."""
+    AuthorCache(instance.author_id).invalidate(using=using)
+
+
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def user_deleted(sender, instance, **kwargs):
+    """
+    Каскадно удаляет заметки пользователя в остальных шардах.
+
+    Каскад Django видит только базу удаляемого пользователя. Заметки
+    удаляются после фиксации транзакции, чтобы откат удаления
+    пользователя не оставил его без заметок.
+    """
+    notes = Note.objects.filter(author_id=instance.pk)
+
+    def delete_notes():
+        for queryset in notes.on_each_shard():
+            if queryset.db != DEFAULT_DB_ALIAS:
+                delete_in_batches(queryset)
+
+    transaction.on_commit(delete_notes)
@@ -0,0 +1,160 @@
+"""
+Выбор свободных slug для заметок.
+
+Slug по умолчанию — транслитерация заголовка. Если он занят, берётся
+первый свободный из ``slug-2``, ``slug-3``… Занятые варианты читаются
+из реестра ``NoteSlug`` одним запросом по диапазону уникального
+индекса: все они лежат между ``slug`` и ``slug.``, так как дефис —
+единственный допустимый в slug символ меньше точки. Между выбором
+и записью в реестр slug может занять параллельный запрос: тогда реестр
+отвечает ``IntegrityError``, и выбор повторяется.
+"""
+from functools import lru_cache
+
+from django.db import IntegrityError, connection, transaction
+from pytils.translit import slugify
+
+from .models import Note, NoteSlug
+
+TRANSLIT_CACHE_SIZE = 4096
+
+# Сколько символов slug оставляется под суффикс вида ``-12``.
+SUFFIX_ROOM = 8
+
+# Сколько раз выбор повторяется, если slug успели занять.
+ATTEMPTS = 5
+
+# Сколько основ проверяется одним запросом при пакетном выборе.
+STEMS_PER_QUERY = 100
+
+# Slug заголовка, в котором нет ни одной буквы или цифры.
+FALLBACK_SLUG = 'note'
+
+
+@lru_cache(maxsize=TRANSLIT_CACHE_SIZE)
+def transliterate(title):
+    """Транслитерация заголовка, частые заголовки не пересчитываются."""
+    return slugify(title)
+
+
+def slug_base(title):
+    """Slug заголовка без суффикса и основа для суффиксов."""
+    max_length = Note._meta.get_field('slug').max_length
+    base = transliterate(title)[:max_length] or FALLBACK_SLUG
+    stem = base[:max_length - SUFFIX_ROOM].rstrip('-') or FALLBACK_SLUG
+    return base, stem
+
+
+def taken_slugs(bases):
+    """
+    Занятые slug среди вариантов для пар ``(slug, основа)``.
+
+    Условия собираются в SQL напрямую: построение ORM-фильтра из сотен
+    условий дороже самого запроса.
+    """
+    bases = list(bases)
+    table = connection.ops.quote_name(NoteSlug._meta.db_table)
+    taken = set()
+    for start in range(0, len(bases), STEMS_PER_QUERY):
+        conditions = []
+        params = []
+        for base, stem in bases[start:start + STEMS_PER_QUERY]:
+            # Диапазон от основы включает и её саму.
+            conditions.append('(slug >= %s AND slug < %s)')
+            params += [stem, f'{stem}.']
+            if base != stem:
+                conditions.append('slug = %s')
+                params.append(base)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT slug FROM {table} WHERE {" OR ".join(conditions)}',
+                params,
+            )
+            taken.update(slug for slug, in cursor.fetchall())
+    return taken
+
+
+def allocate_slugs(titles, keep=None, reserved=()):
+    """
+    Свободные slug для заголовков, по запросу на ``STEMS_PER_QUERY`` основ.
+
+    Одинаковые заголовки получают разные суффиксы. Slug ``keep``
+    считается свободным: это собственный slug изменяемой заметки,
+    ``reserved`` — занятым, хотя его ещё нет в реестре. Slug
+    не резервируются, их нужно записать в реестр.
+    """
+    bases = [slug_base(title) for title in titles]
+    taken = taken_slugs(set(bases))
+    taken.discard(keep)
+    taken.update(reserved)
+    slugs = []
+    # Следующий проверяемый суффикс основы: одинаковые заголовки пакета
+    # не перебирают суффиксы заново.
+    suffixes = {}
+    for base, stem in bases:
+        slug = base
+        suffix = suffixes.get(stem, 2)
+        while slug in taken:
+            slug = f'{stem}-{suffix}'
+            suffix += 1
+        suffixes[stem] = suffix
+        taken.add(slug)
+        slugs.append(slug)
+    return slugs
+
+
+def reserve_slug(note, keep=None):
+    """
+    Записывает slug заметки в реестр, пустой slug сначала выбирается.
+
+    Занятый выбранный slug выбирается заново, занятый явно указанный
+    приводит к ``IntegrityError``. Если выбран ``keep``, резервировать
+    нечего.
+    """
+    allocate = not note.slug
+    for attempt in range(ATTEMPTS):
+        if allocate:
+            note.slug, = allocate_slugs([note.title], keep)
+        if note.slug == keep:
+            return
+        try:
+            with transaction.atomic():
+                NoteSlug.objects.create(
+                    slug=note.slug, author_id=note.author_id
+                )
+            return
+        except IntegrityError:
+            if not allocate or attempt == ATTEMPTS - 1:
+                raise
+
+
+def reserve_slugs(notes):
+    """
+    Пакетный вариант ``reserve_slug`` для новых заметок.
+
+    Все slug записываются в реестр одним ``bulk_create``. Если занят
+    один из указанных slug, ``IntegrityError`` выбрасывается сразу:
+    повторный выбор остальных его не освободит.
+    """
+    allocated = [note for note in notes if not note.slug]
+    reserved = {note.slug for note in notes if note.slug}
+    for attempt in range(ATTEMPTS):
+        slugs = allocate_slugs(
+            [note.title for note in allocated], reserved=reserved
+        )
+        for note, slug in zip(allocated, slugs):
+            note.slug = slug
+        try:
+            with transaction.atomic():
+                NoteSlug.objects.bulk_create(
+                    NoteSlug(slug=note.slug, author_id=note.author_id)
+                    for note in notes
+                )
+            return
+        except IntegrityError:
+            if (
+                not allocated
+                or attempt == ATTEMPTS - 1
+                or NoteSlug.objects.filter(slug__in=reserved).exists()
+            ):
+                raise
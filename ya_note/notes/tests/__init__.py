@@ -0,0 +1,21 @@
+"""
+Тесты YaNote.
+
+Тесты пишут во временный каталог кеша, а не в кеш сервера. Каталог
+передаётся и дочерним процессам через YANOTE_CACHE_DIR.
+"""
+import os
+import tempfile
+
+from django.conf import settings
+from django.test.utils import override_settings
+
+cache_dir = tempfile.TemporaryDirectory(prefix='yanote-cache-')
+os.environ['YANOTE_CACHE_DIR'] = cache_dir.name
+override_settings(CACHES={
+    'default': {**settings.CACHES['default'], 'LOCATION': cache_dir.name},
+    'stats': {
+        **settings.CACHES['stats'],
+        'LOCATION': os.path.join(cache_dir.name, 'stats'),
+    },
+}).enable()
@@ -0,0 +1,39 @@
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.cache import cache
+
+from notes.queries import over_budget, record_requests
+from notes.stats import reset_stats
+
+
+class QueryBudgetMixin:
+    """
+    Проваливает тест, если представление превысило бюджет SQL-запросов.
+
+    Бюджеты берутся из ``settings.QUERY_BUDGETS``, атрибут
+    ``query_budgets`` переопределяет их для отдельного класса тестов.
+    Тестам доступны все базы: заметки лежат в шардах. Кеш и счётчики
+    очищаются перед каждым тестом, чтобы ответы не переживали откат базы.
+    """
+    databases = '__all__'
+    query_budgets = {}
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        reset_stats()
+        budgets = {**settings.QUERY_BUDGETS, **self.query_budgets}
+        stack = ExitStack()
+        records = stack.enter_context(record_requests())
+        self.addCleanup(self.check_query_budgets, records, budgets)
+        self.addCleanup(stack.close)
+
+    def check_query_budgets(self, records, budgets):
+        exceeded = over_budget(records, budgets)
+        if exceeded:
+            self.fail('\n'.join(
+                f'{record.view_name} ({record.path}): {record.count} '
+                f'запросов при бюджете {budgets[record.view_name]}'
+                for record in exceeded
+            ))
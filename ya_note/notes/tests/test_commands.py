@@ -0,0 +1,197 @@
+import json
+import subprocess
+import sys
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest import skipIf
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db.models import Count
+from django.test import TestCase
+from django.urls import reverse
+
+from notes.models import Note, ShardAssignment
+from notes.tests.mixins import QueryBudgetMixin
+from notes.urls import urlpatterns
+
+User = get_user_model()
+
+
+def generate(**options):
+    call_command('generate_data', stdout=StringIO(), **options)
+
+
+def snapshot():
+    return sorted(
+        note for queryset in Note.objects.on_each_shard()
+        for note in queryset.values_list('title', 'text', 'slug')
+    )
+
+
+def count_notes(queryset=Note.objects.all()):
+    return sum(shard.count() for shard in queryset.on_each_shard())
+
+
+class TestCommands(QueryBudgetMixin, TestCase):
+    """Тестирование генератора данных и бенчмарка маршрутов."""
+
+    def test_generate_data_creates_requested_volume(self):
+        """Проверка, что создаётся заданное число объектов."""
+        generate(users=3, notes=50)
+
+        self.assertEqual(User.objects.count(), 3)
+        self.assertEqual(count_notes(), 50)
+
+    def test_generate_data_is_deterministic(self):
+        """Проверка, что при одинаковом seed данные совпадают."""
+        generate(users=3, notes=50, seed=7)
+        first = snapshot()
+        with self.captureOnCommitCallbacks(execute=True):
+            User.objects.all().delete()
+
+        generate(users=3, notes=50, seed=7)
+
+        self.assertEqual(snapshot(), first)
+
+    def test_benchmark_routes_covers_every_route(self):
+        """Проверка, что отчёт бенчмарка содержит каждый маршрут."""
+        generate(users=3, notes=50)
+
+        with tempfile.TemporaryDirectory() as directory:
+            output = Path(directory) / 'report.json'
+            call_command(
+                'benchmark_routes', requests=2, output=output,
+                stdout=StringIO(),
+            )
+            report = json.loads(output.read_text())
+
+        self.assertEqual(
+            set(report), {pattern.name for pattern in urlpatterns}
+        )
+
+    def test_chunked_delete_removes_user_notes(self):
+        """Проверка, что удаляются пользователь и только его заметки."""
+        generate(users=3, notes=50)
+        user = User.objects.annotate(
+            notes=Count('noteslug')
+        ).order_by('-notes').first()
+        expected = count_notes(Note.objects.exclude(author=user))
+
+        call_command(
+            'chunked_delete', user=user.username, batch_size=7,
+            stdout=StringIO(),
+        )
+
+        self.assertFalse(User.objects.filter(pk=user.pk).exists())
+        self.assertEqual(count_notes(), expected)
+
+    def test_cache_stats_sees_counters_of_other_processes(self):
+        """Проверка, что команда в другом процессе видит счётчики сервера."""
+        author = User.objects.create(username='Автор')
+        note = Note.objects.create(
+            title='Заметка', text='Текст', author=author
+        )
+        url = reverse('notes:detail', args=(note.slug,))
+        self.client.force_login(author)
+        with self.settings(CACHE_STATS_FLUSH_SECONDS=0):
+            self.client.get(url)
+            self.client.get(url)
+
+        output = subprocess.run(
+            [sys.executable, 'manage.py', 'cache_stats'],
+            cwd=settings.BASE_DIR, capture_output=True, text=True,
+            check=True,
+        ).stdout
+
+        self.assertIn('notes:detail: hits=1 misses=1 hit_ratio=0.5', output)
+
+    def test_migrate_shards_migrates_every_shard(self):
+        """Проверка, что миграции применяются к каждому шарду."""
+        stdout = StringIO()
+
+        call_command('migrate_shards', stdout=stdout)
+
+        for shard in settings.NOTE_SHARDS:
+            self.assertIn(f'База {shard}:', stdout.getvalue())
+
+    @skipIf(len(settings.NOTE_SHARDS) < 2, 'Нужно хотя бы два шарда.')
+    def test_move_author_notes_to_another_shard(self):
+        """Проверка, что заметки автора переезжают в указанный шард."""
+        generate(users=3, notes=50)
+        author = User.objects.annotate(
+            notes=Count('noteslug')
+        ).order_by('-notes').first()
+        source = ShardAssignment.objects.shard_for(author.pk)
+        target = next(
+            shard for shard in settings.NOTE_SHARDS if shard != source
+        )
+        slugs = set(
+            Note.objects.for_author(author).values_list('slug', flat=True)
+        )
+        self.client.force_login(author)
+        self.client.get(reverse('notes:list'))
+
+        call_command(
+            'move_author_notes', author.username, target, batch_size=7,
+            stdout=StringIO(),
+        )
+
+        self.assertEqual(ShardAssignment.objects.shard_for(author.pk), target)
+        self.assertEqual(set(
+            Note.objects.for_author(author).values_list('slug', flat=True)
+        ), slugs)
+        self.assertFalse(
+            Note.objects.using(source).filter(author=author).exists()
+        )
+        # Закешированный список из старого шарда больше не отдаётся.
+        object_list = self.client.get(
+            reverse('notes:list')
+        ).context['object_list']
+        self.assertEqual({note._state.db for note in object_list}, {target})
+
+    @skipIf(len(settings.NOTE_SHARDS) < 2, 'Нужно хотя бы два шарда.')
+    def test_move_author_notes_resumes_interrupted_move(self):
+        """Проверка, что повторный запуск доводит прерванный перенос."""
+        generate(users=3, notes=50)
+        author = User.objects.annotate(
+            notes=Count('noteslug')
+        ).order_by('-notes').first()
+        source = ShardAssignment.objects.shard_for(author.pk)
+        target = next(
+            shard for shard in settings.NOTE_SHARDS if shard != source
+        )
+        notes = list(Note.objects.for_author(author).order_by('pk'))
+        # Прерванный перенос: часть заметок уже скопирована, одну
+        # после копирования изменили, другую удалили.
+        Note.objects.using(target).bulk_create(
+            Note(title=note.title, text=note.text, slug=note.slug,
+                 author=author)
+            for note in notes[:5]
+        )
+        ShardAssignment.objects.update_or_create(
+            author=author, defaults={'shard': source, 'moving': True}
+        )
+        notes[0].title = 'Изменённый заголовок'
+        Note.objects.using(source).filter(pk=notes[0].pk).update(
+            title=notes[0].title
+        )
+        Note.objects.using(source).filter(pk=notes[1].pk).delete()
+        expected = sorted(
+            (note.title, note.text, note.slug) for note in notes
+            if note is not notes[1]
+        )
+
+        call_command(
+            'move_author_notes', author.username, target, batch_size=7,
+            stdout=StringIO(),
+        )
+
+        self.assertEqual(sorted(
+            Note.objects.using(target).filter(
+                author=author
+            ).values_list('title', 'text', 'slug')
+        ), expected)
+        self.assertFalse(ShardAssignment.objects.is_moving(author.pk))
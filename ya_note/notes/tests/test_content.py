@@ -1,14 +1,20 @@
+from http import HTTPStatus
+
 from django.contrib.auth import get_user_model
 from django.test import TestCase
 from django.urls import reverse
 
+from notes.cache import detail_stats, list_stats
 from notes.forms import NoteForm
 from notes.models import Note
+from notes.pagination import encode_cursor
+from notes.search import CURSOR_SALT as SEARCH_CURSOR_SALT
+from notes.tests.mixins import QueryBudgetMixin
 
 User = get_user_model()
 
 
-class TestNotesPage(TestCase):
+class TestNotesPage(QueryBudgetMixin, TestCase):
     """Тестирование отображения страниц и доступности форм для заметок."""
 
     @classmethod
@@ -39,6 +45,174 @@ class TestNotesPage(TestCase):
 
                 self.assertEqual((self.note in object_list), note_in_list)
 
+    def test_notes_list_is_paginated_by_cursor(self):
+        """Проверка постраничного вывода списка заметок по курсору."""
+        for index in range(4):
+            Note.objects.create(
+                title=f'Заметка {index}',
+                text='Текст заметки',
+                slug=f'note-{index}',
+                author=self.author,
+            )
+        self.client.force_login(self.author)
+
+        seen_ids = []
+        cursor = ''
+        pages = 0
+        with self.settings(NOTES_PER_PAGE=2):
+            while cursor is not None:
+                page = self.client.get(
+                    reverse('notes:page'), {'cursor': cursor}
+                ).json()
+                seen_ids += [note['id'] for note in page['notes']]
+                cursor = page['next']
+                pages += 1
+            response = self.client.get(reverse('notes:list'))
+
+        expected_ids = list(
+            Note.objects.for_author(self.author).order_by('id').values_list(
+                'id', flat=True
+            )
+        )
+        self.assertEqual(seen_ids, expected_ids)
+        self.assertEqual(pages, 3)
+        self.assertEqual(len(response.context['object_list']), 2)
+        self.assertIsNotNone(response.context['next_cursor'])
+        self.assertEqual(
+            response.context['object_list'][0].get_deferred_fields(),
+            {'text', 'author_id'},
+        )
+
+    def test_forged_cursor_is_rejected(self):
+        """Проверка, что подделанный курсор приводит к ответу 400."""
+        self.client.force_login(self.author)
+
+        response = self.client.get(reverse('notes:list'), {'cursor': 'x'})
+
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+    def test_cursor_of_other_shape_is_rejected(self):
+        """Проверка, что подписанный курсор чужой формы даёт ответ 400."""
+        self.client.force_login(self.author)
+
+        for cursor in (
+            encode_cursor(), encode_cursor(1.5, 2), encode_cursor('1'),
+        ):
+            with self.subTest(cursor=cursor):
+                response = self.client.get(
+                    reverse('notes:list'), {'cursor': cursor}
+                )
+                self.assertEqual(
+                    response.status_code, HTTPStatus.BAD_REQUEST
+                )
+
+    def test_list_and_detail_are_cached_until_change(self):
+        """Проверка, что страницы берутся из кеша до изменения заметки."""
+        urls = (
+            (reverse('notes:list'), list_stats),
+            (reverse('notes:detail', args=(self.note.slug,)), detail_stats),
+        )
+        self.client.force_login(self.author)
+
+        for url, stats in urls:
+            with self.subTest(url=url):
+                self.client.get(url)
+                # Остаются только запросы сессии и пользователя.
+                with self.assertNumQueries(2):
+                    response = self.client.get(url)
+                self.assertContains(response, self.note.title)
+                self.assertEqual(
+                    stats.snapshot(),
+                    {'hits': 1, 'misses': 1, 'hit_ratio': 0.5},
+                )
+
+        self.client.post(
+            reverse('notes:edit', args=(self.note.slug,)),
+            {'title': 'Новый заголовок', 'text': 'Текст', 'slug': 'new'},
+        )
+        self.assertContains(
+            self.client.get(reverse('notes:list')), 'Новый заголовок'
+        )
+        response = self.client.get(
+            reverse('notes:detail', args=(self.note.slug,))
+        )
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_search_finds_only_author_notes(self):
+        """Проверка, что поиск ранжирует и не находит чужие заметки."""
+        in_title = Note.objects.create(
+            title='Ёлка на праздник', text='Купить', author=self.author
+        )
+        in_text = Note.objects.create(
+            title='Покупки', text='Игрушки для елки', author=self.author
+        )
+        Note.objects.create(
+            title='Елка', text='Чужая заметка', author=self.not_author
+        )
+        self.client.force_login(self.author)
+
+        response = self.client.get(reverse('notes:search'), {'q': 'ёлк'})
+
+        self.assertEqual(response.context['results'], [in_title, in_text])
+
+    def test_search_index_follows_changes(self):
+        """Проверка, что индекс поиска следует за изменениями заметок."""
+        url = reverse('notes:search')
+        self.client.force_login(self.author)
+        self.note.title = 'Космодром'
+        self.note.save()
+
+        response = self.client.get(url, {'q': 'космодром'})
+        self.assertEqual(response.context['results'], [self.note])
+        response = self.client.get(url, {'q': 'заголовок'})
+        self.assertEqual(response.context['results'], [])
+        self.note.delete()
+        response = self.client.get(url, {'q': 'космодром'})
+        self.assertEqual(response.context['results'], [])
+
+    def test_search_is_paginated_by_cursor(self):
+        """Проверка постраничного вывода результатов поиска по курсору."""
+        for index in range(1, 6):
+            Note.objects.create(
+                title=f'Заметка {index}',
+                text='Текст заметки ' * index,
+                author=self.author,
+            )
+        self.client.force_login(self.author)
+
+        seen_ids = []
+        cursor = ''
+        with self.settings(SEARCH_RESULTS_PER_PAGE=2):
+            while cursor is not None:
+                context = self.client.get(
+                    reverse('notes:search'), {'q': 'текст', 'cursor': cursor}
+                ).context
+                seen_ids += [note.id for note in context['results']]
+                cursor = context['next_cursor']
+
+        self.assertCountEqual(
+            seen_ids,
+            Note.objects.for_author(self.author).values_list('id', flat=True),
+        )
+        self.assertEqual(len(seen_ids), len(set(seen_ids)))
+
+    def test_search_rejects_cursor_of_other_shape(self):
+        """Проверка, что курсор списка или чужой формы даёт ответ 400."""
+        self.client.force_login(self.author)
+
+        for cursor in (
+            encode_cursor(self.note.pk),
+            encode_cursor(1.5, 2),
+            encode_cursor('1.5', 2, salt=SEARCH_CURSOR_SALT),
+        ):
+            with self.subTest(cursor=cursor):
+                response = self.client.get(
+                    reverse('notes:search'), {'q': 'текст', 'cursor': cursor}
+                )
+                self.assertEqual(
+                    response.status_code, HTTPStatus.BAD_REQUEST
+                )
+
     def test_pages_contains_form(self):
         """Проверка наличия формы на страницах создания и редактирования."""
         urls = (
@@ -1,17 +1,28 @@
+import json
 from http import HTTPStatus
+from unittest import mock, skipIf
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.test import TestCase
 from django.urls import reverse
 from pytils.translit import slugify
 
 from notes.forms import WARNING
-from notes.models import Note
+from notes.models import Note, NoteSlug, ShardAssignment
+from notes.slugs import reserve_slugs
+from notes.tests.mixins import QueryBudgetMixin
 
 User = get_user_model()
 
 
-class TestNotes(TestCase):
+def count_notes():
+    return sum(
+        queryset.count() for queryset in Note.objects.on_each_shard()
+    )
+
+
+class TestNotes(QueryBudgetMixin, TestCase):
     """Тестирование создания, редактирования и удаления заметок."""
 
     @classmethod
@@ -31,16 +42,20 @@ class TestNotes(TestCase):
             'slug': 'new-slug'
         }
 
+    @property
+    def author_notes(self):
+        return Note.objects.for_author(self.author)
+
     def test_user_can_create_note(self):
         """Проверка, что автор может создать заметку."""
         self.client.force_login(self.author)
         url = reverse('notes:add')
 
         response = self.client.post(url, data=self.form_data)
-        new_note = Note.objects.get(slug=self.form_data['slug'])
+        new_note = self.author_notes.get(slug=self.form_data['slug'])
 
         self.assertRedirects(response, reverse('notes:success'))
-        self.assertEqual(Note.objects.count(), 2)
+        self.assertEqual(count_notes(), 2)
         self.assertEqual(new_note.title, self.form_data['title'])
         self.assertEqual(new_note.text, self.form_data['text'])
         self.assertEqual(new_note.author, self.author)
@@ -54,7 +69,7 @@ class TestNotes(TestCase):
         response = self.client.post(url, data=self.form_data)
 
         self.assertRedirects(response, expected_url)
-        self.assertEqual(Note.objects.count(), 1)
+        self.assertEqual(count_notes(), 1)
 
     def test_not_unique_slug(self):
         """Проверка, что нельзя создать заметку с неуникальным slug."""
@@ -67,7 +82,7 @@ class TestNotes(TestCase):
 
         self.assertTrue(form.has_error('slug'))
         self.assertEqual(form.errors['slug'][0], self.note.slug + WARNING)
-        self.assertEqual(Note.objects.count(), 1)
+        self.assertEqual(count_notes(), 1)
 
     def test_empty_slug(self):
         """Проверка, что если slug пуст, он генерируется автоматически."""
@@ -76,13 +91,69 @@ class TestNotes(TestCase):
         self.form_data.pop('slug')
 
         response = self.client.post(url, data=self.form_data)
-        new_note = Note.objects.get(title=self.form_data['title'])
+        new_note = self.author_notes.get(title=self.form_data['title'])
         expected_slug = slugify(self.form_data['title'])
 
         self.assertRedirects(response, reverse('notes:success'))
-        self.assertEqual(Note.objects.count(), 2)
+        self.assertEqual(count_notes(), 2)
         self.assertEqual(new_note.slug, expected_slug)
 
+    def test_empty_slug_gets_free_suffix(self):
+        """Проверка, что занятый автоматический slug получает суффикс."""
+        self.client.force_login(self.author)
+        self.form_data.pop('slug')
+        expected_slug = slugify(self.form_data['title'])
+
+        for _ in range(3):
+            self.client.post(reverse('notes:add'), data=self.form_data)
+
+        self.assertEqual(
+            sorted(self.author_notes.filter(
+                title=self.form_data['title']
+            ).values_list('slug', flat=True)),
+            [expected_slug, f'{expected_slug}-2', f'{expected_slug}-3'],
+        )
+
+    def test_slug_allocation_retries_after_conflict(self):
+        """Проверка, что slug, занятый параллельно, выбирается заново."""
+        note = Note(title=self.note.title, text='Текст', author=self.author)
+        NoteSlug.objects.create(
+            slug=slugify(self.note.title), author=self.author
+        )
+
+        # Первый выбор не видит параллельно занятый slug.
+        with mock.patch(
+            'notes.slugs.taken_slugs',
+            side_effect=[set(), {slugify(self.note.title)}],
+        ) as allocation:
+            note.save()
+
+        self.assertEqual(allocation.call_count, 2)
+        self.assertEqual(note.slug, f'{slugify(self.note.title)}-2')
+
+    def test_batch_allocation(self):
+        """Проверка пакетного выбора slug одним запросом."""
+        notes = [
+            Note(title=title, text='Текст', author=self.author)
+            for title in ('Заголовок', 'Заголовок', 'Другой')
+        ]
+        notes.append(Note(
+            title='Явный', text='Текст', slug='zagolovok',
+            author=self.author,
+        ))
+
+        # Выборка занятых slug и вставка в реестр внутри точки сохранения.
+        with self.assertNumQueries(4):
+            reserve_slugs(notes)
+
+        self.assertEqual(
+            [note.slug for note in notes],
+            ['zagolovok-2', 'zagolovok-3', 'drugoj', 'zagolovok'],
+        )
+        self.assertEqual(
+            NoteSlug.objects.filter(author=self.author).count(), 5
+        )
+
     def test_author_can_edit_note(self):
         """Проверка, что автор может редактировать свою заметку."""
         self.client.force_login(self.author)
@@ -100,7 +171,7 @@ class TestNotes(TestCase):
         """Проверка, что другой пользователь не может редактировать заметку."""
         self.client.force_login(self.not_author)
         url = reverse('notes:edit', args=(self.note.slug,))
-        note_from_db = Note.objects.get(id=self.note.id)
+        note_from_db = self.author_notes.get(id=self.note.id)
 
         response = self.client.post(url, self.form_data)
 
@@ -117,7 +188,7 @@ class TestNotes(TestCase):
         response = self.client.post(url)
 
         self.assertRedirects(response, reverse('notes:success'))
-        self.assertEqual(Note.objects.count(), 0)
+        self.assertEqual(count_notes(), 0)
 
     def test_other_user_cant_delete_note(self):
         """Проверка, что другой пользователь не может удалить заметку."""
@@ -127,4 +198,251 @@ class TestNotes(TestCase):
         response = self.client.post(url)
 
         self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
-        self.assertEqual(Note.objects.count(), 1)
+        self.assertEqual(count_notes(), 1)
+
+    def test_author_cant_change_notes_while_moving(self):
+        """Проверка, что во время переноса заметки не меняются."""
+        ShardAssignment.objects.update_or_create(
+            author=self.author, defaults={
+                'shard': ShardAssignment.objects.shard_for(self.author.pk),
+                'moving': True,
+            }
+        )
+        self.client.force_login(self.author)
+        edit_url = reverse('notes:edit', args=(self.note.slug,))
+        requests = (
+            (reverse('notes:add'), self.form_data),
+            (edit_url, self.form_data),
+            (reverse('notes:delete', args=(self.note.slug,)), {}),
+        )
+        for url, data in requests:
+            with self.subTest(url=url):
+                response = self.client.post(url, data=data)
+                self.assertEqual(
+                    response.status_code, HTTPStatus.SERVICE_UNAVAILABLE
+                )
+        self.assertEqual(self.client.get(edit_url).status_code, HTTPStatus.OK)
+        self.assertEqual(
+            list(self.author_notes.values_list('title', flat=True)),
+            [self.note.title],
+        )
+
+
+@skipIf(len(settings.NOTE_SHARDS) < 2, 'Нужно хотя бы два шарда.')
+class TestShards(QueryBudgetMixin, TestCase):
+    """Тестирование распределения заметок по шардам."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Авторы закреплены за разными шардами."""
+        cls.first, cls.second = (
+            User.objects.create(username=f'Автор {shard}')
+            for shard in settings.NOTE_SHARDS[:2]
+        )
+        for author, shard in zip(
+            (cls.first, cls.second), settings.NOTE_SHARDS
+        ):
+            ShardAssignment.objects.create(author=author, shard=shard)
+        cls.note = Note.objects.create(
+            title='Заголовок', text='Текст', slug='shared', author=cls.first
+        )
+
+    def test_note_is_saved_to_author_shard(self):
+        """Проверка, что заметка хранится только в шарде автора."""
+        shards = [
+            queryset.db for queryset in Note.objects.on_each_shard()
+            if queryset.filter(slug=self.note.slug).exists()
+        ]
+
+        self.assertEqual(shards, [settings.NOTE_SHARDS[0]])
+
+    def test_slug_is_unique_across_shards(self):
+        """Проверка, что slug из другого шарда нельзя занять."""
+        self.client.force_login(self.second)
+
+        response = self.client.post(reverse('notes:add'), data={
+            'title': 'Другая заметка', 'text': 'Текст', 'slug': 'shared',
+        })
+
+        self.assertFormError(response, 'form', 'slug', 'shared' + WARNING)
+        self.assertFalse(Note.objects.for_author(self.second).exists())
+
+    def test_admin_shows_notes_of_selected_shard(self):
+        """Проверка, что админка читает заметки из выбранного шарда."""
+        note = Note.objects.create(
+            title='Во втором шарде', text='Текст', author=self.second
+        )
+        shard = settings.NOTE_SHARDS[1]
+        self.client.force_login(User.objects.create_superuser('Админ'))
+        url = reverse('admin:notes_note_change', args=(note.pk,))
+
+        changelist = self.client.get(
+            reverse('admin:notes_note_changelist'), {'shard': shard}
+        )
+        change = self.client.get(
+            url, {'_changelist_filters': f'shard={shard}'}
+        )
+
+        self.assertContains(changelist, note.title)
+        self.assertContains(change, note.title)
+
+
+class TestImportSlugRace(QueryBudgetMixin, TestCase):
+    """Тестирование загрузки, когда slug занимают параллельно."""
+    # Резервирование пакета повторяется после гонки за slug.
+    query_budgets = {'notes:import': 28}
+
+    @classmethod
+    def setUpTestData(cls):
+        """Подготовка тестовых данных."""
+        cls.author = User.objects.create(username='Автор')
+        cls.other = User.objects.create(username='Другой автор')
+
+    def test_import_rejects_slug_taken_concurrently(self):
+        """Проверка, что slug, занятый после проверки пакета, отклоняется."""
+        def reserve_after_race(notes):
+            NoteSlug.objects.get_or_create(slug='raced', author=self.other)
+            return reserve_slugs(notes)
+
+        records = (
+            {'title': 'Своя', 'text': 'Текст', 'slug': 'raced'},
+            {'title': 'Другая', 'text': 'Текст'},
+        )
+        self.client.force_login(self.author)
+        with mock.patch(
+            'notes.archive.reserve_slugs', side_effect=reserve_after_race
+        ):
+            result = self.client.post(
+                reverse('notes:import'),
+                data='\n'.join(
+                    json.dumps(record, ensure_ascii=False)
+                    for record in records
+                ).encode(),
+                content_type='application/x-ndjson',
+            ).json()
+
+        self.assertEqual(result['created'], 1)
+        self.assertEqual(result['errors'], [{'line': 1, 'errors': {'slug': [
+            {'message': 'raced' + WARNING, 'code': 'unique'}
+        ]}}])
+        self.assertEqual(
+            list(Note.objects.for_author(self.author).values_list(
+                'slug', flat=True
+            )),
+            ['drugaya'],
+        )
+
+
+class TestArchive(QueryBudgetMixin, TestCase):
+    """Тестирование выгрузки и загрузки заметок в NDJSON."""
+    # Загрузка по три пакета в test_import_skips_invalid_records.
+    query_budgets = {'notes:import': 18}
+
+    @classmethod
+    def setUpTestData(cls):
+        """Подготовка тестовых данных."""
+        cls.author = User.objects.create(username='Автор')
+        cls.note = Note.objects.create(
+            title='Заголовок',
+            text='Текст заметки',
+            slug='note-slug',
+            author=cls.author,
+        )
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.author)
+
+    def post_lines(self, *records):
+        body = '\n'.join(
+            record if isinstance(record, str)
+            else json.dumps(record, ensure_ascii=False)
+            for record in records
+        )
+        return self.client.post(
+            reverse('notes:import'),
+            data=body.encode(),
+            content_type='application/x-ndjson',
+        ).json()
+
+    def test_export_streams_author_notes(self):
+        """Проверка, что выгрузка содержит заметки автора."""
+        response = self.client.get(reverse('notes:export'))
+        rows = [
+            json.loads(line)
+            for line in b''.join(response.streaming_content).splitlines()
+        ]
+
+        self.assertEqual(rows, [{
+            'title': self.note.title,
+            'text': self.note.text,
+            'slug': self.note.slug,
+        }])
+
+    def test_import_skips_invalid_records(self):
+        """Проверка, что ошибочные записи пропускаются с номером строки."""
+        with self.settings(IMPORT_BATCH_SIZE=2):
+            result = self.post_lines(
+                {'title': 'Первая', 'text': 'Текст'},
+                {'title': 'Первая', 'text': 'Текст'},
+                'не json',
+                {'title': 'Без текста'},
+                {'title': 'Занятый', 'text': 'Текст', 'slug': 'note-slug'},
+                {'title': 'Своя', 'text': 'Текст', 'slug': 'own'},
+            )
+
+        self.assertEqual(result['created'], 3)
+        self.assertEqual(
+            [error['line'] for error in result['errors']], [3, 4, 5]
+        )
+        self.assertEqual(
+            sorted(self.author_notes_slugs()),
+            ['note-slug', 'own', 'pervaya', 'pervaya-2'],
+        )
+        self.assertEqual(
+            NoteSlug.objects.filter(author=self.author).count(), 4
+        )
+
+    def test_import_rejects_values_that_are_not_strings(self):
+        """Проверка, что значения полей должны быть строками JSON."""
+        result = self.post_lines(
+            {'title': 123, 'text': 'Текст'},
+            {'title': 'Заметка', 'text': ['Текст']},
+            {'title': 'Заметка', 'text': 'Текст', 'slug': None},
+        )
+
+        self.assertEqual(result['created'], 0)
+        self.assertEqual(
+            [list(error['errors']) for error in result['errors']],
+            [['title'], ['text'], ['slug']],
+        )
+
+    def test_export_import_round_trip(self):
+        """Проверка, что выгрузка загружается обратно с новыми slug."""
+        exported = b''.join(
+            self.client.get(reverse('notes:export')).streaming_content
+        )
+        record = json.loads(exported)
+        record['slug'] = ''
+
+        result = self.post_lines(record)
+
+        self.assertEqual(result, {'created': 1, 'skipped': 0, 'errors': []})
+        self.assertIn('zagolovok', self.author_notes_slugs())
+
+    def test_import_invalidates_cached_list(self):
+        """Проверка, что загруженные заметки сразу видны в списке."""
+        self.client.get(reverse('notes:list'))
+
+        self.post_lines({'title': 'Загруженная', 'text': 'Текст'})
+
+        self.assertContains(
+            self.client.get(reverse('notes:list')), 'Загруженная'
+        )
+
+    def author_notes_slugs(self):
+        return list(
+            Note.objects.for_author(self.author).values_list(
+                'slug', flat=True
+            )
+        )
@@ -0,0 +1,62 @@
+from unittest import skipIf
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from notes.models import Note
+from notes.tests.mixins import QueryBudgetMixin
+
+User = get_user_model()
+
+
+def bad_plan_steps(sql):
+    """Шаги плана с полным просмотром таблицы или временной сортировкой."""
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        steps = [row[-1] for row in cursor.fetchall()]
+    return [
+        step for step in steps
+        if 'TEMP B-TREE' in step
+        or (step.startswith('SCAN ') and ' USING ' not in step)
+    ]
+
+
+@skipIf(connection.vendor != 'sqlite', 'Планы запросов только для SQLite.')
+class TestQueryPlans(QueryBudgetMixin, TestCase):
+    """Проверка планов выполнения запросов представлений заметок."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Подготовка тестовых данных."""
+        cls.author = User.objects.create(username='Автор')
+        cls.note = Note.objects.create(
+            title='Заголовок',
+            text='Текст заметки',
+            slug='note-slug',
+            author=cls.author,
+        )
+
+    def test_hot_queries_use_indexes(self):
+        """Проверка, что запросы не сканируют таблицы и не сортируют."""
+        urls = (
+            ('notes:list', None),
+            ('notes:page', None),
+            ('notes:detail', (self.note.slug,)),
+            ('notes:edit', (self.note.slug,)),
+            ('notes:delete', (self.note.slug,)),
+        )
+        self.client.force_login(self.author)
+
+        for name, args in urls:
+            with self.subTest(name=name):
+                with CaptureQueriesContext(connection) as queries:
+                    self.client.get(reverse(name, args=args))
+
+                for query in queries.captured_queries:
+                    if query['sql'].startswith('SELECT'):
+                        self.assertEqual(
+                            bad_plan_steps(query['sql']), [], query['sql']
+                        )
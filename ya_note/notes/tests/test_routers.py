@@ -5,11 +5,13 @@ from django.test import TestCase
 from django.urls import reverse
 
 from notes.models import Note
+from notes.queries import over_budget, record_requests
+from notes.tests.mixins import QueryBudgetMixin
 
 User = get_user_model()
 
 
-class TestRoutes(TestCase):
+class TestRoutes(QueryBudgetMixin, TestCase):
     """Тестирование доступности страниц для разных пользователей."""
 
     @classmethod
@@ -45,6 +47,7 @@ class TestRoutes(TestCase):
         """Проверка доступности страниц для авторизованных пользователей."""
         urls = (
             'notes:list',
+            'notes:search',
             'notes:add',
             'notes:success',
         )
@@ -90,6 +93,7 @@ class TestRoutes(TestCase):
             ('notes:add', None),
             ('notes:success', None),
             ('notes:list', None),
+            ('notes:search', None),
         )
 
         for name, args in urls:
@@ -100,3 +104,12 @@ class TestRoutes(TestCase):
                 response = self.client.get(url)
 
                 self.assertRedirects(response, redirect_url)
+
+    def test_query_budget_detects_excess(self):
+        """Проверка, что превышение бюджета SQL-запросов обнаруживается."""
+        self.client.force_login(self.author)
+
+        with record_requests() as records:
+            self.client.get(reverse('notes:list'))
+
+        self.assertTrue(over_budget(records, {'notes:list': 1}))
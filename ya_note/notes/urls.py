@@ -11,5 +11,9 @@ urlpatterns = [
     path('note/<slug:slug>/', views.NoteDetail.as_view(), name='detail'),
     path('delete/<slug:slug>/', views.NoteDelete.as_view(), name='delete'),
     path('notes/', views.NotesList.as_view(), name='list'),
+    path('notes/page/', views.NotesPage.as_view(), name='page'),
+    path('notes/search/', views.NotesSearch.as_view(), name='search'),
+    path('notes/export/', views.NotesExport.as_view(), name='export'),
+    path('notes/import/', views.NotesImport.as_view(), name='import'),
     path('done/', views.NoteSuccess.as_view(), name='success'),
 ]
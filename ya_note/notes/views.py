@@ -1,9 +1,17 @@
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.db import IntegrityError
+from django.http import (
+    Http404, HttpResponse, JsonResponse, StreamingHttpResponse,
+)
 from django.urls import reverse_lazy
 from django.views import generic
 
-from .forms import NoteForm
-from .models import Note
+from .archive import NoteImport, export_notes, iter_lines, ndjson
+from .cache import AuthorCache, detail_stats, list_stats
+from .forms import WARNING, NoteForm
+from .models import Note, ShardAssignment
+from .pagination import notes_page
+from .search import search_notes
 
 
 class Home(generic.TemplateView):
@@ -16,17 +24,41 @@ class NoteSuccess(LoginRequiredMixin, generic.TemplateView):
     template_name = 'notes/success.html'
 
 
+class NotesWriteMixin:
+    """
+    Отклоняет изменение заметок, пока они переносятся в другой шард.
+
+    Ставится после ``LoginRequiredMixin``: проверяется только вошедший
+    пользователь.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method == 'POST' and ShardAssignment.objects.is_moving(
+            request.user.pk
+        ):
+            response = HttpResponse(
+                'Заметки переносятся, повторите позже.', status=503
+            )
+            response['Retry-After'] = '60'
+            return response
+        return super().dispatch(request, *args, **kwargs)
+
+
 class NoteBase(LoginRequiredMixin):
     """Базовый класс для остальных CBV."""
     model = Note
     success_url = reverse_lazy('notes:success')
 
     def get_queryset(self):
-        """Пользователь может работать только со своими заметками."""
-        return self.model.objects.filter(author=self.request.user)
+        """
+        Пользователь может работать только со своими заметками.
+
+        Запрос уходит в шард, где лежат заметки пользователя.
+        """
+        return self.model.objects.for_author(self.request.user)
 
 
-class NoteCreate(NoteBase, generic.CreateView):
+class NoteCreate(NoteBase, NotesWriteMixin, generic.CreateView):
     """Добавление заметки."""
     template_name = 'notes/form.html'
     form_class = NoteForm
@@ -34,26 +66,127 @@ class NoteCreate(NoteBase, generic.CreateView):
     def form_valid(self, form):
         new_note = form.save(commit=False)
         new_note.author = self.request.user
-        new_note.save()
+        try:
+            new_note.save()
+        except IntegrityError:
+            # slug заняли между проверкой в форме и сохранением.
+            form.add_error('slug', new_note.slug + WARNING)
+            return self.form_invalid(form)
         return super().form_valid(form)
 
 
-class NoteUpdate(NoteBase, generic.UpdateView):
+class NoteUpdate(NoteBase, NotesWriteMixin, generic.UpdateView):
     """Редактирование заметки."""
     template_name = 'notes/form.html'
     form_class = NoteForm
 
+    def form_valid(self, form):
+        try:
+            return super().form_valid(form)
+        except IntegrityError:
+            form.add_error('slug', form.instance.slug + WARNING)
+            return self.form_invalid(form)
 
-class NoteDelete(NoteBase, generic.DeleteView):
+
+class NoteDelete(NoteBase, NotesWriteMixin, generic.DeleteView):
     """Удаление заметки."""
     template_name = 'notes/delete.html'
 
 
 class NotesList(NoteBase, generic.ListView):
-    """Список всех заметок пользователя."""
+    """
+    Список заметок пользователя, страницами по ``NOTES_PER_PAGE``.
+
+    Страницы берутся из кеша, пока заметки автора не изменятся.
+    """
     template_name = 'notes/list.html'
 
+    def get_queryset(self):
+        cursor = self.request.GET.get('cursor')
+        # Метод, а не запрос: шард выбирается только при промахе кеша.
+        author_notes = super().get_queryset
+        notes, self.next_cursor = AuthorCache(
+            self.request.user.pk
+        ).get_or_compute(
+            list_stats,
+            ('list', cursor),
+            lambda: notes_page(author_notes(), cursor),
+        )
+        return notes
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['next_cursor'] = self.next_cursor
+        return context
+
+
+class NotesPage(NotesList):
+    """Страница списка заметок в формате JSON для бесконечной прокрутки."""
+
+    def render_to_response(self, context, **response_kwargs):
+        return JsonResponse({
+            'notes': [
+                {'id': note.id, 'slug': note.slug, 'title': note.title}
+                for note in context['object_list']
+            ],
+            'next': context['next_cursor'],
+        })
+
+
+class NotesSearch(LoginRequiredMixin, generic.TemplateView):
+    """Полнотекстовый поиск по заметкам пользователя."""
+    template_name = 'notes/search.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        query = self.request.GET.get('q', '').strip()
+        results, next_cursor = search_notes(
+            self.request.user, query, self.request.GET.get('cursor')
+        )
+        context.update(
+            query=query, results=results, next_cursor=next_cursor
+        )
+        return context
+
+
+class NotesExport(LoginRequiredMixin, generic.View):
+    """Все заметки пользователя в формате NDJSON."""
+
+    def get(self, request, *args, **kwargs):
+        response = StreamingHttpResponse(
+            ndjson(export_notes(request.user)),
+            content_type='application/x-ndjson; charset=utf-8',
+        )
+        response['Content-Disposition'] = (
+            'attachment; filename="notes.ndjson"'
+        )
+        return response
+
+
+class NotesImport(LoginRequiredMixin, NotesWriteMixin, generic.View):
+    """
+    Загрузка заметок из тела запроса в формате NDJSON.
+
+    Тело читается построчно, не загружаясь в память целиком.
+    """
+
+    def post(self, request, *args, **kwargs):
+        return JsonResponse(
+            NoteImport(request.user).run(iter_lines(request))
+        )
+
 
 class NoteDetail(NoteBase, generic.DetailView):
-    """Заметка подробно."""
+    """Заметка подробно, из кеша, пока заметки автора не изменятся."""
     template_name = 'notes/detail.html'
+
+    def get_object(self, queryset=None):
+        slug = self.kwargs[self.slug_url_kwarg]
+        note = AuthorCache(self.request.user.pk).get_or_compute(
+            detail_stats,
+            ('detail', slug),
+            lambda: self.get_queryset().filter(slug=slug).first(),
+        )
+        if note is None:
+            raise Http404('Заметка не найдена.')
+        return note
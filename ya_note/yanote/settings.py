@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 from django.urls import reverse_lazy
@@ -22,6 +23,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'notes.queries.QueryCountMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -52,13 +54,62 @@ TEMPLATES = [
 WSGI_APPLICATION = 'yanote.wsgi.application'
 
 
+# Соединения живут между запросами, PRAGMA выполняются один раз.
+CONN_MAX_AGE = 60
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': CONN_MAX_AGE,
     }
 }
 
+# Применяются к каждому новому соединению SQLite, см. notes/sqlite.py.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    # Отрицательное значение — размер кеша страниц в КиБ.
+    'cache_size': -64000,
+    'mmap_size': 256 * 2**20,
+    'busy_timeout': 5000,
+}
+
+# Заметки распределены по авторам между шардами. Первый шард — default,
+# остальные — отдельные файлы SQLite; число шардов задаёт переменная
+# окружения YANOTE_NOTE_SHARDS. Обычный migrate обновляет только default,
+# все шарды сразу мигрирует команда python manage.py migrate_shards.
+NOTE_SHARDS = ['default']
+for index in range(2, int(os.environ.get('YANOTE_NOTE_SHARDS', 2)) + 1):
+    DATABASES[f'notes{index}'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / f'notes{index}.sqlite3',
+        'CONN_MAX_AGE': CONN_MAX_AGE,
+    }
+    NOTE_SHARDS.append(f'notes{index}')
+
+DATABASE_ROUTERS = ['notes.routers.NoteShardRouter']
+
+# Версии кеша авторов и счётчики попаданий должны быть общими для всех
+# процессов сервера, поэтому кеш хранится в файлах. Каталог задаёт
+# переменная окружения YANOTE_CACHE_DIR.
+CACHE_DIR = os.environ.get('YANOTE_CACHE_DIR', BASE_DIR / '.cache')
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': CACHE_DIR,
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+    # Счётчики попаданий лежат отдельно: их не вытесняют записи
+    # основного кеша, а запись счётчика не перебирает его файлы.
+    'stats': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(CACHE_DIR, 'stats'),
+    },
+}
+# Как часто процесс переносит накопленные счётчики в кеш stats.
+CACHE_STATS_FLUSH_SECONDS = 10
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -87,3 +138,35 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 LOGIN_URL = reverse_lazy('users:login')
 LOGIN_REDIRECT_URL = reverse_lazy('notes:home')
+
+# Сколько SQL-запросов может выполнить один запрос к представлению.
+QUERY_BUDGETS = {
+    'notes:home': 2,
+    'notes:list': 4,
+    'notes:page': 4,
+    'notes:search': 5,
+    # Сессия, пользователь, шард автора и курсор по заметкам.
+    'notes:export': 4,
+    # Изменения заметок начинаются с проверки, не идёт ли их перенос.
+    # Один пакет заметок, каждый следующий добавляет несколько запросов.
+    'notes:import': 11,
+    'notes:add': 11,
+    'notes:detail': 4,
+    'notes:edit': 12,
+    'notes:delete': 7,
+    'notes:success': 2,
+}
+
+NOTES_PER_PAGE = 50
+# Записи кеша заметок устаревают сменой версии автора, а не по времени.
+NOTES_CACHE_TIMEOUT = None
+SEARCH_RESULTS_PER_PAGE = 20
+
+# Сколько заметок выгрузки читается из базы за один раз.
+EXPORT_CHUNK_SIZE = 1000
+
+# Сколько заметок загрузки сохраняется одной транзакцией.
+IMPORT_BATCH_SIZE = 1000
+
+# Сколько строк удаляется одним запросом при удалении зависимых объектов.
+DELETE_BATCH_SIZE = 1000